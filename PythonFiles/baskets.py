@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from pair_engine import pairs_from_incidence
+
+
+def parse_quantities(values):
+    """Line-item quantities (strings or numbers) as float64; missing or unparseable ones count as 1."""
+    values = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    return pd.to_numeric(values, errors='coerce').fillna(1).to_numpy(dtype=np.float64)
+
+
+class Baskets:
+    """Compact CSR representation of order baskets.
+
+    Basket b holds the distinct item codes item_codes[offsets[b]:offsets[b + 1]] (sorted) with the matching
+    quantities, and item_names[code] is the interned name. An order of 12 identical pastries is one
+    (code, 12) entry rather than a 12-string list. Quantities are float weights, so items sold by weight
+    (quantity '0.5') keep their fraction; a missing or unparseable quantity counts as 1.
+    """
+
+    def __init__(self, offsets, item_codes, quantities, item_names, order_ids=None):
+        self.offsets = offsets
+        self.item_codes = item_codes
+        self.quantities = quantities
+        self.item_names = np.asarray(item_names, dtype=object)
+        self.order_ids = order_ids
+
+    @classmethod
+    def from_codes(cls, basket_index, item_codes, quantities, item_names, order_ids=None):
+        """Build from flat (basket, item, quantity) triples, merging repeated items within a basket.
+
+        Baskets are numbered 0..n-1 by basket_index; baskets that end up empty are dropped.
+        """
+        basket_index = np.asarray(basket_index, dtype=np.int64)
+        item_codes = np.asarray(item_codes, dtype=np.int64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+
+        # One key per (basket, item): sort once, then sum quantities over runs of equal keys
+        keys = basket_index * len(item_names) + item_codes
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+        merged_quantities = np.add.reduceat(quantities[order], starts) if len(keys) else quantities[:0]
+        unique_keys = keys[starts]
+
+        baskets, codes = np.divmod(unique_keys, len(item_names)) if len(item_names) else (unique_keys, unique_keys)
+        basket_ids, counts = np.unique(baskets, return_counts=True)
+        offsets = np.zeros(len(basket_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        if order_ids is not None:
+            order_ids = np.asarray(order_ids, dtype=object)[basket_ids]
+        return cls(offsets, codes.astype(np.int32), merged_quantities, item_names, order_ids)
+
+    @classmethod
+    def from_orders(cls, orders):
+        """Build from raw Square orders (the input of extract_order_items); orders with no items are skipped."""
+        interned = {}
+        basket_index = []
+        item_codes = []
+        quantities = []
+        order_ids = []
+        for idx, order in enumerate(orders):
+            order_ids.append(order.get('id'))
+            for item in order.get('line_items', []):
+                name = item.get('name')
+                if name is None:
+                    continue
+                basket_index.append(idx)
+                item_codes.append(interned.setdefault(name, len(interned)))
+                quantities.append(item.get('quantity'))
+        return cls.from_codes(basket_index, item_codes, parse_quantities(quantities), list(interned), order_ids)
+
+    @classmethod
+    def from_dataframe(cls, df, order_column='order_id', item_column='item_name', quantity_column='quantity'):
+        """Build from a line-item frame such as orders_to_dataframe or the Parquet store produce."""
+        df = df[df[item_column].notna() & df[order_column].notna()]
+        basket_index, order_ids = pd.factorize(df[order_column])
+        item_codes, item_names = pd.factorize(np.asarray(df[item_column], dtype=object))
+        if quantity_column in df.columns:
+            quantities = parse_quantities(df[quantity_column])
+        else:
+            quantities = np.ones(len(df), dtype=np.float64)
+        return cls.from_codes(basket_index, item_codes, quantities, item_names, order_ids)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def basket(self, index):
+        """Item names and quantities of one basket, for display."""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return list(zip(self.item_names[self.item_codes[start:end]], self.quantities[start:end].tolist()))
+
+    def distinct_items(self):
+        """Number of distinct items in each basket."""
+        return np.diff(self.offsets)
+
+    def total_quantities(self):
+        """Total units in each basket."""
+        totals = np.zeros(len(self), dtype=np.float64)
+        np.add.at(totals, np.repeat(np.arange(len(self)), self.distinct_items()), self.quantities)
+        return totals
+
+    def basket_size_stats(self):
+        """Summary of basket sizes, by distinct items and by total units."""
+        return pd.DataFrame({
+            'distinct_items': pd.Series(self.distinct_items()).describe(percentiles=[0.5, 0.9, 0.99]),
+            'total_quantity': pd.Series(self.total_quantities()).describe(percentiles=[0.5, 0.9, 0.99]),
+        })
+
+    def incidence_matrix(self):
+        """Binary basket x item CSR matrix that shares the code and offset arrays."""
+        data = np.ones(len(self.item_codes), dtype=np.int32)
+        return sparse.csr_matrix((data, self.item_codes, self.offsets), shape=(len(self), len(self.item_names)))
+
+    def item_support(self):
+        """Number of baskets containing each item, as a Series indexed by item name."""
+        return pd.Series(np.bincount(self.item_codes, minlength=len(self.item_names)), index=self.item_names)
+
+    def pair_counts(self):
+        """(pair, count) DataFrame in the same layout as stats.analyze_pairs."""
+        return pairs_from_incidence(self.incidence_matrix(), self.item_names)
@@ -0,0 +1,41 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pull_data_and_analyze as pda
+from mock_square import MockSquareServer
+from order_generator import OrderGenerator
+
+
+def run(n_payments=1_000, latency=0.02):
+    """Resolve payments one by one with get_orders_from_payment, then in bulk with get_orders_from_payments."""
+    orders = OrderGenerator().orders(n_payments, '2024-09-01T00:00:00Z', '2024-09-30T23:59:59Z')
+    payment_ids = ['PAY_' + order['id'] for order in orders]
+
+    with MockSquareServer(orders, latency=latency) as server:
+        pda.set_base_url(server.base_url)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # get_orders_from_payment prints every line item
+            serial = {payment_id: pda.get_orders_from_payment(payment_id)['order'] for payment_id in payment_ids}
+        serial_seconds = time.perf_counter() - start
+        serial_requests, server.requests = server.requests, 0
+
+        start = time.perf_counter()
+        bulk = pda.get_orders_from_payments(payment_ids)
+        bulk_seconds = time.perf_counter() - start
+
+    assert bulk == serial, 'bulk lookup returned different orders'
+    print(f'{n_payments} payments at {latency * 1000:.0f} ms per round trip')
+    print(f'{"per payment":<12} {serial_requests:>6} requests {serial_seconds:7.2f} s')
+    print(f'{"bulk":<12} {server.requests:>6} requests {bulk_seconds:7.2f} s '
+          f'({serial_requests / server.requests:.1f}x fewer round trips, {serial_seconds / bulk_seconds:.1f}x faster)')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pull_data_and_analyze as pda
+from mock_square import MockSquareServer
+from order_generator import OrderGenerator
+
+BEGIN_TIME = '2024-01-01T00:00:00Z'
+END_TIME = '2024-12-31T23:59:59Z'
+
+
+def run(n_orders=90_000, latency=0.05, window_counts=(1, 2, 4, 8, 16, 32)):
+    """Time retrieve_all_orders against the mock server for a growing number of sub-windows."""
+    orders = OrderGenerator().orders(n_orders, BEGIN_TIME, END_TIME)
+
+    with MockSquareServer(orders, latency=latency) as server:
+        pda.set_base_url(server.base_url)
+
+        baseline = None
+        print(f'{"windows":>8} {"requests":>9} {"orders":>8} {"seconds":>8} {"speedup":>8}')
+        for windows in window_counts:
+            server.requests = 0
+            start = time.perf_counter()
+            fetched = pda.retrieve_all_orders('MOCKLOCATION', BEGIN_TIME, END_TIME, windows=windows)
+            elapsed = time.perf_counter() - start
+
+            assert len(fetched) == len(orders), 'sub-windows lost or duplicated orders'
+            baseline = baseline or elapsed
+            print(f'{windows:>8} {server.requests:>9} {len(fetched):>8} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import order_store
+from order_generator import OrderGenerator
+from order_schema import memory_usage
+from pull_data_and_analyze import orders_to_dataframe
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def groupby_queries(df):
+    """The groupbys the analyses lean on, written against whichever money and quantity columns df has."""
+    money = 'total_money_cents' if 'total_money_cents' in df.columns else 'total_money'
+    quantity = df['quantity'] if df['quantity'].dtype != object else pd.to_numeric(df['quantity'])
+    return {
+        'order totals': lambda: df.groupby('order_id', observed=True)[money].sum(),
+        'items per order': lambda: df.groupby('order_id', observed=True).size(),
+        'distinct orders': lambda: df['order_id'].nunique(),
+        'revenue by item': lambda: df.groupby('item_name', observed=True)[money].sum(),
+        'units by location, item': lambda: quantity.groupby([df['location_id'], df['item_name']], observed=True).sum(),
+        'orders by state': lambda: df.groupby('state', observed=True)['order_id'].nunique(),
+    }
+
+
+def run(n_orders=90_000):
+    """Memory and groupby time of the orders table in three layouts: the flat orders_to_dataframe frame, the
+    store as it loaded before order_schema (object ids, float quantities), and the order_schema layout."""
+    orders = OrderGenerator(locations=['LOC0', 'LOC1']).orders(n_orders, '2023-01-01T00:00:00Z',
+                                                               '2024-12-31T23:59:59Z')
+    flat = orders_to_dataframe(orders)
+    with tempfile.TemporaryDirectory() as root:
+        order_store.write_orders(flat, root)
+        old_load = best_of(lambda: pd.read_parquet(root, engine='pyarrow'), 3)
+        new_load = best_of(lambda: order_store.read_orders(root), 3)
+        compact = order_store.read_orders(root).drop(columns=['year', 'month'], errors='ignore')
+    previous = compact.astype({'order_id': object, 'item_id': object, 'quantity': 'float64'})
+    layouts = {'orders_to_dataframe': flat, 'store before': previous, 'order_schema': compact}
+
+    print(f'{n_orders} orders, {len(flat)} line items\n')
+    usage = pd.DataFrame({name: memory_usage(df) for name, df in layouts.items()}) / 2 ** 20
+    usage.loc['total'] = usage.sum()
+    print('memory (MB)')
+    print(usage.round(2).fillna('').to_string())
+    total = usage.loc['total']
+    print(f'\norder_schema uses {total["orders_to_dataframe"] / total["order_schema"]:.1f}x less than '
+          f'orders_to_dataframe and {total["store before"] / total["order_schema"]:.1f}x less than the old store load')
+    print(f'store load: {old_load * 1000:.1f} ms before, {new_load * 1000:.1f} ms with Arrow-backed strings\n')
+
+    print(f'{"groupby":>24} ' + ' '.join(f'{name:>20}' for name in layouts) + f' {"vs flat":>8} {"vs before":>9}')
+    for query in groupby_queries(flat):
+        times = {name: best_of(groupby_queries(df)[query]) for name, df in layouts.items()}
+        print(f'{query:>24} ' + ' '.join(f'{seconds * 1000:>17.2f} ms' for seconds in times.values()) +
+              f' {times["orders_to_dataframe"] / times["order_schema"]:>7.1f}x'
+              f' {times["store before"] / times["order_schema"]:>8.1f}x')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fast_decode
+from order_generator import OrderGenerator
+from pull_data_and_analyze import orders_to_dataframe
+
+
+def with_unused_fields(order):
+    """Pad a mock order with the bulk a real Square order carries but the pipeline never reads."""
+    money = {'amount': 0, 'currency': 'USD'}
+    order = dict(order, version=3, source={'name': 'Square Point of Sale'}, reference_id=None,
+                 net_amounts={name: money for name in ['total_money', 'tax_money', 'discount_money', 'tip_money']},
+                 tenders=[{'id': 'TENDER', 'type': 'CARD', 'amount_money': order['total_money'],
+                           'card_details': {'status': 'CAPTURED', 'card': {'card_brand': 'VISA', 'last_4': '1111'},
+                                            'entry_method': 'CONTACTLESS'}}],
+                 fulfillments=[{'uid': 'F1', 'type': 'PICKUP', 'state': 'COMPLETED'}],
+                 total_tax_money=money, total_discount_money=money, total_tip_money=money,
+                 total_service_charge_money=money)
+    order['line_items'] = [dict(item, uid='LINE', gross_sales_money=item['total_money'], total_tax_money=money,
+                                total_discount_money=money, variation_total_price_money=item['total_money'],
+                                modifiers=[{'uid': 'MOD', 'name': 'Oat Milk', 'base_price_money': money}],
+                                applied_taxes=[{'uid': 'TAX', 'tax_uid': 'SALES', 'applied_money': money}])
+                           for item in order['line_items']]
+    return order
+
+
+def measure(decode_and_flatten, content, repeat=20):
+    """Best-of wall time and traced peak memory for one page."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode_and_flatten(content)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    df = decode_and_flatten(content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return df, min(timings), peak
+
+
+def run(orders_per_page=500):
+    """Decode-plus-flatten cost of one 500-order search page through each available path."""
+    orders = OrderGenerator().orders(orders_per_page, '2024-09-01T00:00:00Z', '2024-09-30T23:59:59Z')
+    orders = [with_unused_fields(order) for order in orders]
+    content = json.dumps({'orders': orders, 'cursor': 'NEXT'}).encode()
+    print(f'page of {orders_per_page} orders, {len(content) / 1e6:.2f} MB of JSON')
+
+    paths = [('json + orders_to_dataframe', lambda c: orders_to_dataframe(json.loads(c)['orders']))]
+    if fast_decode.orjson is not None:
+        paths.append(('orjson + orders_to_dataframe', lambda c: orders_to_dataframe(fast_decode.orjson.loads(c)['orders'])))
+    if fast_decode.msgspec is not None:
+        paths.append(('msgspec structs + flatten', lambda c: fast_decode.flatten_orders(fast_decode.decode_orders_page(c)[0])))
+
+    baseline = None
+    reference = None
+    for label, path in paths:
+        df, seconds, peak = measure(path, content)
+        if reference is None:
+            reference = df
+        assert df.equals(reference), f'{label} flattened differently'
+        baseline = baseline or seconds
+        print(f'{label:<30} {seconds * 1000:7.2f} ms {baseline / seconds:5.1f}x  peak {peak / 1e6:6.2f} MB')
+
+
+if __name__ == '__main__':
+    run()
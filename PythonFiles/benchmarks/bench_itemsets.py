@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from baskets import Baskets
+from itemsets import association_rules, frequent_itemsets
+
+try:
+    from mlxtend.frequent_patterns import apriori
+    from mlxtend.frequent_patterns import association_rules as mlxtend_rules
+    from mlxtend.preprocessing import TransactionEncoder
+except ImportError:
+    apriori = None
+
+
+def synthetic_orders_df(n_orders, n_menu_items=120, mean_basket=2.5, seed=0):
+    """Line items with skewed popularity plus a few planted bundles, so 3- and 4-item itemsets exist."""
+    rng = np.random.default_rng(seed)
+    menu = np.array([f'Item {idx:03d}' for idx in range(n_menu_items)], dtype=object)
+    popularity = 1.0 / np.arange(1, n_menu_items + 1)
+    bundles = [[0, 3, 7], [1, 4, 9, 12], [2, 5]]
+
+    basket_sizes = rng.poisson(mean_basket - 1, size=n_orders) + 1
+    order_codes = np.repeat(np.arange(n_orders), basket_sizes)
+    item_codes = rng.choice(n_menu_items, size=len(order_codes), p=popularity / popularity.sum())
+
+    # Roughly one order in ten also buys a whole bundle
+    bundle_orders = rng.choice(n_orders, size=n_orders // 10, replace=False)
+    picks = rng.integers(len(bundles), size=len(bundle_orders))
+    extra_orders = np.concatenate([np.full(len(bundles[p]), o) for o, p in zip(bundle_orders, picks)])
+    extra_items = np.concatenate([bundles[p] for p in picks])
+
+    return pd.DataFrame({'order_id': np.concatenate([order_codes, extra_orders]).astype(str),
+                         'item_name': menu[np.concatenate([item_codes, extra_items])]})
+
+
+def mlxtend_itemsets(df, min_support):
+    """The dense path stats.py imported: TransactionEncoder one-hot frame, then apriori."""
+    transactions = df.groupby('order_id')['item_name'].apply(list).tolist()
+    encoder = TransactionEncoder()
+    onehot = pd.DataFrame(encoder.fit(transactions).transform(transactions), columns=encoder.columns_)
+    return apriori(onehot, min_support=min_support, use_colnames=True), onehot.memory_usage(deep=True).sum()
+
+
+def as_supports(itemsets_df):
+    return {itemset: round(support, 12) for itemset, support in zip(itemsets_df['itemsets'], itemsets_df['support'])}
+
+
+def run(sizes=(10_000, 100_000, 500_000), min_support=0.005, min_confidence=0.2, mlxtend_limit=100_000):
+    """Time sparse Eclat against dense mlxtend apriori, checking both find the same itemsets and rules."""
+    print(f'{"orders":>8} {"itemsets":>8} {"max len":>7} {"rules":>6} {"eclat s":>8} {"apriori s":>9} '
+          f'{"one-hot MB":>10} {"speedup":>8}')
+    for size in sizes:
+        df = synthetic_orders_df(size)
+
+        start = time.perf_counter()
+        itemsets_df = frequent_itemsets(Baskets.from_dataframe(df), min_support)
+        rules = association_rules(itemsets_df, min_confidence)
+        eclat_seconds = time.perf_counter() - start
+
+        dense = onehot_mb = speedup = '-'
+        if apriori is not None and size <= mlxtend_limit:
+            start = time.perf_counter()
+            dense_df, onehot_bytes = mlxtend_itemsets(df, min_support)
+            dense_rules = mlxtend_rules(dense_df, metric='confidence', min_threshold=min_confidence)
+            dense_seconds = time.perf_counter() - start
+            assert as_supports(dense_df) == as_supports(itemsets_df), 'itemsets differ from mlxtend apriori'
+            assert len(dense_rules) == len(rules), 'rule count differs from mlxtend'
+            dense = f'{dense_seconds:.2f}'
+            onehot_mb = f'{onehot_bytes / 1e6:.1f}'
+            speedup = f'{dense_seconds / eclat_seconds:.1f}x'
+
+        max_len = itemsets_df['itemsets'].map(len).max()
+        print(f'{size:>8} {len(itemsets_df):>8} {max_len:>7} {len(rules):>6} {eclat_seconds:>8.3f} {dense:>9} '
+              f'{onehot_mb:>10} {speedup:>8}')
+
+
+if __name__ == '__main__':
+    run()
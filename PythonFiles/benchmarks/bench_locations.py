@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pull_data_and_analyze as pda
+from locations import analyze_location, analyze_locations, fetch_locations
+from mock_square import MockSquareServer
+from order_generator import OrderGenerator
+
+BEGIN_TIME = '2024-01-01T00:00:00Z'
+END_TIME = '2024-12-31T23:59:59Z'
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run(n_locations=4, orders_per_location=30_000, latency=0.05):
+    """Fetch several mock shops sequentially, concurrently and batched, then analyze them serially and in a
+    process pool, and print the cross-location comparison table."""
+    location_ids = [f'SHOP{idx}' for idx in range(n_locations)]
+    orders = []
+    for idx, location_id in enumerate(location_ids):
+        # Shops differ in size so the comparison table has something to compare
+        orders += OrderGenerator(locations=[location_id], id_prefix=location_id, seed=idx).orders(
+            orders_per_location * (idx + 2) // 3, BEGIN_TIME, END_TIME)
+
+    with MockSquareServer(orders, latency=latency) as server, tempfile.TemporaryDirectory() as tmp:
+        pda.set_base_url(server.base_url)
+
+        print(f'{"fetch mode":>22} {"requests":>9} {"seconds":>8}')
+        for label, kwargs in [('one location at a time', None), ('concurrent', {}), ('concurrent, 4 windows', {'windows': 4}),
+                              ('batched location_ids', {'batched': True})]:
+            server.requests = 0
+            root = os.path.join(tmp, label.replace(' ', '_').replace(',', ''))
+            if kwargs is None:
+                start = time.perf_counter()
+                for location_id in location_ids:
+                    fetch_locations(root, BEGIN_TIME, END_TIME, [location_id])
+                seconds = time.perf_counter() - start
+            else:
+                counts, seconds = timed(fetch_locations, root, BEGIN_TIME, END_TIME, **kwargs)
+                assert sum(counts.values()) == len(orders), 'orders lost or duplicated across locations'
+            print(f'{label:>22} {server.requests:>9} {seconds:>8.2f}')
+
+        _, serial_seconds = timed(lambda: [analyze_location(root, location_id) for location_id in location_ids])
+        (results, comparison), pool_seconds = timed(analyze_locations, root)
+        print(f'\nanalysis: serial {serial_seconds:.2f} s, process pool {pool_seconds:.2f} s '
+              f'({serial_seconds / pool_seconds:.1f}x, {os.cpu_count()} cores)\n')
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(comparison)
+
+
+if __name__ == '__main__':
+    run()
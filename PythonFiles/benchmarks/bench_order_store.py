@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import order_store
+from order_generator import OrderGenerator
+from pull_data_and_analyze import orders_to_dataframe
+
+
+def load_csv(path):
+    """The old round-trip: read the CSV, then parse created_at on every analysis run."""
+    df = pd.read_csv(path)
+    df['created_at'] = pd.to_datetime(df['created_at'], format='ISO8601', utc=True, errors='coerce')
+    return df
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def directory_size(root):
+    return sum(os.path.getsize(os.path.join(path, name)) for path, _, names in os.walk(root) for name in names)
+
+
+def run(n_orders=90_000):
+    """Compare loading the 90k-order table from CSV and from the partitioned Parquet store."""
+    df = orders_to_dataframe(OrderGenerator().orders(n_orders, '2024-01-01T00:00:00Z', '2024-12-31T23:59:59Z'))
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'orders.csv')
+        store_path = os.path.join(directory, 'orders_store')
+        df.to_csv(csv_path, index=False, mode='w', encoding='utf-8-sig')
+        order_store.write_orders(df, store_path)
+
+        print(f'{len(df)} line items, csv {os.path.getsize(csv_path) / 1e6:.1f} MB, '
+              f'parquet {directory_size(store_path) / 1e6:.1f} MB')
+        cases = [
+            ('csv + to_datetime', lambda: load_csv(csv_path)),
+            ('parquet, all columns', lambda: order_store.read_orders(store_path)),
+            ('parquet, pair columns', lambda: order_store.read_orders(store_path, columns=['order_id', 'item_name'])),
+            ('parquet, one month', lambda: order_store.read_orders(store_path, begin_time='2024-09-01',
+                                                                   end_time='2024-09-30T23:59:59')),
+        ]
+        baseline = None
+        for label, func in cases:
+            elapsed = best_of(func)
+            baseline = baseline or elapsed
+            print(f'{label:<24} {elapsed * 1000:8.1f} ms {baseline / elapsed:6.1f}x')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pair_engine import count_pairs
+
+
+def synthetic_line_items(n_line_items, n_menu_items=120, mean_basket=2.0, seed=0):
+    """Random order_id/item_name line items with a skewed item popularity, built directly with numpy."""
+    rng = np.random.default_rng(seed)
+    basket_sizes = rng.poisson(mean_basket - 1, size=int(n_line_items / mean_basket) + 1) + 1
+    order_codes = np.repeat(np.arange(len(basket_sizes)), basket_sizes)[:n_line_items]
+    popularity = 1.0 / np.arange(1, n_menu_items + 1)
+    item_codes = rng.choice(n_menu_items, size=len(order_codes), p=popularity / popularity.sum())
+    menu = np.array([f'Item {idx:03d}' for idx in range(n_menu_items)], dtype=object)
+    return pd.DataFrame({'order_id': order_codes.astype(str), 'item_name': menu[item_codes]})
+
+
+def legacy_analyze_pairs(df):
+    """The groupby + set + combinations loop that stats.analyze_pairs used to run."""
+    item_pairs = Counter()
+    for order_id, group in df.groupby('order_id'):
+        items_in_order = group['item_name'].dropna().tolist()
+        if len(items_in_order) >= 2:
+            for pair in combinations(set(items_in_order), 2):
+                item_pairs[pair] += 1
+    pairs_df = pd.DataFrame(item_pairs.items(), columns=['pair', 'count'])
+    return pairs_df.sort_values(by='count', ascending=False)
+
+
+def as_counts(pairs_df):
+    # Legacy pairs come out in arbitrary set order, so the same pair can be split across (a, b) and (b, a)
+    counts = Counter()
+    for pair, count in zip(pairs_df['pair'], pairs_df['count']):
+        counts[frozenset(pair)] += count
+    return counts
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+
+def run(sizes=(10_000, 100_000, 1_000_000, 10_000_000), legacy_limit=1_000_000):
+    """Time the sparse engine from 10k to 10M line items, checking it against the legacy loop where feasible."""
+    print(f'{"line items":>11} {"pairs":>7} {"legacy s":>9} {"sparse s":>9} {"speedup":>8}')
+    for size in sizes:
+        df = synthetic_line_items(size)
+        pairs_df, sparse_seconds = timed(count_pairs, df)
+
+        legacy = '-'
+        speedup = '-'
+        if size <= legacy_limit:
+            legacy_df, legacy_seconds = timed(legacy_analyze_pairs, df)
+            assert as_counts(legacy_df) == as_counts(pairs_df), 'pair counts differ from the legacy loop'
+            legacy = f'{legacy_seconds:.2f}'
+            speedup = f'{legacy_seconds / sparse_seconds:.0f}x'
+        print(f'{size:>11} {len(pairs_df):>7} {legacy:>9} {sparse_seconds:>9.3f} {speedup:>8}')
+
+
+if __name__ == '__main__':
+    run()
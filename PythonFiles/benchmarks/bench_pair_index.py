@@ -0,0 +1,73 @@
+import copy
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from order_generator import OrderGenerator
+from pair_engine import count_pairs
+from pair_index import PairIndex
+from pull_data_and_analyze import orders_to_dataframe
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(n_orders=200_000, batch_size=500, n_updates=5_000, queries=((None, None), ('2024-03-01', '2024-03-31'),
+                                                                       ('2024-12-24', '2024-12-24'))):
+    """Build the index page by page, apply a batch of updates and cancellations, then time range queries
+    against recomputing the pairs from every order."""
+    orders = OrderGenerator().orders(n_orders, '2024-01-01T00:00:00Z', '2024-12-31T23:59:59Z')
+    index = PairIndex()
+    start = time.perf_counter()
+    for offset in range(0, len(orders), batch_size):
+        index.add(orders_to_dataframe(orders[offset:offset + batch_size]))
+    print(f'built from {n_orders} orders in {time.perf_counter() - start:.2f} s')
+
+    # Re-send some orders: a third cancelled, the rest with a different basket
+    rng = np.random.default_rng(1)
+    changed = [copy.deepcopy(orders[i]) for i in rng.choice(len(orders), n_updates, replace=False)]
+    for idx, order in enumerate(changed):
+        order['updated_at'] = '2025-01-01T00:00:00Z'
+        if idx % 3 == 0:
+            order['state'] = 'CANCELED'
+        else:
+            order['line_items'] = order['line_items'][:1] + [{'name': 'Scone', 'quantity': '1'}]
+    _, update_seconds = timed(index.add, orders_to_dataframe(changed))
+    print(f'applied {n_updates} updates/cancellations in {update_seconds * 1000:.0f} ms')
+
+    latest = {order['id']: order for order in orders}
+    latest.update({order['id']: order for order in changed})
+    df = orders_to_dataframe([order for order in latest.values() if order.get('state') != 'CANCELED'])
+    local_dates = pd.to_datetime(df['created_at'], utc=True).dt.tz_convert('US/Eastern').dt.date
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pairs.npz')
+        _, save_seconds = timed(index.save, path)
+        index, load_seconds = timed(PairIndex.load, path)
+        print(f'save {save_seconds * 1000:.0f} ms, load {load_seconds * 1000:.0f} ms, '
+              f'{os.path.getsize(path) / 1e6:.1f} MB on disk')
+
+    print(f'{"range":>25} {"index ms":>9} {"rescan ms":>10}')
+    for begin, end in queries:
+        top, index_seconds = timed(index.top_pairs, 10, begin, end)
+        subset = df
+        if begin is not None:
+            subset = df[(local_dates >= pd.Timestamp(begin).date()) & (local_dates <= pd.Timestamp(end).date())]
+        expected, rescan_seconds = timed(count_pairs, subset)
+        assert top.reset_index(drop=True).equals(expected.head(10).reset_index(drop=True)), 'index disagrees'
+        label = 'all days' if begin is None else f'{begin}..{end}'
+        print(f'{label:>25} {index_seconds * 1000:>9.2f} {rescan_seconds * 1000:>10.1f}')
+
+
+if __name__ == '__main__':
+    run()
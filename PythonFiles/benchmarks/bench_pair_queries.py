@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_pair_engine import synthetic_line_items
+from pair_engine import count_pairs
+from pair_queries import PairQueries
+
+
+def per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def scan_partners(pairs_df, item, k):
+    # What plot_pairs_single_bar used to do: test every row, then nlargest
+    df = pairs_df[pairs_df['pair'].apply(lambda pair: item in pair)].copy()
+    df['paired_item'] = df['pair'].apply(lambda pair: pair[1] if pair[0] == item else pair[0])
+    return df.nlargest(k, 'count')
+
+
+def scan_excluding(pairs_df, items, k):
+    # What split_latte_pairs used to do for the non-Latte side
+    return pairs_df[~pairs_df['pair'].apply(lambda pair: bool(set(pair) & items))].nlargest(k, 'count')
+
+
+def run(menu_sizes=(100, 400, 1600, 3200), n_line_items=4_000_000, k=10):
+    """Top-k partner, exclusion and category queries as the pair table grows, row scans against PairQueries."""
+    print(f'{"items":>6} {"pairs":>9} {"build ms":>9} {"partners scan":>14} {"query":>9} '
+          f'{"excluding scan":>15} {"query":>9} {"category query":>15}')
+    for n_items in menu_sizes:
+        pairs_df = count_pairs(synthetic_line_items(n_line_items, n_menu_items=n_items, mean_basket=4.0))
+        categories = {f'Item {idx:03d}': f'Category {idx % 8}' for idx in range(n_items)}
+        start = time.perf_counter()
+        queries = PairQueries.from_pairs(pairs_df, categories)
+        build = time.perf_counter() - start
+
+        item = 'Item 005'
+        excluded = {'Item 000', 'Item 001'}
+        assert queries.partners(item, k)['count'].tolist() == scan_partners(pairs_df, item, k)['count'].tolist()
+        assert queries.top_pairs(k, exclude=excluded)['count'].tolist() == \
+            scan_excluding(pairs_df, excluded, k)['count'].tolist()
+
+        partners_scan = per_call(lambda: scan_partners(pairs_df, item, k), 3)
+        partners_query = per_call(lambda: queries.partners(item, k), 200)
+        excluding_scan = per_call(lambda: scan_excluding(pairs_df, excluded, k), 3)
+        excluding_query = per_call(lambda: queries.top_pairs(k, exclude=excluded), 200)
+        category_query = per_call(lambda: queries.top_pairs(k, category='Category 3'), 200)
+        print(f'{n_items:>6} {len(queries):>9} {build * 1000:>9.1f} {partners_scan * 1000:>11.2f} ms '
+              f'{partners_query * 1000:>6.3f} ms {excluding_scan * 1000:>12.2f} ms {excluding_query * 1000:>6.3f} ms '
+              f'{category_query * 1000:>12.3f} ms')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_pair_engine import synthetic_line_items
+from pair_engine import count_pairs
+from pair_shards import count_pairs_sharded
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run(n_line_items=20_000_000, worker_counts=None):
+    """Scale count_pairs_sharded over worker counts on one large history, checking it against count_pairs."""
+    worker_counts = worker_counts or sorted({1, 2, 4, 8, os.cpu_count()} & set(range(1, os.cpu_count() + 1)))
+    df = synthetic_line_items(n_line_items, n_menu_items=400, mean_basket=4.0)
+    expected, single_seconds = timed(count_pairs, df)
+    print(f'{n_line_items} line items, {len(expected)} pairs, {os.cpu_count()} cores; '
+          f'count_pairs on one core {single_seconds:.2f} s')
+
+    print(f'{"workers":>8} {"seconds":>8} {"vs 1 worker":>12} {"vs count_pairs":>15}')
+    baseline = None
+    for workers in worker_counts:
+        pairs_df, seconds = timed(count_pairs_sharded, df, n_shards=workers, max_workers=workers)
+        assert pairs_df.reset_index(drop=True).equals(expected.reset_index(drop=True)), 'sharded counts differ'
+        baseline = baseline or seconds
+        print(f'{workers:>8} {seconds:>8.2f} {baseline / seconds:>11.1f}x {single_seconds / seconds:>14.1f}x')
+
+
+if __name__ == '__main__':
+    run()
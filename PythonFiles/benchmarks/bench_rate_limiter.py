@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pull_data_and_analyze as pda
+from mock_square import MockSquareServer
+from order_generator import OrderGenerator
+from rate_limiter import RateLimiter
+from square_client import SquareAPIError, SquareClient
+
+BEGIN_TIME = '2024-01-01T00:00:00Z'
+END_TIME = '2024-12-31T23:59:59Z'
+
+
+def fetch(server, client, windows):
+    server.requests = server.throttled = server.errors = 0
+    start = time.perf_counter()
+    try:
+        orders = pda.retrieve_all_orders('MOCKLOCATION', BEGIN_TIME, END_TIME, windows=windows, client=client)
+    except SquareAPIError as error:
+        orders = None
+        print(f'    gave up: {error} (resume cursor {error.cursor!r})')
+    return orders, time.perf_counter() - start
+
+
+def run(n_orders=60_000, server_rate=20, error_rate=0.05, windows=8):
+    """Pull a year from a throttling, flaky mock server with and without the shared limiter, paced at
+    the server's documented rate."""
+    orders = OrderGenerator().orders(n_orders, BEGIN_TIME, END_TIME)
+    print(f'server allows {server_rate} req/s and fails {error_rate:.0%} of requests with 503; {windows} windows')
+
+    with MockSquareServer(orders, latency=0.01, rate_limit=server_rate, error_rate=error_rate) as server:
+        pda.set_base_url(server.base_url)
+        cases = [
+            ('no retries', SquareClient('mock', max_retries=0)),
+            ('retries only', SquareClient('mock')),
+            ('retries + rate limiter', SquareClient('mock', rate_limiter=RateLimiter(rate=server_rate))),
+        ]
+        for label, client in cases:
+            # Start every case in a fresh quota window, not one the previous case used up
+            time.sleep(1.0)
+            fetched, elapsed = fetch(server, client, windows)
+            complete = fetched is not None and len(fetched) == len(orders)
+            print(f'{label:<24} complete={str(complete):<5} requests={server.requests:>4} '
+                  f'429s={server.throttled:>4} 503s={server.errors:>3} {elapsed:6.2f} s')
+
+
+if __name__ == '__main__':
+    run()
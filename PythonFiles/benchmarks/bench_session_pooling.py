@@ -0,0 +1,76 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mock_square import MockSquareServer
+from order_generator import OrderGenerator
+from square_client import SquareClient
+
+BEGIN_TIME = '2024-09-01T00:00:00Z'
+END_TIME = '2024-09-30T23:59:59Z'
+
+
+def make_self_signed_cert(directory):
+    """Create a throwaway localhost certificate with the openssl CLI."""
+    certfile = os.path.join(directory, 'cert.pem')
+    keyfile = os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1',
+                    '-keyout', keyfile, '-out', certfile], check=True, capture_output=True)
+    return certfile, keyfile
+
+
+def page_through(post, url):
+    """Walk the search cursor once and return the latency of every page in milliseconds."""
+    latencies = []
+    cursor = None
+    while True:
+        body = {'location_ids': ['MOCKLOCATION'], 'limit': 500}
+        if cursor:
+            body['cursor'] = cursor
+        start = time.perf_counter()
+        result = post(url, json=body).json()
+        latencies.append((time.perf_counter() - start) * 1000)
+        cursor = result.get('cursor')
+        if not cursor:
+            return latencies
+
+
+def report(label, latencies, connections):
+    latencies = sorted(latencies)
+    print(f'{label:<22} pages={len(latencies):>4} connections={connections:>4} '
+          f'mean={statistics.mean(latencies):6.1f}ms p50={latencies[len(latencies) // 2]:6.1f}ms '
+          f'p95={latencies[int(len(latencies) * 0.95)]:6.1f}ms')
+
+
+def run(n_orders=30_000, latency=0.0):
+    """Compare bare requests.post (new TLS connection per page) with the pooled SquareClient session."""
+    orders = OrderGenerator().orders(n_orders, BEGIN_TIME, END_TIME)
+
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = make_self_signed_cert(directory)
+        with MockSquareServer(orders, latency=latency, certfile=certfile, keyfile=keyfile) as server:
+            url = f'{server.base_url}/v2/orders/search'
+            headers = {'Authorization': 'Bearer mock', 'Content-Type': 'application/json'}
+
+            # Before: module-level requests.post, as the fetch functions used to do
+            latencies = page_through(lambda u, json: requests.post(u, headers=headers, json=json, verify=certfile), url)
+            report('bare requests.post', latencies, server.connections)
+
+            # After: one keep-alive session with gzip negotiation
+            server.connections = 0
+            with SquareClient('mock', verify=certfile) as client:
+                latencies = page_through(client.post, url)
+            report('pooled SquareClient', latencies, server.connections)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from time_cube import TimeOfDayCube
+
+
+def synthetic_created_at(n_line_items, begin='2022-01-01', end='2025-01-01', seed=0):
+    """UTC line-item timestamps spread over several years, as read from the order store."""
+    rng = np.random.default_rng(seed)
+    low, high = pd.Timestamp(begin, tz='UTC').value, pd.Timestamp(end, tz='UTC').value
+    stamps = np.sort(rng.integers(low, high, size=n_line_items)) // 10 ** 9 * 10 ** 9
+    return pd.DataFrame({'created_at': pd.to_datetime(stamps, utc=True)})
+
+
+def legacy_analyze_time_of_day(df):
+    """The strftime/day_name/string-groupby version stats.analyze_time_of_day used to run."""
+    df['created_at_et'] = df['created_at'].dt.tz_convert('US/Eastern')
+    df['time_et'] = df['created_at_et'].dt.strftime('%H:%M')
+    df['day_of_week'] = df['created_at_et'].dt.day_name()
+    df['year_et'] = df['created_at_et'].dt.year
+    purchases_by_time = df.groupby('time_et').size()
+    purchases_td = df.groupby(['day_of_week', 'time_et']).size().reset_index(name='count')
+    purchases_tdy = df.groupby(['year_et', 'day_of_week', 'time_et']).size().reset_index(name='count')
+    return purchases_by_time, purchases_td, purchases_tdy
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(sizes=(100_000, 1_000_000, 5_000_000)):
+    """Legacy recompute vs building the cube once vs rolling up a saved and reloaded cube, checking the outputs match."""
+    print(f'{"line items":>11} {"cells":>7} {"legacy s":>9} {"build s":>8} {"load+rollup s":>14} {"speedup":>8}')
+    for size in sizes:
+        df = synthetic_created_at(size)
+        expected, legacy_seconds = timed(legacy_analyze_time_of_day, df.copy())
+        cube, build_seconds = timed(TimeOfDayCube.from_orders, df)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'time_cube.parquet')
+            cube.save(path)
+            start = time.perf_counter()
+            outputs = TimeOfDayCube.load(path).rollup()
+            rollup_seconds = time.perf_counter() - start
+
+        for want, got in zip(expected, outputs):
+            assert want.equals(got), 'cube rollup differs from analyze_time_of_day'
+        print(f'{size:>11} {len(cube.cells):>7} {legacy_seconds:>9.2f} {build_seconds:>8.3f} {rollup_seconds:>14.3f} '
+              f'{legacy_seconds / rollup_seconds:>7.0f}x')
+
+
+if __name__ == '__main__':
+    run()
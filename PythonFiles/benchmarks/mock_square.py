@@ -0,0 +1,360 @@
+"""Local stand-in for the Square API, for load-testing fetches without production credentials.
+
+Run it on its own and point the fetchers at it:
+
+    python mock_square.py --orders 100000 --locations 3 --port 8080 --latency 0.05 --rate-limit 50 --error-rate 0.02
+    python ../cli.py fetch --base-url http://127.0.0.1:8080 --begin 2024-01-01T00:00:00Z --end 2024-12-31T23:59:59Z \
+        --jsonl orders.jsonl
+
+or start MockSquareServer inside a benchmark and call pull_data_and_analyze.set_base_url(server.base_url). Orders
+come from order_generator.OrderGenerator.
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import random
+import socket
+import ssl
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def parse_time(value):
+    """An RFC 3339 timestamp as an aware UTC datetime. The strings themselves do not sort in time order:
+    '2024-05-01T00:00:00.500Z' sorts before '2024-05-01T00:00:00Z'."""
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+def generate_customers(n_customers, seed=0):
+    """Generate simple Square-shaped customer profiles."""
+    rng = random.Random(seed)
+    first_names = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie']
+    last_names = ['Smith', 'Lee', 'Garcia', 'Nguyen', 'Patel', 'Brown', 'Kim', 'Lopez']
+    customers = []
+    for idx in range(n_customers):
+        created_at = f'2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00.000Z'
+        customers.append({
+            'id': f'CUST_{idx:08d}',
+            'created_at': created_at,
+            'updated_at': created_at,
+            'given_name': rng.choice(first_names),
+            'family_name': rng.choice(last_names),
+            'email_address': f'customer{idx}@example.com',
+            'creation_source': rng.choice(['THIRD_PARTY', 'DIRECTORY', 'MERGE']),
+        })
+    return customers
+
+
+# Square's error codes for the server errors that can be injected
+ERROR_CODES = {500: 'INTERNAL_SERVER_ERROR', 502: 'BAD_GATEWAY', 503: 'SERVICE_UNAVAILABLE', 504: 'GATEWAY_TIMEOUT'}
+
+
+class InvalidCursor(Exception):
+    """A cursor that is malformed or belongs to a different query."""
+
+
+class _Server(ThreadingHTTPServer):
+    # Allow a deep accept queue so dozens of concurrent fetchers are not reset
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class MockSquareServer:
+    """Local stand-in for the Square order and payment endpoints with a fixed per-request latency.
+
+    Serves POST /v2/orders/search (cursor paging), POST /v2/orders/batch-retrieve, GET /v2/orders/{id},
+    GET /v2/payments and /v2/payments/{id}, GET /v2/customers and GET /v2/locations. Every order has one payment
+    with id 'PAY_' + order id. Order searches honour location_ids; the locations are those the orders name.
+
+    Cursors are opaque and bound to the query that produced them, as Square's are: a cursor replayed with a
+    different filter, sort or location list gets a 400. Order searches may sort ascending or descending.
+
+    Connections are kept alive (HTTP/1.1) and responses are gzipped when the client asks for it.
+    Pass certfile/keyfile to serve over HTTPS.
+
+    Every request waits latency seconds plus up to latency_jitter more. Faults can be injected: rate_limit caps
+    requests per second (excess requests get 429 with Retry-After) and error_rate is the fraction of requests
+    answered with a server error, picked from error_statuses.
+    """
+
+    def __init__(self, orders, latency=0.05, host='127.0.0.1', port=0, certfile=None, keyfile=None, customers=(),
+                 rate_limit=None, error_rate=0.0, seed=0, latency_jitter=0.0, error_statuses=(503,)):
+        self.orders = list(orders)
+        self.customers = list(customers)
+        self.sorted_by = {}
+        self.orders_by_id = {order['id']: order for order in self.orders}
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.requests = 0
+        self.connections = 0
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.rng = random.Random(seed)
+        self.fault_lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_requests = 0
+        self.throttled = 0
+        self.errors = 0
+        # (time, status, Retry-After seconds or None) for every request, to check client pacing against
+        self.request_log = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; without this Nagle adds ~40 ms per response
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                server.connections += 1
+
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.delay())
+                self._send(*(server.inject_fault() or server.route('GET', self.path, None)))
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                server.requests += 1
+                time.sleep(server.delay())
+                self._send(*(server.inject_fault() or server.route('POST', self.path, body)))
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    data = gzip.compress(data, compresslevel=1)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _Server((host, port), Handler)
+        scheme = 'http'
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self.httpd.socket = context.wrap_socket(self.httpd.socket, server_side=True)
+            scheme = 'https'
+        self.base_url = f'{scheme}://{host}:{self.httpd.server_address[1]}'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def delay(self):
+        """Seconds to hold this request before answering."""
+        if not self.latency_jitter:
+            return self.latency
+        with self.fault_lock:
+            return self.latency + self.rng.random() * self.latency_jitter
+
+    def inject_fault(self):
+        """Return a (status, payload, headers) fault for this request, or None to serve it normally."""
+        with self.fault_lock:
+            now = time.monotonic()
+            fault = self._fault(now)
+            status, headers = (fault[0], fault[2] if len(fault) > 2 else {}) if fault else (200, {})
+            retry_after = headers.get('Retry-After')
+            self.request_log.append((now, status, float(retry_after) if retry_after else None))
+            return fault
+
+    def _fault(self, now):
+        if self.rate_limit:
+            # Fixed one-second windows, like a simple API gateway quota
+            if now - self.window_start >= 1.0:
+                self.window_start = now
+                self.window_requests = 0
+            self.window_requests += 1
+            if self.window_requests > self.rate_limit:
+                self.throttled += 1
+                retry_after = f'{1.0 - (now - self.window_start):.2f}'
+                return 429, {'errors': [{'category': 'RATE_LIMIT_ERROR', 'code': 'RATE_LIMITED'}]}, \
+                    {'Retry-After': retry_after}
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            status = self.rng.choice(self.error_statuses)
+            code = ERROR_CODES.get(status, 'INTERNAL_SERVER_ERROR')
+            return status, {'errors': [{'category': 'API_ERROR', 'code': code}]}
+        return None
+
+    def route(self, method, path, body):
+        """Return (status, payload) for one request."""
+        not_found = (404, {'errors': [{'category': 'INVALID_REQUEST_ERROR', 'code': 'NOT_FOUND'}]})
+        url = urlsplit(path)
+        path = url.path
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        try:
+            return self._route(method, path, params, body, not_found)
+        except InvalidCursor:
+            return 400, {'errors': [{'category': 'INVALID_REQUEST_ERROR', 'code': 'INVALID_CURSOR',
+                                     'detail': 'The cursor does not belong to this query'}]}
+
+    def _route(self, method, path, params, body, not_found):
+        if method == 'GET' and path == '/v2/locations':
+            location_ids = sorted({order['location_id'] for order in self.orders})
+            return 200, {'locations': [{'id': location_id, 'name': location_id, 'status': 'ACTIVE'}
+                                       for location_id in location_ids]}
+        if method == 'GET' and path == '/v2/customers':
+            return 200, self.list_page(self.customers, 'customers', params)
+        if method == 'GET' and path == '/v2/payments':
+            keys, orders = self._sorted('created_at')
+            lo = bisect_left(keys, parse_time(params['begin_time'])) if 'begin_time' in params else 0
+            hi = bisect_left(keys, parse_time(params['end_time'])) if 'end_time' in params else len(keys)
+            return 200, self.list_page([self.payment_for(order) for order in orders[lo:hi]], 'payments', params)
+        if method == 'POST' and path == '/v2/orders/search':
+            return 200, self.search_orders(body)
+        if method == 'POST' and path == '/v2/orders/batch-retrieve':
+            orders = [self.orders_by_id[order_id] for order_id in body.get('order_ids', [])
+                      if order_id in self.orders_by_id]
+            return 200, ({'orders': orders} if orders else {})
+        if method == 'GET' and path.startswith('/v2/orders/'):
+            order = self.orders_by_id.get(path.rsplit('/', 1)[1])
+            return (200, {'order': order}) if order else not_found
+        if method == 'GET' and path.startswith('/v2/payments/'):
+            payment_id = path.rsplit('/', 1)[1]
+            order = self.orders_by_id.get(payment_id[len('PAY_'):])
+            return (200, {'payment': self.payment_for(order)}) if order else not_found
+        return not_found
+
+    @staticmethod
+    def encode_cursor(offset, query):
+        # The offset of the next page plus a digest of the query, so a cursor only resumes the query it came from
+        digest = hashlib.sha1(json.dumps(query, sort_keys=True).encode()).hexdigest()[:16]
+        return base64.urlsafe_b64encode(f'{offset}:{digest}'.encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode_cursor(cls, cursor, query):
+        """Offset encoded in cursor (0 for no cursor); raises InvalidCursor if it came from another query."""
+        if not cursor:
+            return 0
+        try:
+            offset = int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split(':')[0])
+        except (ValueError, UnicodeDecodeError):
+            raise InvalidCursor(cursor)
+        if cls.encode_cursor(offset, query) != cursor:
+            raise InvalidCursor(cursor)
+        return offset
+
+    @classmethod
+    def list_page(cls, records, key, params):
+        # List endpoints return at most 100 per page
+        query = {name: value for name, value in params.items() if name not in ('cursor', 'limit')}
+        offset = cls.decode_cursor(params.get('cursor'), query)
+        limit = min(int(params.get('limit', 100)), 100)
+        page = records[offset:offset + limit]
+        result = {key: page} if page else {}
+        if offset + limit < len(records):
+            result['cursor'] = cls.encode_cursor(offset + limit, query)
+        return result
+
+    @staticmethod
+    def payment_for(order):
+        return {
+            'id': 'PAY_' + order['id'],
+            'order_id': order['id'],
+            'location_id': order['location_id'],
+            'created_at': order['created_at'],
+            'amount_money': order['total_money'],
+            'status': 'COMPLETED',
+        }
+
+    def upsert_order(self, order):
+        """Insert or replace an order, e.g. to simulate an update between incremental syncs."""
+        self.orders = [existing for existing in self.orders if existing['id'] != order['id']] + [order]
+        self.orders_by_id[order['id']] = order
+        self.sorted_by = {}
+
+    def _sorted(self, field, location_ids=None):
+        key = (field, tuple(sorted(location_ids)) if location_ids else None)
+        if key not in self.sorted_by:
+            orders = [order for order in self.orders if not location_ids or order['location_id'] in location_ids]
+            # Sorted and searched as parsed times, never as strings
+            times = [parse_time(order[field]) for order in orders]
+            order_by_time = sorted(range(len(orders)), key=times.__getitem__)
+            self.sorted_by[key] = ([times[idx] for idx in order_by_time], [orders[idx] for idx in order_by_time])
+        return self.sorted_by[key]
+
+    def search_orders(self, body):
+        # Filter and sort on created_at or updated_at, whichever the request names
+        date_filter = body.get('query', {}).get('filter', {}).get('date_time_filter', {})
+        field = 'updated_at' if 'updated_at' in date_filter else 'created_at'
+        time_range = date_filter.get(field, {})
+        keys, orders = self._sorted(field, body.get('location_ids'))
+        lo = bisect_left(keys, parse_time(time_range['start_at'])) if 'start_at' in time_range else 0
+        hi = bisect_left(keys, parse_time(time_range['end_at'])) if 'end_at' in time_range else len(keys)
+        descending = body.get('query', {}).get('sort', {}).get('sort_order') == 'DESC'
+
+        # The cursor carries the offset of the next page inside the filtered, sorted range
+        query = {name: value for name, value in body.items() if name not in ('cursor', 'limit')}
+        offset = self.decode_cursor(body.get('cursor'), query)
+        limit = min(body.get('limit', 500), 1000)
+        if descending:
+            page = orders[max(hi - offset - limit, lo):hi - offset][::-1]
+        else:
+            page = orders[lo + offset:min(lo + offset + limit, hi)]
+
+        result = {'orders': page} if page else {}
+        if lo + offset + limit < hi:
+            result['cursor'] = self.encode_cursor(offset + limit, query)
+        return result
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve synthetic Square orders, payments and customers locally.')
+    parser.add_argument('--orders', type=int, default=100_000, help='number of synthetic orders')
+    parser.add_argument('--locations', type=int, default=1, help='number of locations')
+    parser.add_argument('--customers', type=int, default=1_000, help='number of synthetic customers')
+    parser.add_argument('--begin', default='2024-01-01T00:00:00Z', help='first order time')
+    parser.add_argument('--end', default='2024-12-31T23:59:59Z', help='last order time')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every request')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='up to this many more seconds, at random')
+    parser.add_argument('--rate-limit', type=int, help='requests per second before answering 429')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with a 5xx')
+    parser.add_argument('--error-status', type=int, action='append',
+                        help='status for injected errors; repeat to mix several (default 503)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from order_generator import OrderGenerator
+
+    locations = [f'LOC{idx}' for idx in range(args.locations)]
+    orders = OrderGenerator(locations=locations, seed=args.seed).orders(args.orders, args.begin, args.end)
+    server = MockSquareServer(orders, latency=args.latency, host=args.host, port=args.port,
+                              customers=generate_customers(args.customers, args.seed), rate_limit=args.rate_limit,
+                              error_rate=args.error_rate, seed=args.seed, latency_jitter=args.latency_jitter,
+                              error_statuses=args.error_status or (503,))
+    with server:
+        print(f'Serving {len(orders)} orders for {", ".join(locations)} at {server.base_url} (Ctrl-C to stop)')
+        print(f'    SQUARE_BASE_URL={server.base_url}')
+        try:
+            while server.thread.is_alive():
+                server.thread.join(1.0)
+        except KeyboardInterrupt:
+            pass
+    print(f'{server.requests} requests, {server.throttled} throttled, {server.errors} failed')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# (name, variations, base price in cents, relative popularity)
+DEFAULT_MENU = [
+    ('Latte', ('Small', 'Medium', 'Large'), 450, 30),
+    ('Drip Coffee', ('Small', 'Large'), 275, 26),
+    ('Cappuccino', ('Regular',), 425, 14),
+    ('Americano', ('Small', 'Large'), 350, 12),
+    ('Cold Brew', ('Regular', 'Large'), 475, 10),
+    ('Chai Latte', ('Regular',), 475, 8),
+    ('Mocha', ('Regular',), 500, 6),
+    ('Hot Chocolate', ('Regular',), 375, 4),
+    ('Tea', ('Regular',), 300, 5),
+    ('Croissant', ('Plain', 'Almond', 'Chocolate'), 375, 12),
+    ('Muffin', ('Blueberry', 'Bran'), 325, 9),
+    ('Bagel', ('Plain', 'Everything'), 300, 8),
+    ('Scone', ('Regular',), 350, 5),
+    ('Cookie', ('Chocolate Chip', 'Oatmeal'), 250, 7),
+    ('Breakfast Sandwich', ('Bacon', 'Veggie'), 750, 9),
+    ('Avocado Toast', ('Regular',), 900, 4),
+    ('Turkey Sandwich', ('Regular',), 1050, 5),
+    ('Salad', ('Regular',), 1100, 3),
+    ('Soup', ('Cup', 'Bowl'), 600, 3),
+    ('Bottled Water', ('Regular',), 200, 4),
+]
+
+# Busy periods in local time as (hour, spread in hours, share of orders): morning rush, lunch, afternoon
+DEFAULT_PEAKS = [(7.75, 1.0, 0.45), (12.5, 1.25, 0.35), (15.5, 1.5, 0.20)]
+
+# Relative order volume Monday..Sunday
+DEFAULT_WEEKDAY_WEIGHTS = (1.0, 1.0, 1.0, 1.05, 1.15, 1.3, 1.1)
+
+
+def _utc(rfc3339):
+    return datetime.fromisoformat(rfc3339).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class OrderGenerator:
+    """Seeded generator of realistic Square order JSON for benchmarks and offline testing.
+
+    menu is a list of (name, variations, price_cents, popularity). Each order's basket size is
+    1 + Poisson(basket_mean - 1) capped at max_basket, items are drawn by popularity, and quantities follow
+    quantity_weights (share of 1, 2, 3, ...). Creation times fall on days weighted by weekday_weights and at
+    local times drawn from the peaks mixture, kept within opening_hours. Orders are spread over locations in
+    proportion to location_weights. The same seed always gives the same orders.
+    """
+
+    def __init__(self, menu=DEFAULT_MENU, locations=('MOCKLOCATION',), location_weights=None, basket_mean=2.2,
+                 max_basket=12, quantity_weights=(0.86, 0.11, 0.03), peaks=DEFAULT_PEAKS,
+                 weekday_weights=DEFAULT_WEEKDAY_WEIGHTS, opening_hours=(6, 20), timezone='US/Eastern',
+                 canceled_rate=0.0, id_prefix='SYN', seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.locations = list(locations)
+        weights = np.asarray(location_weights or [1.0] * len(self.locations), dtype=float)
+        self.location_p = weights / weights.sum()
+        self.basket_mean = basket_mean
+        self.max_basket = max_basket
+        self.quantity_p = np.asarray(quantity_weights) / np.sum(quantity_weights)
+        self.peaks = np.asarray(peaks, dtype=float)
+        self.weekday_weights = np.asarray(weekday_weights, dtype=float)
+        self.opening_hours = opening_hours
+        self.timezone = timezone
+        self.canceled_rate = canceled_rate
+        self.id_prefix = id_prefix
+        self.generated = 0
+
+        # One catalog entry per (item, variation); popularity is split evenly across an item's variations
+        self.catalog = []
+        popularity = []
+        for item_idx, (name, variations, price, weight) in enumerate(menu):
+            for variation_idx, variation in enumerate(variations):
+                # Larger sizes cost a little more
+                self.catalog.append((f'ITEM_{item_idx:03d}_{variation_idx}', name, variation,
+                                     price + 50 * variation_idx))
+                popularity.append(weight / len(variations))
+        self.catalog_p = np.asarray(popularity) / np.sum(popularity)
+
+    def created_at(self, n_orders, begin_time, end_time):
+        """n_orders sorted UTC creation timestamps (datetime64[ms]) following the weekday and peak weights."""
+        begin = pd.Timestamp(_utc(begin_time)).tz_localize('UTC').tz_convert(self.timezone)
+        end = pd.Timestamp(_utc(end_time)).tz_localize('UTC').tz_convert(self.timezone)
+        days = pd.date_range(begin.normalize().tz_localize(None), end.normalize().tz_localize(None), freq='D')
+        day_p = self.weekday_weights[days.weekday]
+        day = days.values[self.rng.choice(len(days), size=n_orders, p=day_p / day_p.sum())]
+
+        peak = self.rng.choice(len(self.peaks), size=n_orders, p=self.peaks[:, 2] / self.peaks[:, 2].sum())
+        hours = self.rng.normal(self.peaks[peak, 0], self.peaks[peak, 1])
+        # Redraw times outside opening hours rather than clipping, which would pile orders up at opening time
+        closed = (hours < self.opening_hours[0]) | (hours >= self.opening_hours[1])
+        while closed.any():
+            hours[closed] = self.rng.normal(self.peaks[peak[closed], 0], self.peaks[peak[closed], 1])
+            closed = (hours < self.opening_hours[0]) | (hours >= self.opening_hours[1])
+        local = day + (hours * 3_600_000).astype('timedelta64[ms]')
+
+        # Ambiguous fall-back times take the first (daylight) reading; skipped spring-forward times move ahead
+        utc = (pd.DatetimeIndex(local).tz_localize(self.timezone, ambiguous=np.ones(n_orders, dtype=bool),
+                                                   nonexistent='shift_forward')
+               .tz_convert('UTC').tz_localize(None).values.astype('datetime64[ms]'))
+        # Days at the edges of the range are only partly inside it
+        utc = utc[(utc >= np.datetime64(_utc(begin_time), 'ms')) & (utc < np.datetime64(_utc(end_time), 'ms'))]
+        while len(utc) < n_orders:
+            utc = np.concatenate([utc, self.created_at(n_orders - len(utc), begin_time, end_time)])
+        return np.sort(utc[:n_orders])
+
+    def orders(self, n_orders, begin_time, end_time):
+        """Generate n_orders Square-shaped orders in created_at order."""
+        created = self.created_at(n_orders, begin_time, end_time)
+        created_at = np.char.add(np.datetime_as_string(created, unit='ms').astype(str), 'Z').tolist()
+        # Most orders close within a few minutes of being opened
+        updated = created + self.rng.exponential(120_000, size=n_orders).astype('timedelta64[ms]')
+        updated_at = np.char.add(np.datetime_as_string(updated, unit='ms').astype(str), 'Z').tolist()
+
+        sizes = np.minimum(self.rng.poisson(self.basket_mean - 1, size=n_orders) + 1, self.max_basket)
+        item_codes = self.rng.choice(len(self.catalog), size=int(sizes.sum()), p=self.catalog_p).tolist()
+        quantities = (self.rng.choice(len(self.quantity_p), size=len(item_codes), p=self.quantity_p) + 1).tolist()
+        location_codes = self.rng.choice(len(self.locations), size=n_orders, p=self.location_p).tolist()
+        canceled = (self.rng.random(n_orders) < self.canceled_rate).tolist()
+
+        orders = []
+        position = 0
+        for idx, size in enumerate(sizes.tolist()):
+            order_id = f'{self.id_prefix}{self.generated + idx:012d}'
+            line_items = []
+            order_total = 0
+            for line in range(size):
+                catalog_object_id, name, variation_name, price = self.catalog[item_codes[position]]
+                quantity = quantities[position]
+                position += 1
+                total = price * quantity
+                order_total += total
+                line_items.append({
+                    'uid': f'{order_id}-{line}',
+                    'catalog_object_id': catalog_object_id,
+                    'quantity': str(quantity),
+                    'name': name,
+                    'variation_name': variation_name,
+                    'base_price_money': {'amount': price, 'currency': 'USD'},
+                    'gross_sales_money': {'amount': total, 'currency': 'USD'},
+                    'total_tax_money': {'amount': 0, 'currency': 'USD'},
+                    'total_discount_money': {'amount': 0, 'currency': 'USD'},
+                    'total_money': {'amount': total, 'currency': 'USD'},
+                })
+            orders.append({
+                'id': order_id,
+                'location_id': self.locations[location_codes[idx]],
+                'line_items': line_items,
+                'created_at': created_at[idx],
+                'updated_at': updated_at[idx],
+                'state': 'CANCELED' if canceled[idx] else 'COMPLETED',
+                'version': 4,
+                'total_money': {'amount': order_total, 'currency': 'USD'},
+                'total_tax_money': {'amount': 0, 'currency': 'USD'},
+                'total_discount_money': {'amount': 0, 'currency': 'USD'},
+                'source': {'name': 'Square Point of Sale'},
+            })
+        self.generated += n_orders
+        return orders
+
+    def chunks(self, n_orders, begin_time, end_time, chunk_size=50_000):
+        """Yield n_orders in lists of at most chunk_size, so millions of orders never sit in memory at once.
+
+        Each chunk spans the whole time range, so chunks are not in created_at order relative to each other.
+        """
+        for start in range(0, n_orders, chunk_size):
+            yield self.orders(min(chunk_size, n_orders - start), begin_time, end_time)
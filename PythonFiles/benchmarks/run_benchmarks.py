@@ -0,0 +1,244 @@
+"""Time every pipeline stage on synthetic orders at several scales and save the results as JSON.
+
+    python run_benchmarks.py --sizes 1000 10000 100000 1000000
+    python run_benchmarks.py --sizes 10000000 --fetch-limit 0 --out big.json
+    python run_benchmarks.py --compare results/abc1234.json
+
+Stages per size: generate (synthetic order JSON), fetch (retrieve_all_orders against the local mock server, only
+up to --fetch-limit orders), flatten (orders_to_dataframe), type (to_store_frame, the store's typed layout),
+analyze_pairs and analyze_time_of_day. Orders are generated and flattened in chunks so 10M orders fit in memory.
+Every size runs in a fresh process so its peak RSS is its own. Results are written to results/<commit>.json,
+so runs from two commits can be compared with --compare.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+# Make the PythonFiles modules importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from instrumentation import current_rss, max_rss
+
+BEGIN_TIME = '2023-01-01T00:00:00Z'
+END_TIME = '2024-12-31T23:59:59Z'
+STAGES = ['generate', 'fetch', 'flatten', 'type', 'analyze_pairs', 'analyze_time_of_day']
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+class StageTimer:
+    """Accumulates wall time and peak RSS per stage; a stage may be entered many times (once per chunk).
+
+    A background thread samples RSS every interval seconds, so short spikes between samples can be missed.
+    """
+
+    def __init__(self, interval=0.005):
+        self.seconds = {}
+        self.peak = {}
+        self.interval = interval
+        self.sample_peak = 0
+        self.stop = threading.Event()
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+        self.sampler.start()
+
+    def _sample(self):
+        while not self.stop.wait(self.interval):
+            self.sample_peak = max(self.sample_peak, current_rss() or 0)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self.sample_peak = current_rss() or 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+            peak = max(self.sample_peak, current_rss() or 0)
+            self.peak[name] = max(self.peak.get(name, 0), peak)
+
+    def close(self):
+        self.stop.set()
+        self.sampler.join()
+
+    def report(self):
+        return {name: {'seconds': round(self.seconds[name], 4),
+                       'peak_rss_mb': round(self.peak[name] / 2 ** 20, 1) if self.peak[name] else None}
+                for name in STAGES if name in self.seconds}
+
+
+def fetch_all(orders, locations, windows):
+    """Serve orders from the mock server and fetch them back with retrieve_all_orders, one location at a time."""
+    import pull_data_and_analyze as pda
+    from mock_square import MockSquareServer
+
+    with MockSquareServer(orders, latency=0) as server:
+        pda.set_base_url(server.base_url)
+        fetched = 0
+        # retrieve_all_orders prints every page's last order; keep that cost but not the output
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for location_id in locations:
+                fetched += len(pda.retrieve_all_orders(location_id, BEGIN_TIME, END_TIME, windows=windows))
+    assert fetched == len(orders), f'fetched {fetched} of {len(orders)} orders'
+
+
+def run_size(n_orders, config):
+    """Run every stage once on n_orders synthetic orders; meant to run in its own process."""
+    import pandas as pd
+
+    import stats
+    from order_generator import OrderGenerator
+    from order_schema import union_categories
+    from order_store import to_store_frame
+    from pull_data_and_analyze import orders_to_dataframe
+
+    locations = [f'LOC{idx}' for idx in range(config['locations'])]
+    generator = OrderGenerator(locations=locations, location_weights=list(range(len(locations), 0, -1)),
+                               basket_mean=config['basket_mean'], seed=config['seed'])
+    timer = StageTimer()
+    fetch = n_orders <= config['fetch_limit']
+    kept = []
+    frames = []
+    chunks = generator.chunks(n_orders, BEGIN_TIME, END_TIME, config['chunk_size'])
+    while True:
+        with timer.stage('generate'):
+            orders = next(chunks, None)
+        if orders is None:
+            break
+        if fetch:
+            kept.extend(orders)
+        with timer.stage('flatten'):
+            df = orders_to_dataframe(orders)
+        del orders
+        with timer.stage('type'):
+            frames.append(to_store_frame(df))
+        del df
+
+    if fetch:
+        with timer.stage('fetch'):
+            fetch_all(kept, locations, config['windows'])
+        del kept
+
+    with timer.stage('type'):
+        # Chunks saw different subsets of the menu, so re-unify the categories as one store read would
+        df = union_categories(pd.concat(frames, ignore_index=True))
+    del frames
+    with timer.stage('analyze_pairs'):
+        stats.analyze_pairs(df, workers=config['workers'])
+    with timer.stage('analyze_time_of_day'):
+        stats.analyze_time_of_day(df)
+    timer.close()
+
+    max_rss_bytes = max_rss()
+    return {
+        'orders': n_orders,
+        'line_items': len(df),
+        'max_rss_mb': round(max_rss_bytes / 2 ** 20, 1) if max_rss_bytes else None,
+        'stages': timer.report(),
+    }
+
+
+def git_commit():
+    """(short commit hash, whether the tree has uncommitted changes), or (None, None) outside a git checkout."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=here, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=here,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def run(sizes, config):
+    """Benchmark every size in a fresh worker process and return the JSON-ready results."""
+    commit, dirty = git_commit()
+    results = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': config,
+        'runs': [],
+    }
+    for n_orders in sizes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            result = executor.submit(run_size, n_orders, config).result()
+        results['runs'].append(result)
+        print_run(result)
+    return results
+
+
+def print_run(result):
+    stages = '  '.join(f'{name} {stage["seconds"]:.2f}s' for name, stage in result['stages'].items())
+    print(f'{result["orders"]:>10} orders {result["line_items"]:>10} items  {stages}  '
+          f'max RSS {result["max_rss_mb"]} MB')
+
+
+def compare(old, new):
+    """Print each stage's time in new against old, for every order count both runs share."""
+    old_runs = {run['orders']: run for run in old['runs']}
+    print(f'{old.get("commit")} -> {new.get("commit")}')
+    print(f'{"orders":>10} {"stage":>20} {"old s":>9} {"new s":>9} {"speedup":>8} {"old MB":>8} {"new MB":>8}')
+    for new_run in new['runs']:
+        old_run = old_runs.get(new_run['orders'])
+        if not old_run:
+            continue
+        for name, stage in new_run['stages'].items():
+            old_stage = old_run['stages'].get(name)
+            if not old_stage:
+                continue
+            speedup = old_stage['seconds'] / stage['seconds'] if stage['seconds'] else float('inf')
+            print(f'{new_run["orders"]:>10} {name:>20} {old_stage["seconds"]:>9.3f} {stage["seconds"]:>9.3f} '
+                  f'{speedup:>7.2f}x {old_stage["peak_rss_mb"] or 0:>8.0f} {stage["peak_rss_mb"] or 0:>8.0f}')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Benchmark the order pipeline on synthetic Square orders.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000],
+                        help='order counts to run, e.g. 1000 ... 10000000')
+    parser.add_argument('--fetch-limit', type=int, default=200_000,
+                        help='skip the mock-server fetch stage above this many orders')
+    parser.add_argument('--locations', type=int, default=3, help='number of locations')
+    parser.add_argument('--basket-mean', type=float, default=2.2, help='mean line items per order')
+    parser.add_argument('--windows', type=int, default=4, help='time sub-windows fetched in parallel')
+    parser.add_argument('--workers', type=int, help='processes for analyze_pairs')
+    parser.add_argument('--chunk-size', type=int, default=50_000, help='orders generated and flattened at once')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='results file (default results/<commit>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare against an earlier results file')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = {'fetch_limit': args.fetch_limit, 'locations': args.locations, 'basket_mean': args.basket_mean,
+              'windows': args.windows, 'workers': args.workers, 'chunk_size': args.chunk_size, 'seed': args.seed}
+    results = run(args.sizes, config)
+
+    out = args.out
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = results['commit'] or 'local'
+        out = os.path.join(RESULTS_DIR, f'{name}{"-dirty" if results["dirty"] else ""}.json')
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'Wrote {out}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
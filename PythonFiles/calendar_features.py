@@ -0,0 +1,139 @@
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import USFederalHolidayCalendar
+
+from instrumentation import traced
+from order_schema import STRING_DTYPE
+from order_store import read_orders
+
+NS_PER_DAY = 86_400 * 10 ** 9
+NS_PER_MINUTE = 60 * 10 ** 9
+
+# Daypart boundaries in local hours: [start, next start)
+DAYPARTS = ['overnight', 'early', 'morning', 'midday', 'afternoon', 'evening']
+DAYPART_STARTS = [0, 5, 7, 11, 14, 17]
+
+
+def _local_ns(created_at, timezone):
+    # Local wall-clock epoch nanoseconds, indexed like the parsed, non-missing input rows
+    created_at = pd.to_datetime(pd.Series(created_at), format='ISO8601', utc=True, errors='coerce').dropna()
+    local = created_at.dt.tz_convert(timezone).dt.tz_localize(None)
+    return local.index, local.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def _codes(local_ns):
+    days = local_ns // NS_PER_DAY
+    minute_of_day = (local_ns % NS_PER_DAY) // NS_PER_MINUTE
+    # 1970-01-01 was a Thursday; weekday 0 is Monday
+    weekday = (days + 3) % 7
+    year = days.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+
+    # An ISO week belongs to the year holding its Thursday and counts from that year's first Thursday's week
+    thursday = days - weekday + 3
+    iso_year = thursday.astype('datetime64[D]').astype('datetime64[Y]')
+    iso_year_start = iso_year.astype('datetime64[D]').astype(np.int64)
+    week = (thursday - iso_year_start) // 7 + 1
+    return days, year, iso_year.astype(np.int64) + 1970, week, weekday, minute_of_day
+
+
+def local_time_codes(created_at, timezone='US/Eastern'):
+    """Integer (ISO year, ISO week, weekday, minute of day) arrays for every parseable timestamp, local to timezone.
+
+    Weekday is 0 = Monday. The ISO year is the year of the week's Thursday, so it differs from the calendar year
+    for a few days around New Year (2024-12-30 is in ISO week 1 of 2025). Everything is integer arithmetic on the
+    local epoch nanoseconds; no strings are built.
+    """
+    _, local_ns = _local_ns(created_at, timezone)
+    _, _, iso_year, week, weekday, minute_of_day = _codes(local_ns)
+    return iso_year, week, weekday, minute_of_day
+
+
+def iso_calendar_years(iso_year, week, weekday):
+    """Calendar year of each (ISO year, ISO week, weekday) date."""
+    iso_year = np.asarray(iso_year, dtype=np.int64)
+    # January 4th is always in ISO week 1; step back to that week's Monday, then forward to the date
+    january_4 = (iso_year - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype(np.int64) + 3
+    days = january_4 - (january_4 + 3) % 7 + (np.asarray(week, dtype=np.int64) - 1) * 7 + np.asarray(weekday)
+    return days.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+
+
+@traced(rows='input')
+def calendar_features(created_at, timezone='US/Eastern', holidays=None):
+    """Local calendar features for each timestamp in one vectorized pass, as compact columns.
+
+    Returns local_date, year, month, iso_week, weekday (0 = Monday), hour, minute, minute_of_day, is_weekend,
+    is_holiday (US federal holidays, or the given holidays) and a daypart categorical. The index follows
+    created_at; unparseable timestamps are left out.
+    """
+    index, local_ns = _local_ns(created_at, timezone)
+    days, year, _, week, weekday, minute_of_day = _codes(local_ns)
+    local_date = days.astype('datetime64[D]')
+    hour = minute_of_day // 60
+
+    if holidays is None:
+        if len(days):
+            holidays = USFederalHolidayCalendar().holidays(local_date.min(), local_date.max())
+        else:
+            holidays = []
+    holiday_days = np.asarray(pd.to_datetime(holidays), dtype='datetime64[D]')
+
+    daypart = np.searchsorted(DAYPART_STARTS, hour, side='right') - 1
+    return pd.DataFrame({
+        'local_date': local_date,
+        'year': year.astype(np.int16),
+        'month': (local_date.astype('datetime64[M]').astype(np.int64) % 12 + 1).astype(np.int8),
+        'iso_week': week.astype(np.int8),
+        'weekday': weekday.astype(np.int8),
+        'hour': hour.astype(np.int8),
+        'minute': (minute_of_day % 60).astype(np.int8),
+        'minute_of_day': minute_of_day.astype(np.int16),
+        'is_weekend': weekday >= 5,
+        'is_holiday': np.isin(local_date, holiday_days),
+        'daypart': pd.Categorical.from_codes(daypart, categories=DAYPARTS, ordered=True),
+    }, index=index)
+
+
+def cache_path(root, timezone='US/Eastern'):
+    # A leading underscore keeps the cache out of the store's Parquet dataset
+    return os.path.join(root, f"_calendar_features-{timezone.replace('/', '_')}.parquet")
+
+
+@traced()
+def store_calendar_features(root, timezone='US/Eastern'):
+    """Per-order calendar features for every order in the store at root, indexed by order_id.
+
+    Cached next to the store; only orders that are new or whose created_at changed since the last call are
+    recomputed, and the cache is rewritten only when something changed.
+    """
+    path = cache_path(root, timezone)
+    orders = read_orders(root, columns=['order_id', 'created_at']).drop_duplicates('order_id')
+    orders = orders.set_index('order_id')['created_at'].dropna()
+
+    cached = None
+    if os.path.exists(path):
+        # Parquet has no seconds unit, so local_date comes back as milliseconds; order_id comes back as objects
+        # unless it is read the way the store reads it
+        cached = pd.read_parquet(path).astype({'local_date': 'datetime64[s]'})
+        cached.index = cached.index.astype(STRING_DTYPE)
+    if cached is not None:
+        still_valid = (cached['created_at'].reindex(orders.index) == orders).to_numpy()
+        missing = orders[~still_valid]
+        # Nothing new, changed or deleted: serve the cache as is
+        if missing.empty and len(cached) == len(orders):
+            return cached.drop(columns='created_at')
+        cached = cached.loc[orders.index[still_valid]]
+    else:
+        missing = orders
+
+    features = calendar_features(missing, timezone).assign(created_at=missing)
+    features = pd.concat([cached, features]) if cached is not None else features
+    features.index.name = 'order_id'
+    features.to_parquet(path)
+    return features.drop(columns='created_at')
+
+
+def with_calendar_features(df, root, timezone='US/Eastern'):
+    """df (line items from the store at root) with the cached calendar features joined on order_id."""
+    return df.join(store_calendar_features(root, timezone), on='order_id')
@@ -0,0 +1,186 @@
+"""Command line entry point.
+
+    python cli.py fetch --location ZE934VV8RCWGF --begin 2024-09-01T00:00:00Z --end 2024-09-30T23:59:59Z --store orders_store
+    python cli.py fetch --base-url http://127.0.0.1:8080 --begin 2024-01-01T00:00:00Z --end 2024-12-31T23:59:59Z --store mock_store
+    python cli.py analyze pairs --store orders_store --top 20
+    python cli.py analyze time --store orders_store --by day
+    python cli.py plot pairs --store orders_store --item Latte
+    python cli.py --report run.json --profile analyze_pairs analyze pairs --store orders_store
+
+Only argparse is imported up front; pandas, pyarrow, scipy and plotly are loaded by the subcommand that needs them.
+"""
+import argparse
+import os
+import sys
+
+DEFAULT_STORE = os.getenv('WAYPOINT_ORDER_STORE')
+
+
+def fetch(args):
+    import pull_data_and_analyze as pda
+
+    if args.base_url:
+        pda.set_base_url(args.base_url)
+    location_ids = args.location or pda.retrieve_locations()
+    if args.jsonl:
+        # Raw orders, one JSON object per line; needs neither pandas nor pyarrow
+        import json
+
+        count = 0
+        with open(args.jsonl, 'w', encoding='utf-8') as f:
+            for location_id in location_ids:
+                for order in pda.retrieve_all_orders(location_id, args.begin, args.end, windows=args.windows):
+                    f.write(json.dumps(order) + '\n')
+                    count += 1
+        print(f'Wrote {count} orders to {args.jsonl}')
+    elif len(location_ids) > 1:
+        from locations import fetch_locations
+
+        counts = fetch_locations(args.store, args.begin, args.end, location_ids, args.windows, args.batched)
+        for location_id, count in counts.items():
+            print(f'{location_id}: {count} orders')
+    else:
+        import order_store
+
+        orders = pda.retrieve_all_orders(location_ids[0], args.begin, args.end, windows=args.windows)
+        order_store.write_orders(pda.orders_to_dataframe(orders), args.store)
+        print(f'Wrote {len(orders)} orders to {args.store}')
+
+
+def load_orders(args):
+    from order_store import read_orders
+
+    return read_orders(args.store, begin_time=args.begin, end_time=args.end)
+
+
+def pair_counts(args):
+    import stats
+
+    return stats.analyze_pairs(load_orders(args), workers=args.workers)
+
+
+def pairs(args):
+    pairs_df = pair_counts(args)
+    if args.item:
+        from pair_queries import PairQueries
+
+        pairs_df = PairQueries.from_pairs(pairs_df).pairs_with(args.item)
+    return pairs_df
+
+
+def analyze_pairs(args):
+    print(pairs(args).head(args.top).to_string(index=False))
+
+
+def time_of_day(args):
+    import stats
+
+    # The cube kept next to the store covers the whole store; a date range is counted from the orders it selects
+    if args.begin or args.end:
+        return stats.analyze_time_of_day(load_orders(args))
+    return stats.analyze_time_of_day(store=args.store)
+
+
+def analyze_time(args):
+    by_time, by_day_time, by_year_day_time = time_of_day(args)
+    result = {'time': by_time, 'day': by_day_time, 'year': by_year_day_time}[args.by]
+    if args.out:
+        result.to_csv(args.out)
+        print(f'Wrote {len(result)} rows to {args.out}')
+    else:
+        print(result.to_string())
+
+
+def plot_pairs(args):
+    import stats
+
+    pairs_df = pair_counts(args)
+    if args.item:
+        from pair_queries import PairQueries
+
+        # Index once and hand the index over, rather than a subset the plot would index again
+        stats.plot_pairs_single_bar(PairQueries.from_pairs(pairs_df), args.item)
+    else:
+        stats.plot_pairs_heatmap(pairs_df)
+
+
+def plot_time(args):
+    import stats
+
+    _, by_day_time, by_year_day_time = time_of_day(args)
+    stats.plot_daily_time(by_day_time)
+    stats.plot_yearly_time(by_year_day_time)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description='Fetch Square orders and analyze them.')
+    parser.add_argument('--report', metavar='JSON', help='time every stage and write the run report here')
+    parser.add_argument('--profile', metavar='STAGE', help='profile one stage, e.g. analyze_pairs or http')
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile',
+                        help='profiler for --profile (default cprofile)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fetch_parser = commands.add_parser('fetch', help='download orders into the Parquet store (or JSON lines)')
+    fetch_parser.add_argument('--location', action='append',
+                              help='location id; repeat for several (default: every active location)')
+    fetch_parser.add_argument('--begin', required=True, help='RFC 3339 start, e.g. 2024-09-01T00:00:00Z')
+    fetch_parser.add_argument('--end', required=True, help='RFC 3339 end')
+    fetch_parser.add_argument('--windows', type=int, default=8, help='time sub-windows paged in parallel')
+    fetch_parser.add_argument('--batched', action='store_true',
+                              help='search up to 10 locations per request instead of one thread per location')
+    fetch_parser.add_argument('--base-url', help='API root, e.g. http://127.0.0.1:8080 for the local mock server '
+                                                 '(default $SQUARE_BASE_URL or Square production)')
+    target = fetch_parser.add_mutually_exclusive_group()
+    target.add_argument('--store', default=DEFAULT_STORE, help='order store root (default $WAYPOINT_ORDER_STORE)')
+    target.add_argument('--jsonl', help='write raw orders to this JSON lines file instead of the store')
+    fetch_parser.set_defaults(func=fetch)
+
+    def add_store_arguments(subparser):
+        subparser.add_argument('--store', default=DEFAULT_STORE, help='order store root (default $WAYPOINT_ORDER_STORE)')
+        subparser.add_argument('--begin', help='only orders created at or after this time')
+        subparser.add_argument('--end', help='only orders created at or before this time')
+
+    analyze_parser = commands.add_parser('analyze', help='print pair or time-of-day analyses from the store')
+    analyses = analyze_parser.add_subparsers(dest='analysis', required=True)
+    pairs_parser = analyses.add_parser('pairs', help='items bought together')
+    add_store_arguments(pairs_parser)
+    pairs_parser.add_argument('--top', type=int, default=20, help='number of pairs to show')
+    pairs_parser.add_argument('--item', help='only pairs containing this item')
+    pairs_parser.add_argument('--workers', type=int, help='count in this many processes')
+    pairs_parser.set_defaults(func=analyze_pairs)
+    time_parser = analyses.add_parser('time', help='purchases by time of day')
+    add_store_arguments(time_parser)
+    time_parser.add_argument('--by', choices=['time', 'day', 'year'], default='day',
+                             help='by time only, by day and time, or by year, day and time')
+    time_parser.add_argument('--out', help='write the table to this CSV file')
+    time_parser.set_defaults(func=analyze_time)
+
+    plot_parser = commands.add_parser('plot', help='show plotly charts')
+    plots = plot_parser.add_subparsers(dest='plot', required=True)
+    plot_pairs_parser = plots.add_parser('pairs', help='pair heatmap, or top partners of --item')
+    add_store_arguments(plot_pairs_parser)
+    plot_pairs_parser.add_argument('--item', help='bar chart of the items most often bought with this one')
+    plot_pairs_parser.set_defaults(func=plot_pairs, workers=None)
+    plot_time_parser = plots.add_parser('time', help='purchases by day and time, and year over year')
+    add_store_arguments(plot_time_parser)
+    plot_time_parser.set_defaults(func=plot_time)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'store', None) is None and not getattr(args, 'jsonl', None):
+        sys.exit('No order store given: pass --store or set WAYPOINT_ORDER_STORE')
+    if not (args.report or args.profile):
+        args.func(args)
+        return
+
+    import instrumentation
+
+    profile_dir = os.path.dirname(os.path.abspath(args.report)) if args.report else '.'
+    with instrumentation.run(args.command, args.report, args.profile, args.profiler, profile_dir):
+        args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+import order_store
+import pull_data_and_analyze as pda
+from instrumentation import traced
+
+PAYMENT_CATEGORICALS = ['location_id', 'status', 'source_type', 'currency', 'card_brand']
+
+# Fixed Arrow types for each export, so a batch where a column happens to be all missing (every payment paid in
+# cash has no card_brand) is still written as strings rather than the null type
+_DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+_TIMESTAMP = pa.timestamp('ns', tz='UTC')
+CUSTOMER_SCHEMA = pa.schema([
+    ('customer_id', pa.string()),
+    ('created_at', _TIMESTAMP),
+    ('updated_at', _TIMESTAMP),
+    ('given_name', pa.string()),
+    ('family_name', pa.string()),
+    ('email_address', pa.string()),
+    ('phone_number', pa.string()),
+    ('reference_id', pa.string()),
+    ('creation_source', _DICTIONARY),
+])
+PAYMENT_SCHEMA = pa.schema([
+    ('payment_id', pa.string()),
+    ('order_id', pa.string()),
+    ('customer_id', pa.string()),
+    ('location_id', _DICTIONARY),
+    ('created_at', _TIMESTAMP),
+    ('updated_at', _TIMESTAMP),
+    ('status', _DICTIONARY),
+    ('source_type', _DICTIONARY),
+    ('card_brand', _DICTIONARY),
+    ('currency', _DICTIONARY),
+    ('amount_cents', pa.int64()),
+    ('tip_cents', pa.int64()),
+    ('total_cents', pa.int64()),
+    ('refunded_cents', pa.int64()),
+    ('year', pa.int16()),
+    ('month', pa.int8()),
+])
+
+
+@traced(rows='input')
+def customers_to_dataframe(customers):
+    """Flatten one page of customers into typed columns."""
+    df = pd.DataFrame({
+        'customer_id': [customer.get('id') for customer in customers],
+        'created_at': [customer.get('created_at') for customer in customers],
+        'updated_at': [customer.get('updated_at') for customer in customers],
+        'given_name': [customer.get('given_name') for customer in customers],
+        'family_name': [customer.get('family_name') for customer in customers],
+        'email_address': [customer.get('email_address') for customer in customers],
+        'phone_number': [customer.get('phone_number') for customer in customers],
+        'reference_id': [customer.get('reference_id') for customer in customers],
+        'creation_source': [customer.get('creation_source') for customer in customers],
+    })
+    for column in ['created_at', 'updated_at']:
+        df[column] = pd.to_datetime(df[column], format='ISO8601', utc=True, errors='coerce')
+    df['creation_source'] = df['creation_source'].astype('category')
+    return df
+
+
+@traced(rows='input')
+def payments_to_dataframe(payments):
+    """Flatten one page of payments into typed columns with money as Int64 cents."""
+    def cents(payment, field):
+        return payment.get(field, {}).get('amount')
+
+    df = pd.DataFrame({
+        'payment_id': [payment.get('id') for payment in payments],
+        'order_id': [payment.get('order_id') for payment in payments],
+        'customer_id': [payment.get('customer_id') for payment in payments],
+        'location_id': [payment.get('location_id') for payment in payments],
+        'created_at': [payment.get('created_at') for payment in payments],
+        'updated_at': [payment.get('updated_at') for payment in payments],
+        'status': [payment.get('status') for payment in payments],
+        'source_type': [payment.get('source_type') for payment in payments],
+        'card_brand': [payment.get('card_details', {}).get('card', {}).get('card_brand') for payment in payments],
+        'currency': [payment.get('amount_money', {}).get('currency') for payment in payments],
+        'amount_cents': pd.array([cents(payment, 'amount_money') for payment in payments], dtype='Int64'),
+        'tip_cents': pd.array([cents(payment, 'tip_money') for payment in payments], dtype='Int64'),
+        'total_cents': pd.array([cents(payment, 'total_money') for payment in payments], dtype='Int64'),
+        'refunded_cents': pd.array([cents(payment, 'refunded_money') for payment in payments], dtype='Int64'),
+    })
+    for column in ['created_at', 'updated_at']:
+        df[column] = pd.to_datetime(df[column], format='ISO8601', utc=True, errors='coerce')
+    for column in PAYMENT_CATEGORICALS:
+        df[column] = df[column].astype('category')
+    # Payments whose created_at did not parse keep null keys and are stored in pyarrow's null partition
+    df['year'] = df['created_at'].dt.year.astype('Int16')
+    df['month'] = df['created_at'].dt.month.astype('Int8')
+    return df
+
+
+@traced()
+def export_pages(pages, flatten, store_path, state_path, partition_cols=None, schema=None, batch_records=20_000):
+    """Write pages to the columnar store in batches of about batch_records, checkpointing the cursor per batch.
+
+    pages yields (records, next_cursor). Pages are buffered so each file holds one large row group instead of
+    one 100-record page, and every batch is written with schema. The cursor is only checkpointed once its batch
+    is on disk; batch files are named after their first page number, so a batch that is written again after a
+    crash replaces its earlier copy instead of duplicating it.
+    """
+    state = pda.load_sync_state(state_path)
+    page_number = state.get('pages', 0)
+    records = state.get('records', 0)
+
+    buffered = []
+    batch_start = page_number
+    for page, cursor in pages:
+        buffered.extend(page)
+        page_number += 1
+        if len(buffered) >= batch_records or not cursor:
+            if buffered:
+                order_store.append_records(flatten(buffered), store_path, batch_start, partition_cols, schema)
+                records += len(buffered)
+            pda.save_sync_state(state_path, {'cursor': cursor, 'pages': page_number, 'records': records,
+                                             'complete': not cursor})
+            buffered = []
+            batch_start = page_number
+
+    print(f"Exported {records} records to {store_path}")
+    return records
+
+
+@traced()
+def export_customers(store_path, state_path, restart=False, client=None):
+    """Export every customer to a Parquet dataset, resuming from the checkpointed cursor if one exists."""
+    state = _start_state(state_path, restart)
+    if state.get('complete'):
+        print(f"Customer export in {store_path} is already complete; pass restart=True to redo it")
+        return state['records']
+    pages = pda.iter_list_pages(pda.url_customers, 'customers', {'limit': 100}, state.get('cursor'), client)
+    return export_pages(pages, customers_to_dataframe, store_path, state_path, schema=CUSTOMER_SCHEMA)
+
+
+@traced()
+def export_payments(store_path, state_path, begin_time=None, end_time=None, location_id=None, restart=False,
+                    client=None):
+    """Export every payment in [begin_time, end_time) to a Parquet dataset partitioned by year/month."""
+    state = _start_state(state_path, restart)
+    if state.get('complete'):
+        print(f"Payment export in {store_path} is already complete; pass restart=True to redo it")
+        return state['records']
+    params = {'limit': 100, 'sort_order': 'ASC'}
+    for name, value in [('begin_time', begin_time), ('end_time', end_time), ('location_id', location_id)]:
+        if value:
+            params[name] = value
+    pages = pda.iter_list_pages(pda.url_payments, 'payments', params, state.get('cursor'), client)
+    return export_pages(pages, payments_to_dataframe, store_path, state_path, order_store.PARTITION_COLUMNS,
+                        PAYMENT_SCHEMA)
+
+
+def _start_state(state_path, restart):
+    if restart and os.path.exists(state_path):
+        os.remove(state_path)
+    return pda.load_sync_state(state_path)
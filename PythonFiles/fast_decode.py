@@ -0,0 +1,67 @@
+import json
+
+from instrumentation import traced
+from order_columns import OrderColumnBuilder
+from pull_data_and_analyze import orders_to_dataframe
+
+# Optional fast decoders: msgspec decodes straight into typed structs and skips every field the pipeline
+# never reads; orjson is a faster drop-in for json. Without either, the standard library is used.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if msgspec is not None:
+    class Money(msgspec.Struct):
+        amount: int = 0
+
+    class LineItem(msgspec.Struct):
+        catalog_object_id: str | None = None
+        name: str | None = None
+        variation_name: str | None = None
+        quantity: str | None = None
+        base_price_money: Money | None = None
+        total_money: Money | None = None
+
+    class Order(msgspec.Struct):
+        id: str | None = None
+        location_id: str | None = None
+        created_at: str | None = None
+        updated_at: str | None = None
+        state: str | None = None
+        line_items: list[LineItem] = []
+        total_money: Money | None = None
+
+    class SearchOrdersPage(msgspec.Struct):
+        orders: list[Order] = []
+        cursor: str | None = None
+
+    _page_decoder = msgspec.json.Decoder(SearchOrdersPage)
+
+
+@traced()
+def decode_orders_page(content):
+    """Decode a raw /v2/orders/search response body into (orders, cursor) using the fastest decoder available.
+
+    With msgspec the orders are Order structs holding only the fields orders_to_dataframe reads;
+    otherwise they are plain dicts.
+    """
+    if msgspec is not None:
+        page = _page_decoder.decode(content)
+        return page.orders, page.cursor
+    result = orjson.loads(content) if orjson is not None else json.loads(content)
+    return result.get('orders', []), result.get('cursor')
+
+
+@traced(rows='input')
+def flatten_orders(orders):
+    """Flatten one decoded page into the same line-item DataFrame as orders_to_dataframe."""
+    if not orders or isinstance(orders[0], dict):
+        return orders_to_dataframe(orders)
+    return OrderColumnBuilder().extend_structs(orders).to_dataframe()
@@ -0,0 +1,318 @@
+"""Lightweight stage timing for the pipeline.
+
+Functions are wrapped with @traced and inner steps with `with span('decode') as s: ... s.add(rows=...)`.
+Nothing is measured unless a run is active, so the wrappers cost one global lookup per call otherwise:
+
+    with instrumentation.run('nightly', report_path='run.json', profile='analyze_pairs'):
+        ...
+
+Each stage reports calls, wall time, CPU time, rows processed, bytes transferred and peak RSS. Spans of the same
+name are totalled, so overlapping spans (threads, nested windows) add up to more wall time than the run took.
+CPU time is process-wide, so it includes every thread busy during the span. Work inside worker processes is not
+recorded.
+"""
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def max_rss():
+    """Peak resident set size of this process in bytes, or None on platforms without the resource module."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Span:
+    """One timed stage in progress; add() counts the rows and bytes it handled."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.bytes = 0
+        self.peak_rss = 0
+
+    def add(self, rows=0, bytes=0):
+        self.rows += rows
+        self.bytes += bytes
+
+
+class StageStats:
+    """Totals over every span of one name."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.peak_rss = 0
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'calls': self.calls,
+            'wall_seconds': round(self.wall, 6),
+            'cpu_seconds': round(self.cpu, 6),
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'peak_rss_mb': round(self.peak_rss / 2 ** 20, 1) if self.peak_rss else None,
+        }
+
+
+class Run:
+    """Collects spans from every thread of one run and optionally profiles one stage.
+
+    profile names the stage to profile; every call of it is captured into one profile, written to profile_dir
+    when the run stops. profiler is 'cprofile' (a .prof file for pstats/snakeviz) or 'pyinstrument' (an .html
+    call tree, needs pyinstrument installed). Only one thread is profiled at a time.
+    """
+
+    def __init__(self, name='run', profile=None, profiler='cprofile', profile_dir='.', sample_interval=0.01):
+        self.name = name
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.open_spans = set()
+        self.sample_interval = sample_interval
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+
+        self.profile = profile
+        self.profiler_name = profiler
+        self.profile_dir = profile_dir
+        self.profiler = None
+        self.profiling = False
+        self.profile_path = None
+        if profile:
+            self.profiler = self._new_profiler(profiler)
+
+    @staticmethod
+    def _new_profiler(profiler):
+        if profiler == 'cprofile':
+            import cProfile
+
+            return cProfile.Profile()
+        if profiler == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                raise ImportError("profiler='pyinstrument' needs pyinstrument: pip install pyinstrument")
+            return Profiler()
+        raise ValueError(f"Unknown profiler {profiler!r}; use 'cprofile' or 'pyinstrument'")
+
+    def start(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.sampler.start()
+        return self
+
+    def stop(self):
+        self.wall = time.perf_counter() - self.wall_start
+        self.cpu = time.process_time() - self.cpu_start
+        self.stopped.set()
+        self.sampler.join()
+        if self.profiler is not None:
+            self.profile_path = self._write_profile()
+
+    def _sample(self):
+        # Peak memory is sampled, so spikes shorter than sample_interval can be missed
+        while not self.stopped.wait(self.sample_interval):
+            rss = current_rss()
+            if rss is None:
+                return
+            with self.lock:
+                for span in self.open_spans:
+                    span.peak_rss = max(span.peak_rss, rss)
+
+    def current(self):
+        """The innermost open span on this thread, or None."""
+        stack = getattr(self.local, 'stack', None)
+        return stack[-1] if stack else None
+
+    @contextlib.contextmanager
+    def span(self, name):
+        span = Span(name)
+        span.peak_rss = current_rss() or 0
+        stack = self.local.__dict__.setdefault('stack', [])
+        stack.append(span)
+        with self.lock:
+            self.open_spans.add(span)
+        profiling = self._start_profile(name)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield span
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            if profiling:
+                self._stop_profile()
+            stack.pop()
+            span.peak_rss = max(span.peak_rss, current_rss() or 0)
+            with self.lock:
+                self.open_spans.discard(span)
+                stats = self.stages.get(name)
+                if stats is None:
+                    stats = self.stages[name] = StageStats(name)
+                stats.calls += 1
+                stats.wall += wall
+                stats.cpu += cpu
+                stats.rows += span.rows
+                stats.bytes += span.bytes
+                stats.peak_rss = max(stats.peak_rss, span.peak_rss)
+
+    def _start_profile(self, name):
+        if name != self.profile:
+            return False
+        with self.lock:
+            # Skip calls nested inside, or concurrent with, one already being profiled
+            if self.profiling:
+                return False
+            self.profiling = True
+        if self.profiler_name == 'cprofile':
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+        return True
+
+    def _stop_profile(self):
+        if self.profiler_name == 'cprofile':
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+        with self.lock:
+            self.profiling = False
+
+    def _write_profile(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stem = os.path.join(self.profile_dir, f'{self.name}-{self.profile}')
+        if self.profiler_name == 'cprofile':
+            self.profiler.dump_stats(stem + '.prof')
+            return stem + '.prof'
+        if self.profiler.last_session is None:
+            # The stage never ran
+            return None
+        with open(stem + '.html', 'w', encoding='utf-8') as f:
+            f.write(self.profiler.output_html())
+        return stem + '.html'
+
+    def report(self):
+        """The run as a JSON-ready dict, stages in the order they first finished."""
+        peak = max_rss()
+        return {
+            'run': self.name,
+            'started_at': self.started_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'wall_seconds': round(self.wall, 6),
+            'cpu_seconds': round(self.cpu, 6),
+            'max_rss_mb': round(peak / 2 ** 20, 1) if peak else None,
+            'profile': self.profile_path,
+            'stages': [stats.as_dict() for stats in self.stages.values()],
+        }
+
+    def summary(self):
+        """Console table of the report."""
+        report = self.report()
+        lines = [f'{report["run"]}: {report["wall_seconds"]:.2f} s wall, {report["cpu_seconds"]:.2f} s CPU, '
+                 f'max RSS {report["max_rss_mb"]} MB',
+                 f'{"stage":<32} {"calls":>6} {"wall s":>9} {"cpu s":>9} {"rows":>11} {"MB in":>9} {"peak MB":>8}']
+        for stage in sorted(report['stages'], key=lambda stage: -stage['wall_seconds']):
+            lines.append(f'{stage["stage"]:<32} {stage["calls"]:>6} {stage["wall_seconds"]:>9.3f} '
+                         f'{stage["cpu_seconds"]:>9.3f} {stage["rows"]:>11} {stage["bytes"] / 2 ** 20:>9.2f} '
+                         f'{stage["peak_rss_mb"] or 0:>8.0f}')
+        if report['profile']:
+            lines.append(f'profile of {self.profile}: {report["profile"]}')
+        return '\n'.join(lines)
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+# The active run, set by run(); None means instrumentation is off
+_run = None
+
+
+@contextlib.contextmanager
+def run(name='run', report_path=None, profile=None, profiler='cprofile', profile_dir='.', quiet=False):
+    """Instrument everything inside the block as one run.
+
+    On exit the summary is printed (unless quiet) and the JSON report written to report_path if given.
+    """
+    global _run
+    active = Run(name, profile, profiler, profile_dir).start()
+    previous, _run = _run, active
+    try:
+        yield active
+    finally:
+        _run = previous
+        active.stop()
+        if report_path:
+            active.save(report_path)
+        if not quiet:
+            print(active.summary())
+
+
+def span(name):
+    """Context manager timing one stage; yields a Span whose add() counts rows and bytes."""
+    if _run is None:
+        return contextlib.nullcontext(Span(name))
+    return _run.span(name)
+
+
+def add(rows=0, bytes=0):
+    """Count rows or bytes against the innermost open span on this thread, if any."""
+    current = _run.current() if _run is not None else None
+    if current is not None:
+        current.add(rows, bytes)
+
+
+def traced(name=None, rows=None):
+    """Decorator running the function inside a span named after it.
+
+    rows='input' counts len() of the first argument, rows='result' len() of the return value.
+    Generators are not supported; put a span inside their loop instead.
+    """
+    def decorate(func):
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _run is None:
+                return func(*args, **kwargs)
+            with _run.span(stage) as current:
+                if rows == 'input' and args:
+                    current.add(rows=_length(args[0]))
+                result = func(*args, **kwargs)
+                if rows == 'result':
+                    current.add(rows=_length(result))
+                return result
+        return wrapper
+    return decorate
+
+
+def _length(value):
+    try:
+        return len(value)
+    except TypeError:
+        return 0
@@ -0,0 +1,114 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from baskets import Baskets
+from instrumentation import traced
+
+
+def tid_bitsets(baskets):
+    """One Python int per item whose bit b is set when basket b contains the item.
+
+    Intersecting two tid-lists is then a single big-int AND and its support a popcount, both in C.
+    """
+    X = baskets.incidence_matrix().tocsc()
+    bitsets = []
+    for code in range(X.shape[1]):
+        bits = np.zeros(X.shape[0], dtype=bool)
+        bits[X.indices[X.indptr[code]:X.indptr[code + 1]]] = True
+        bitsets.append(int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little'))
+    return bitsets
+
+
+@traced(rows='input')
+def frequent_itemsets(baskets, min_support=0.01, max_len=None):
+    """Eclat over bitset tid-lists: every itemset held by at least min_support of the baskets.
+
+    baskets is a Baskets or a line-item DataFrame. Returns the same layout as mlxtend's apriori with
+    use_colnames=True: 'support' as a fraction of baskets and 'itemsets' as frozensets of item names.
+    """
+    if not isinstance(baskets, Baskets):
+        baskets = Baskets.from_dataframe(baskets)
+    n_baskets = len(baskets)
+    if not n_baskets:
+        return pd.DataFrame({'support': pd.Series(dtype=float), 'itemsets': pd.Series(dtype=object)})
+    min_count = max(1, int(np.ceil(min_support * n_baskets - 1e-9)))
+
+    # Least frequent items first keeps the intersections on each branch as small as possible
+    support = baskets.item_support().to_numpy()
+    frequent = [code for code in np.argsort(support, kind='stable') if support[code] >= min_count]
+    bitsets = tid_bitsets(baskets)
+
+    found_codes = []
+    found_counts = []
+
+    def extend(prefix, candidates):
+        # candidates are (code, tid-list) pairs already known to be frequent together with prefix
+        for idx, (code, tids) in enumerate(candidates):
+            itemset = prefix + (code,)
+            found_codes.append(itemset)
+            found_counts.append(tids.bit_count())
+            if max_len is not None and len(itemset) >= max_len:
+                continue
+            children = []
+            for other, other_tids in candidates[idx + 1:]:
+                joint = tids & other_tids
+                if joint.bit_count() >= min_count:
+                    children.append((other, joint))
+            if children:
+                extend(itemset, children)
+
+    extend((), [(code, bitsets[code]) for code in frequent])
+
+    names = baskets.item_names
+    result = pd.DataFrame({
+        'support': np.asarray(found_counts, dtype=np.int64) / n_baskets,
+        'itemsets': [frozenset(names[list(codes)]) for codes in found_codes],
+    })
+    lengths = result['itemsets'].map(len)
+    return result.assign(_len=lengths).sort_values(['_len', 'support'], ascending=[True, False],
+                                                   kind='stable').drop(columns='_len').reset_index(drop=True)
+
+
+@traced(rows='input')
+def association_rules(itemsets_df, min_confidence=0.5, min_lift=None):
+    """Rules A -> C from every frequent itemset of two or more items.
+
+    Columns follow mlxtend's association_rules: antecedents, consequents, their supports, support,
+    confidence, lift, leverage and conviction. Every subset of a frequent itemset is itself frequent,
+    so all supports come straight from itemsets_df.
+    """
+    support_of = dict(zip(itemsets_df['itemsets'], itemsets_df['support']))
+    rows = []
+    for itemset, support in support_of.items():
+        if len(itemset) < 2:
+            continue
+        for size in range(1, len(itemset)):
+            for antecedent in combinations(sorted(itemset), size):
+                antecedent = frozenset(antecedent)
+                consequent = itemset - antecedent
+                confidence = support / support_of[antecedent]
+                if confidence < min_confidence:
+                    continue
+                consequent_support = support_of[consequent]
+                lift = confidence / consequent_support
+                if min_lift is not None and lift < min_lift:
+                    continue
+                rows.append((antecedent, consequent, support_of[antecedent], consequent_support, support,
+                             confidence, lift))
+
+    rules = pd.DataFrame(rows, columns=['antecedents', 'consequents', 'antecedent support',
+                                        'consequent support', 'support', 'confidence', 'lift'])
+    rules['leverage'] = rules['support'] - rules['antecedent support'] * rules['consequent support']
+    with np.errstate(divide='ignore'):
+        rules['conviction'] = np.where(rules['confidence'] < 1,
+                                       (1 - rules['consequent support']) / (1 - rules['confidence']), np.inf)
+    return rules.sort_values(['lift', 'confidence'], ascending=False, kind='stable').reset_index(drop=True)
+
+
+@traced(rows='input')
+def mine_rules(df, min_support=0.005, min_confidence=0.2, min_lift=1.0, max_len=None):
+    """Frequent itemsets and rules for a line-item DataFrame such as orders_df in one call."""
+    itemsets_df = frequent_itemsets(Baskets.from_dataframe(df), min_support, max_len)
+    return itemsets_df, association_rules(itemsets_df, min_confidence, min_lift)
@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import order_store
+from instrumentation import traced
+from order_schema import union_categories
+from pull_data_and_analyze import orders_to_dataframe, retrieve_locations, retrieve_orders_by_location
+from stats import analyze_pairs, analyze_time_of_day
+
+
+def location_root(root, location_id):
+    """Order store of one location inside a multi-location store root."""
+    return os.path.join(root, location_id)
+
+
+def stored_locations(root):
+    """Ids of every location with a store under root."""
+    return sorted(name for name in os.listdir(root)
+                  if os.path.isdir(os.path.join(root, name)) and not name.startswith(('_', '.')))
+
+
+@traced()
+def fetch_locations(root, begin_time, end_time, location_id_list=None, windows=1, batched=False, client=None):
+    """Fetch all locations' orders concurrently and write each location into its own store under root.
+
+    location_id_list defaults to every active location on the account. Returns {location_id: order count}.
+    """
+    location_id_list = location_id_list or retrieve_locations(client)
+    orders_by_location = retrieve_orders_by_location(location_id_list, begin_time, end_time, windows, batched,
+                                                     client=client)
+    for location_id, orders in orders_by_location.items():
+        if orders:
+            order_store.write_orders(orders_to_dataframe(orders), location_root(root, location_id))
+    return {location_id: len(orders) for location_id, orders in orders_by_location.items()}
+
+
+@traced(rows='result')
+def read_locations(root, location_id_list=None, columns=None, begin_time=None, end_time=None):
+    """Load several locations' stores into one frame (all stored locations by default)."""
+    frames = [order_store.read_orders(location_root(root, location_id), columns, begin_time, end_time)
+              for location_id in location_id_list or stored_locations(root)]
+    # Every location has its own categories, so union them
+    return union_categories(pd.concat(frames, ignore_index=True))
+
+
+@traced()
+def analyze_location(root, location_id, begin_time=None, end_time=None):
+    """Pair counts, time-of-day outputs and headline numbers for one location's store.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    store = location_root(root, location_id)
+    df = order_store.read_orders(store, begin_time=begin_time, end_time=end_time)
+    # The store's cube only answers for the whole store, not a date range
+    whole_store = begin_time is None and end_time is None
+    by_time, by_day_time, by_year_day_time = analyze_time_of_day(df, store=store if whole_store else None)
+    return {
+        'location_id': location_id,
+        'orders': df['order_id'].nunique(),
+        'line_items': len(df),
+        'revenue': df['total_money_cents'].sum() / 100,
+        'top_item': df['item_name'].value_counts().idxmax() if df['item_name'].notna().any() else None,
+        'pairs': analyze_pairs(df),
+        'by_time': by_time,
+        'by_day_time': by_day_time,
+        'by_year_day_time': by_year_day_time,
+    }
+
+
+def compare_locations(results):
+    """One row per location: volume, ticket size, top item and pair, and when each shop is busiest."""
+    rows = []
+    for result in results:
+        pairs_df = result['pairs']
+        top_pair, top_pair_count = (pairs_df.iloc[0]['pair'], pairs_df.iloc[0]['count']) if len(pairs_df) else (None, 0)
+        by_time = result['by_time']
+        by_hour = by_time.groupby(by_time.index.str[:2]).sum()
+        by_day = result['by_day_time'].groupby('day_of_week')['count'].sum()
+        rows.append({
+            'location_id': result['location_id'],
+            'orders': result['orders'],
+            'line_items': result['line_items'],
+            'items_per_order': result['line_items'] / result['orders'] if result['orders'] else 0.0,
+            'revenue': result['revenue'],
+            'avg_ticket': result['revenue'] / result['orders'] if result['orders'] else 0.0,
+            'top_item': result['top_item'],
+            'top_pair': top_pair,
+            'top_pair_share': top_pair_count / result['orders'] if result['orders'] else 0.0,
+            'peak_hour': f'{by_hour.idxmax()}:00' if len(by_hour) else None,
+            'busiest_day': by_day.idxmax() if len(by_day) else None,
+        })
+    return pd.DataFrame(rows).set_index('location_id')
+
+
+@traced()
+def analyze_locations(root, location_id_list=None, begin_time=None, end_time=None, max_workers=None):
+    """Analyze every location in its own worker process, then build the cross-location comparison table.
+
+    Returns ({location_id: analyze_location result}, comparison DataFrame).
+    """
+    location_id_list = location_id_list or stored_locations(root)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(analyze_location, root, location_id, begin_time, end_time)
+                   for location_id in location_id_list]
+        results = [future.result() for future in futures]
+    return {result['location_id']: result for result in results}, compare_locations(results)
@@ -0,0 +1,184 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+CODED_COLUMNS = ['location_id', 'state', 'item_name', 'variation_name']
+
+
+class _Interner:
+    """Maps repeated strings to small integer codes; None is code -1."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class OrderColumnBuilder:
+    """Flattens orders into per-column arrays in a single pass, one row per line item.
+
+    Order-level fields are stored once per order and only repeated out to line items at the end.
+    Low-cardinality text is stored as int32 codes, money as int64 cents, and no per-row dict is ever built.
+    to_dataframe() reproduces the legacy orders_to_dataframe layout; to_record_batch() emits a typed
+    Arrow record batch (dictionary-encoded names, UTC timestamps, cents).
+    """
+
+    def __init__(self):
+        # One entry per order
+        self.order_id = []
+        self.created_at = []
+        self.updated_at = []
+        self.rows_per_order = array('i')
+
+        # One entry per line item (or per bare order)
+        self.item_id = []
+        self.quantity = []
+        self.interners = {name: _Interner() for name in CODED_COLUMNS}
+        self.codes = {name: array('i') for name in CODED_COLUMNS}
+        self.base_price_cents = array('q')
+        self.has_base_price = array('b')
+        self.total_money_cents = array('q')
+
+    def __len__(self):
+        return len(self.item_id)
+
+    def extend(self, orders):
+        """Append every line item of every order (or one bare row for orders without line items)."""
+        return self._extend(orders, structs=False)
+
+    def extend_structs(self, orders):
+        """Same as extend for orders decoded into fast_decode's msgspec structs, read by attribute."""
+        return self._extend(orders, structs=True)
+
+    def _extend(self, orders, structs):
+        location_code = self.interners['location_id'].code
+        state_code = self.interners['state'].code
+        item_code = self.interners['item_name'].code
+        variation_code = self.interners['variation_name'].code
+        location_codes = self.codes['location_id']
+        state_codes = self.codes['state']
+        append_item_id = self.item_id.append
+        append_item_code = self.codes['item_name'].append
+        append_variation_code = self.codes['variation_name'].append
+        append_quantity = self.quantity.append
+        append_base_price = self.base_price_cents.append
+        append_has_base_price = self.has_base_price.append
+        append_total_money = self.total_money_cents.append
+
+        if structs:
+            # Absent fields are None (money) or [] (line items) on the structs, rather than missing keys
+            orders = ((order.id, order.location_id, order.created_at, order.updated_at, order.state,
+                       [(item.catalog_object_id, item.name, item.variation_name, item.quantity,
+                         item.base_price_money.amount if item.base_price_money else 0,
+                         item.total_money.amount if item.total_money else 0) for item in order.line_items],
+                       order.total_money.amount if order.total_money else 0) for order in orders)
+        else:
+            orders = ((order.get('id'), order.get('location_id'), order.get('created_at'), order.get('updated_at'),
+                       order.get('state'),
+                       [(item.get('catalog_object_id'), item.get('name'), item.get('variation_name'),
+                         item.get('quantity'), item.get('base_price_money', {}).get('amount', 0),
+                         item.get('total_money', {}).get('amount', 0)) for item in order.get('line_items', [])],
+                       order.get('total_money', {}).get('amount', 0)) for order in orders)
+
+        for order_id, location_id, created_at, updated_at, state, line_items, order_total in orders:
+            rows = len(line_items) or 1
+            self.order_id.append(order_id)
+            self.created_at.append(created_at)
+            self.updated_at.append(updated_at)
+            self.rows_per_order.append(rows)
+            location_codes.extend([location_code(location_id)] * rows)
+            state_codes.extend([state_code(state)] * rows)
+
+            if line_items:
+                for item_id, name, variation_name, quantity, base_price, total_money in line_items:
+                    append_item_id(item_id)
+                    append_item_code(item_code(name))
+                    append_variation_code(variation_code(variation_name))
+                    append_quantity(quantity)
+                    append_base_price(base_price)
+                    append_has_base_price(1)
+                    append_total_money(total_money)
+            else:
+                # Orders without line items keep one row carrying the order-level total
+                append_item_id(None)
+                append_item_code(-1)
+                append_variation_code(-1)
+                append_quantity(None)
+                append_base_price(0)
+                append_has_base_price(0)
+                append_total_money(order_total)
+        return self
+
+    def _per_row(self, values):
+        # Repeat an order-level column out to one value per line item
+        return np.repeat(np.array(values, dtype=object), np.frombuffer(self.rows_per_order, dtype=np.int32))
+
+    def _decoded(self, name):
+        # Look every code up in one vectorized take; -1 lands on the trailing None
+        values = np.array(self.interners[name].values + [None], dtype=object)
+        return values[np.frombuffer(self.codes[name], dtype=np.int32)]
+
+    def to_dataframe(self):
+        """Same columns, values and dtypes as the legacy dict-per-row orders_to_dataframe.
+
+        With no orders the frame is empty but still has every column, so typing and storing it needs no special case.
+        """
+        has_base_price = np.frombuffer(self.has_base_price, dtype=np.int8).astype(bool)
+        base_price = np.frombuffer(self.base_price_cents, dtype=np.int64) / 100
+        if has_base_price.any():
+            base_price[~has_base_price] = np.nan
+        else:
+            # A frame of bare orders only ever held None here, which pandas keeps as object
+            base_price = np.full(len(self), None, dtype=object)
+
+        return pd.DataFrame({
+            'order_id': self._per_row(self.order_id),
+            'location_id': self._decoded('location_id'),
+            'created_at': self._per_row(self.created_at),
+            'updated_at': self._per_row(self.updated_at),
+            'state': self._decoded('state'),
+            'item_id': self.item_id,
+            'item_name': self._decoded('item_name'),
+            'variation_name': self._decoded('variation_name'),
+            'quantity': self.quantity,
+            'base_price': base_price,
+            'total_money': np.frombuffer(self.total_money_cents, dtype=np.int64) / 100,
+        })
+
+    def to_record_batch(self):
+        """Typed Arrow record batch: dictionary-encoded names, UTC timestamps and int64 cents."""
+        def dictionary(name):
+            codes = np.frombuffer(self.codes[name], dtype=np.int32)
+            indices = pa.array(codes, mask=codes < 0)
+            return pa.DictionaryArray.from_arrays(indices, pa.array(self.interners[name].values, pa.string()))
+
+        def timestamps(values):
+            # Parse once per order, then repeat out to the line items
+            parsed = pd.to_datetime(pd.Series(values, dtype=object), format='ISO8601', utc=True, errors='coerce')
+            return pa.array(parsed.repeat(np.frombuffer(self.rows_per_order, dtype=np.int32)),
+                            pa.timestamp('ns', tz='UTC'))
+
+        has_base_price = np.frombuffer(self.has_base_price, dtype=np.int8).astype(bool)
+        return pa.RecordBatch.from_pydict({
+            'order_id': pa.array(self._per_row(self.order_id), pa.string()),
+            'location_id': dictionary('location_id'),
+            'created_at': timestamps(self.created_at),
+            'updated_at': timestamps(self.updated_at),
+            'state': dictionary('state'),
+            'item_id': pa.array(self.item_id, pa.string()),
+            'item_name': dictionary('item_name'),
+            'variation_name': dictionary('variation_name'),
+            'quantity': pa.array(pd.to_numeric(pd.Series(self.quantity, dtype=object), errors='coerce'), pa.float32()),
+            'base_price_cents': pa.array(np.frombuffer(self.base_price_cents, dtype=np.int64), mask=~has_base_price),
+            'total_money_cents': pa.array(np.frombuffer(self.total_money_cents, dtype=np.int64)),
+        })
@@ -0,0 +1,72 @@
+from collections import Counter
+
+import pandas as pd
+
+import order_store
+from fast_decode import decode_orders_page, flatten_orders
+from instrumentation import traced
+from pair_engine import count_pairs
+from pull_data_and_analyze import iter_order_pages, orders_to_dataframe
+from time_cube import TimeOfDayCube
+
+
+class PairCountAggregator:
+    """Running item-pair counts. Orders never span pages, so counting each batch on its own is exact."""
+
+    def __init__(self):
+        self.pair_counts = Counter()
+
+    def add(self, batch):
+        pairs_df = count_pairs(batch, 'order_id', 'item_name')
+        self.pair_counts.update(dict(zip(pairs_df['pair'], pairs_df['count'])))
+
+    def result(self):
+        """Same layout as stats.analyze_pairs: (pair, count) sorted by count, ties alphabetical."""
+        pairs_df = pd.DataFrame(sorted(self.pair_counts.items()), columns=['pair', 'count'])
+        return pairs_df.sort_values(by='count', ascending=False, kind='stable')
+
+
+class TimeOfDayAggregator(TimeOfDayCube):
+    """Running time-of-day cube; result() gives the same three outputs as stats.analyze_time_of_day."""
+
+    def __init__(self, timezone='US/Eastern'):
+        super().__init__(timezone=timezone)
+
+
+class StoreAppendWriter:
+    """Appends every batch to the Parquet order store as it arrives. Point it at a fresh store root."""
+
+    def __init__(self, root):
+        self.root = root
+        self.batches = 0
+
+    def add(self, batch):
+        order_store.append_orders(batch, self.root, self.batches)
+        self.batches += 1
+
+    def result(self):
+        return self.root
+
+
+@traced()
+def stream_pages(pages, consumers, flatten=orders_to_dataframe):
+    """Flatten each page of orders into a line-item batch and hand it to every consumer, one page at a time."""
+    for page in pages:
+        if not page:
+            continue
+        batch = flatten(page)
+        for consumer in consumers:
+            consumer.add(batch)
+    return [consumer.result() for consumer in consumers]
+
+
+@traced()
+def stream_orders(location_id, begin_time, end_time, consumers, client=None, fast=True):
+    """Fetch orders page by page straight into the consumers; no stage holds the full order list.
+
+    fast decodes each page with fast_decode (typed structs when msgspec is installed) instead of response.json().
+    """
+    if fast:
+        pages = iter_order_pages(location_id, begin_time, end_time, client, decoder=decode_orders_page)
+        return stream_pages(pages, consumers, flatten_orders)
+    return stream_pages(iter_order_pages(location_id, begin_time, end_time, client), consumers)
@@ -0,0 +1,94 @@
+"""Compact in-memory layout of the orders table.
+
+    order_id, item_id                            Arrow-backed strings (string[pyarrow]), one buffer per column
+    location_id, state, item_name, variation_name categoricals
+    created_at, updated_at                       UTC timestamps
+    base_price_cents, total_money_cents          Int64 cents (base price is missing on orders without line items)
+    quantity                                     float32 (whole units, or fractions for items sold by weight)
+
+to_schema() converts either the legacy orders_to_dataframe frame (dollars, object strings) or an older store
+frame to this layout; order_store writes and reads it with the fixed Arrow ORDER_SCHEMA.
+"""
+import pandas as pd
+import pyarrow as pa
+
+ID_COLUMNS = ['order_id', 'item_id']
+CATEGORICAL_COLUMNS = ['location_id', 'state', 'item_name', 'variation_name']
+TIMESTAMP_COLUMNS = ['created_at', 'updated_at']
+MONEY_COLUMNS = {'base_price': 'base_price_cents', 'total_money': 'total_money_cents'}
+STRING_DTYPE = pd.StringDtype('pyarrow')
+
+# The order table's Arrow types, pinned rather than inferred per batch: a month of bare orders has no item names
+# at all and would otherwise be stored as the null type, which then wins over the real type for the whole store
+_DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+ORDER_SCHEMA = pa.schema([
+    ('order_id', pa.large_string()),
+    ('location_id', _DICTIONARY),
+    ('created_at', pa.timestamp('ns', tz='UTC')),
+    ('updated_at', pa.timestamp('ns', tz='UTC')),
+    ('state', _DICTIONARY),
+    ('item_id', pa.large_string()),
+    ('item_name', _DICTIONARY),
+    ('variation_name', _DICTIONARY),
+    ('quantity', pa.float32()),
+    ('base_price_cents', pa.int64()),
+    ('total_money_cents', pa.int64()),
+])
+
+
+def arrow_types_mapper(arrow_type):
+    """types_mapper for pyarrow's to_pandas: strings become string[pyarrow] instead of Python objects."""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return STRING_DTYPE
+    return None
+
+
+def quantity_column(values):
+    """Quantities as float32, whatever this frame holds.
+
+    One fixed type for every frame: store partitions written from different batches must agree, and a single
+    '0.5' (coffee beans by weight) would not fit a whole-number type chosen from another month's values.
+    """
+    return pd.to_numeric(values, errors='coerce').astype('float32')
+
+
+def to_schema(df, copy=True):
+    """The orders frame with every column it has converted to the compact layout; copy=False converts in place."""
+    if copy:
+        df = df.copy()
+    for column in ID_COLUMNS:
+        if column in df.columns and df[column].dtype != STRING_DTYPE:
+            df[column] = df[column].astype(STRING_DTYPE)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.DatetimeTZDtype):
+            df[column] = pd.to_datetime(df[column], format='ISO8601', utc=True, errors='coerce')
+
+    # Dollars back to exact integer cents
+    for dollars, cents in MONEY_COLUMNS.items():
+        if dollars in df.columns:
+            df[cents] = (df.pop(dollars) * 100).round().astype('Int64')
+        elif cents in df.columns and df[cents].dtype != 'Int64':
+            df[cents] = df[cents].astype('Int64')
+    if 'quantity' in df.columns and df['quantity'].dtype != 'float32':
+        df['quantity'] = quantity_column(df['quantity'])
+    return df
+
+
+def union_categories(df, columns=CATEGORICAL_COLUMNS):
+    """Re-encode categorical columns after concatenating frames in place.
+
+    pd.concat keeps a categorical only when every frame has the same categories and otherwise falls back to plain
+    values, so each such column is encoded again over the union of the values. Returns df.
+    """
+    for column in columns:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    return df
+
+
+def memory_usage(df):
+    """Bytes held by each column, counting the Python strings inside object columns."""
+    return df.memory_usage(deep=True, index=False)
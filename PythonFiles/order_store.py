@@ -0,0 +1,140 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from instrumentation import traced
+# Column groups and dtypes live in order_schema; low-cardinality text is stored dictionary-encoded and comes
+# back as pandas categoricals
+from order_schema import ORDER_SCHEMA, arrow_types_mapper, to_schema, union_categories
+
+PARTITION_COLUMNS = ['year', 'month']
+# Every file is written, and the dataset read, with this schema: order columns plus the partition keys
+STORE_SCHEMA = ORDER_SCHEMA.append(pa.field('year', pa.int16())).append(pa.field('month', pa.int8()))
+
+
+@traced(rows='input')
+def to_store_frame(df):
+    """Convert an orders_to_dataframe frame into the typed layout of the columnar store (see order_schema)."""
+    df = to_schema(df)
+    # Orders whose created_at did not parse keep null keys and are stored in pyarrow's null partition
+    df['year'] = df['created_at'].dt.year.astype('Int16')
+    df['month'] = df['created_at'].dt.month.astype('Int8')
+    return df
+
+
+@traced(rows='input')
+def write_orders(df, root):
+    """Write orders into a Parquet dataset at root partitioned by created_at year/month.
+
+    Months present in df replace what is already stored for them; other months are left alone. The time-of-day
+    cube kept next to the store is updated to match.
+    """
+    df = to_store_frame(df) if 'base_price' in df.columns else df
+    pq.write_to_dataset(pa.Table.from_pandas(df, schema=STORE_SCHEMA, preserve_index=False), root,
+                        partition_cols=PARTITION_COLUMNS, existing_data_behavior='delete_matching')
+    _update_cube(root, df, replace=True)
+
+
+@traced(rows='input')
+def append_orders(df, root, batch_id):
+    """Add a batch of orders to the store as new files, leaving everything already stored untouched.
+
+    batch_id must be unique per batch (e.g. the page number) so files from earlier batches are not overwritten.
+    """
+    df = to_store_frame(df) if 'base_price' in df.columns else df
+    append_records(df, root, batch_id, PARTITION_COLUMNS, STORE_SCHEMA)
+    _update_cube(root, df, replace=False)
+
+
+def _update_cube(root, df, replace):
+    # time_cube reads the store through calendar_features, which imports this module
+    from time_cube import update_store_cube
+
+    update_store_cube(root, df, replace)
+
+
+@traced(rows='input')
+def append_records(df, root, batch_id, partition_cols=None, schema=None):
+    """Append an already-typed batch of any record type (orders, payments, customers) to a Parquet dataset.
+
+    Pass the record type's schema so every batch is written with the same column types.
+    """
+    pq.write_to_dataset(pa.Table.from_pandas(df, schema=schema, preserve_index=False), root,
+                        partition_cols=partition_cols, basename_template=f'batch-{batch_id}-{{i}}.parquet',
+                        existing_data_behavior='overwrite_or_ignore')
+
+
+@traced(rows='result')
+def read_orders(root, columns=None, begin_time=None, end_time=None):
+    """Load orders from the Parquet store, optionally projecting columns and pruning to a created_at range.
+
+    Timestamps, categoricals and cents are stored typed, so nothing is parsed on load. Ids load straight into
+    Arrow-backed strings rather than one Python object per row, and stores written before order_schema existed
+    are brought up to the same layout.
+    """
+    filters = None
+    if begin_time or end_time:
+        filters = _range_filters(pd.Timestamp(begin_time, tz='UTC') if begin_time else None,
+                                 pd.Timestamp(end_time, tz='UTC') if end_time else None)
+
+    df = to_schema(_read_table(root, columns=columns, filters=filters), copy=False)
+    return df.drop(columns=[c for c in PARTITION_COLUMNS if c in df.columns and (not columns or c not in columns)])
+
+
+def _range_filters(begin, end):
+    """DNF filters for created_at in [begin, end]; either end may be None (open).
+
+    The year/month partition keys skip whole month directories without opening their files, then the created_at
+    terms trim the edge months row by row. Partitions follow the UTC created_at, so the keys come from UTC too.
+    """
+    rows = []
+    if begin is not None:
+        rows.append(('created_at', '>=', begin))
+    if end is not None:
+        rows.append(('created_at', '<=', end))
+
+    # Whole years strictly inside the range, then the partial first and last years
+    middle = []
+    first = []
+    last = []
+    if begin is not None:
+        middle.append(('year', '>', begin.year))
+        first = [('year', '=', begin.year), ('month', '>=', begin.month)]
+    if end is not None:
+        middle.append(('year', '<', end.year))
+        last = [('year', '=', end.year), ('month', '<=', end.month)]
+    if begin is not None and end is not None and begin.year == end.year:
+        return [first + last[1:] + rows]
+    return [terms + rows for terms in (middle, first, last) if terms]
+
+
+def _read_table(path, columns=None, filters=None, schema=STORE_SCHEMA):
+    # Reading with the pinned schema casts every file to it, whatever types that file was written with
+    return pq.read_table(path, columns=columns, filters=filters, schema=schema).to_pandas(
+        types_mapper=arrow_types_mapper)
+
+
+@traced(rows='input')
+def upsert_orders(df_new, root):
+    """Replace every order in df_new inside the store, rewriting only the months those orders belong to."""
+    df_new = to_store_frame(df_new) if 'base_price' in df_new.columns else df_new
+    if os.path.exists(root):
+        months = df_new[PARTITION_COLUMNS].drop_duplicates().itertuples(index=False)
+        parts = []
+        for year, month in months:
+            part_path = os.path.join(root, f'year={_partition_value(year)}', f'month={_partition_value(month)}')
+            if os.path.exists(part_path):
+                df_month = _read_table(part_path, schema=ORDER_SCHEMA).assign(year=year, month=month)
+                parts.append(df_month[~df_month['order_id'].isin(df_new['order_id'])])
+
+        # Categories differ between partitions, so union them before writing
+        df_new = union_categories(pd.concat(parts + [df_new], ignore_index=True))
+        df_new['year'] = df_new['year'].astype('Int16')
+        df_new['month'] = df_new['month'].astype('Int8')
+    write_orders(df_new, root)
+
+
+def _partition_value(value):
+    # The directory name write_to_dataset gives a partition key, null included
+    return '__HIVE_DEFAULT_PARTITION__' if pd.isna(value) else value
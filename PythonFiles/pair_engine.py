@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from instrumentation import traced
+
+
+def build_incidence_matrix(df, order_column='order_id', item_column='item_name'):
+    """Encode line items as a binary sparse order x item matrix.
+
+    Returns the CSR matrix, the order ids for its rows and the item names for its columns.
+    Item names are sorted, so column j < k means name j sorts before name k.
+    """
+    order_codes, order_ids = pd.factorize(df[order_column])
+    item_codes, item_names = pd.factorize(np.asarray(df[item_column], dtype=object), sort=True)
+
+    # factorize marks missing values with -1; those rows never form pairs
+    valid = (order_codes >= 0) & (item_codes >= 0)
+    order_codes = order_codes[valid]
+    item_codes = item_codes[valid]
+
+    X = sparse.csr_matrix((np.ones(len(order_codes), dtype=np.int32), (order_codes, item_codes)),
+                          shape=(len(order_ids), len(item_names)))
+
+    # Repeated items in one order are summed on construction; a basket only counts each item once
+    X.data[:] = 1
+    return X, order_ids, np.asarray(item_names, dtype=object)
+
+
+@traced(rows='input')
+def count_pairs(df, order_column='order_id', item_column='item_name'):
+    """Count how many orders contain each pair of distinct items, using one sparse X.T @ X product.
+
+    Returns a DataFrame with 'pair' (item_a, item_b) tuples, item_a sorting before item_b,
+    and 'count', ordered by count descending with ties in pair order.
+    """
+    X, _, item_names = build_incidence_matrix(df, order_column, item_column)
+    return pairs_from_incidence(X, item_names)
+
+
+def pairs_from_incidence(X, item_names):
+    """Pair counts from any binary basket x item matrix whose column j holds item_names[j].
+
+    Pairs are oriented alphabetically and sorted by count descending, ties in pair order,
+    whatever order the columns are in.
+    """
+    # Entry (j, k) of the co-occurrence matrix is the number of orders holding both items
+    return pairs_from_co_occurrence(sparse.triu(X.T @ X, k=1), item_names)
+
+
+def pairs_from_co_occurrence(co_occurrence, item_names):
+    """Pair frame from an upper-triangular item x item matrix of order counts, such as a sum of partial counts."""
+    item_names = np.asarray(item_names, dtype=object)
+    rank = np.empty(len(item_names), dtype=np.int64)
+    rank[np.argsort(item_names, kind='stable')] = np.arange(len(item_names))
+    # CSR sums any duplicate entries; pairs that cancelled out to zero are not pairs
+    co_occurrence = sparse.csr_matrix(co_occurrence)
+    co_occurrence.eliminate_zeros()
+    co_occurrence = co_occurrence.tocoo()
+
+    # Orient every pair by name, then visit them in (item_a, item_b) order so stable sorting leaves ties alphabetical
+    swap = rank[co_occurrence.row] > rank[co_occurrence.col]
+    rows = np.where(swap, co_occurrence.col, co_occurrence.row)
+    cols = np.where(swap, co_occurrence.row, co_occurrence.col)
+    order = np.lexsort((rank[cols], rank[rows]))
+    rows = rows[order]
+    cols = cols[order]
+    counts = co_occurrence.data[order].astype(np.int64)
+
+    pairs_df = pd.DataFrame({'pair': list(zip(item_names[rows], item_names[cols])), 'count': counts})
+    return pairs_df.sort_values(by='count', ascending=False, kind='stable')
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+from baskets import Baskets
+
+RETRACTED_STATES = {'CANCELED'}
+
+
+def expand_pairs(offsets, codes):
+    """Every (i, j) position pair i < j inside each CSR basket, as two index arrays into codes."""
+    sizes = np.diff(offsets)
+    # Entry i pairs with every later entry of its own basket
+    later = np.repeat(offsets[1:], sizes) - np.arange(len(codes)) - 1
+    left = np.repeat(np.arange(len(codes)), later)
+    starts = np.cumsum(later) - later
+    right = left + np.arange(len(left)) - np.repeat(starts, later) + 1
+    return left, right
+
+
+class PairIndex:
+    """Persistent item-pair counts per (item_a, item_b, day), maintained incrementally.
+
+    add() takes line-item batches (orders_to_dataframe / order store layout). Each order's previous
+    contribution is remembered, so a re-sent order replaces its old pairs and a cancelled order is retracted.
+    Days are local calendar dates in `timezone`. Counts live in a days x pairs array, so a top-k query over
+    any date range is one slice sum rather than a rescan of the orders.
+    """
+
+    def __init__(self, timezone='US/Eastern'):
+        self.timezone = timezone
+        self.item_codes = {}
+        self.item_names = []
+        self.pair_keys = pd.Index([], dtype=np.int64)
+        self.pair_items = np.zeros((0, 2), dtype=np.int32)
+        self.first_day = None
+        self.counts = np.zeros((0, 0), dtype=np.int32)
+        # order_id -> (updated_at, day ordinal, global item codes)
+        self.orders = {}
+
+    def __len__(self):
+        return len(self.orders)
+
+    def _intern(self, names):
+        for name in names:
+            if name not in self.item_codes:
+                self.item_codes[name] = len(self.item_names)
+                self.item_names.append(name)
+        return np.array([self.item_codes[name] for name in names], dtype=np.int64)
+
+    def _pair_columns(self, a, b):
+        # Pair keys are (low code, high code) packed into one int64; unseen keys get new columns
+        keys = np.minimum(a, b) << 32 | np.maximum(a, b)
+        columns = self.pair_keys.get_indexer(keys)
+        new = np.unique(keys[columns < 0])
+        if len(new):
+            self.pair_keys = self.pair_keys.append(pd.Index(new))
+            self.pair_items = np.vstack([self.pair_items, np.column_stack([new >> 32, new & 0xFFFFFFFF])]).astype(
+                np.int32)
+            columns = self.pair_keys.get_indexer(keys)
+        return columns
+
+    def _day_rows(self, days):
+        # Grow the day axis in either direction so every day has a row
+        low, high = days.min(), days.max()
+        if self.first_day is None:
+            self.first_day = low
+            self.counts = np.zeros((0, self.counts.shape[1]), dtype=np.int32)
+        before = max(0, self.first_day - low)
+        # Prepending rows leaves the last day where it was
+        after = max(0, high - (self.first_day + len(self.counts) - 1))
+        if before or after:
+            self.counts = np.pad(self.counts, ((before, after), (0, 0)))
+            self.first_day -= before
+        return days - self.first_day
+
+    def _apply(self, days, offsets, codes, sign):
+        left, right = expand_pairs(offsets, codes)
+        if not len(left):
+            return
+        columns = self._pair_columns(codes[left], codes[right])
+        rows = self._day_rows(np.repeat(days, np.diff(offsets)))[left]
+        if self.counts.shape[1] < len(self.pair_keys):
+            # Leave headroom so a batch that adds a handful of new pairs does not copy the whole array
+            grow = max(len(self.pair_keys), 2 * self.counts.shape[1]) - self.counts.shape[1]
+            self.counts = np.pad(self.counts, ((0, 0), (0, grow)))
+        np.add.at(self.counts, (rows, columns), sign)
+
+    def _stack(self, records):
+        # (day, codes) records -> day array plus CSR offsets and codes
+        days = np.array([day for day, _ in records], dtype=np.int64)
+        offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum([len(codes) for _, codes in records], out=offsets[1:])
+        codes = np.concatenate([codes for _, codes in records]) if records else np.zeros(0, dtype=np.int64)
+        return days, offsets, codes
+
+    def add(self, batch):
+        """Fold in one line-item batch: new orders add pairs, updated orders replace theirs, cancelled ones retract."""
+        batch = batch[batch['order_id'].notna()]
+        if batch.empty:
+            return
+
+        # One row per order for the order-level fields; a stale copy of an order never overwrites a newer one
+        heads = batch.drop_duplicates('order_id', keep='last').set_index('order_id')
+        updated_at = heads['updated_at'].astype(str)
+        fresh = [order_id for order_id, stamp in updated_at.items()
+                 if order_id not in self.orders or stamp >= self.orders[order_id][0]]
+        if not fresh:
+            return
+        heads = heads.loc[fresh]
+
+        retract = [self.orders.pop(order_id)[1:] for order_id in fresh if order_id in self.orders]
+        if retract:
+            self._apply(*self._stack(retract), -1)
+
+        live = heads.index[~heads['state'].isin(RETRACTED_STATES)] if 'state' in heads else heads.index
+        lines = batch[batch['order_id'].isin(live)]
+        baskets = Baskets.from_dataframe(lines)
+        if not len(baskets):
+            return
+
+        created_at = pd.to_datetime(heads.loc[baskets.order_ids, 'created_at'], format='ISO8601', utc=True)
+        local_dates = created_at.dt.tz_convert(self.timezone).dt.date
+        days = np.array([day.toordinal() for day in local_dates], dtype=np.int64)
+        codes = self._intern(baskets.item_names)[baskets.item_codes]
+        self._apply(days, baskets.offsets, codes, 1)
+
+        for idx, order_id in enumerate(baskets.order_ids):
+            self.orders[order_id] = (updated_at[order_id], days[idx],
+                                     codes[baskets.offsets[idx]:baskets.offsets[idx + 1]])
+
+    def top_pairs(self, k=10, start=None, end=None):
+        """The k most frequent pairs on local dates start..end inclusive (either may be None for open-ended).
+
+        Same layout as stats.analyze_pairs: 'pair' tuples oriented alphabetically and 'count', ties alphabetical.
+        """
+        totals = self.pair_totals(start, end)
+        if k is not None and k < len(totals):
+            # Keep every pair tied with the k-th count so the alphabetical tie-break below stays exact
+            threshold = np.partition(totals, len(totals) - k)[len(totals) - k]
+            candidates = np.flatnonzero(totals >= threshold)
+        else:
+            candidates = np.arange(len(totals))
+        candidates = candidates[totals[candidates] > 0]
+        names = np.asarray(self.item_names, dtype=object)
+        pairs = [tuple(sorted((names[a], names[b]))) for a, b in self.pair_items[candidates]]
+        pairs_df = pd.DataFrame({'pair': pairs, 'count': totals[candidates].astype(np.int64)})
+        pairs_df = pairs_df.sort_values('pair').sort_values('count', ascending=False, kind='stable')
+        return pairs_df.head(k) if k is not None else pairs_df
+
+    def pair_totals(self, start=None, end=None):
+        """Count per pair column over the local dates start..end inclusive."""
+        if self.first_day is None:
+            return np.zeros(len(self.pair_keys), dtype=np.int64)
+        low = 0 if start is None else max(0, pd.Timestamp(start).date().toordinal() - self.first_day)
+        high = len(self.counts) if end is None else max(0, pd.Timestamp(end).date().toordinal() - self.first_day + 1)
+        return self.counts[low:high, :len(self.pair_keys)].sum(axis=0, dtype=np.int64)
+
+    def result(self):
+        """All pairs over every day, so a PairIndex can be a stream_pages consumer."""
+        return self.top_pairs(k=None)
+
+    def save(self, path):
+        """Write the index to one .npz file; load() restores it exactly."""
+        order_ids = list(self.orders)
+        records = [self.orders[order_id] for order_id in order_ids]
+        days, offsets, codes = self._stack([(day, item_codes) for _, day, item_codes in records])
+        np.savez_compressed(
+            path,
+            timezone=np.array(self.timezone),
+            item_names=np.array(self.item_names, dtype=str),
+            pair_keys=self.pair_keys.to_numpy(dtype=np.int64),
+            first_day=np.array(-1 if self.first_day is None else self.first_day, dtype=np.int64),
+            counts=self.counts[:, :len(self.pair_keys)],
+            order_ids=np.array(order_ids, dtype=str),
+            order_updated_at=np.array([updated_at for updated_at, _, _ in records], dtype=str),
+            order_days=days,
+            order_offsets=offsets,
+            order_codes=codes,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            index = cls(str(data['timezone']))
+            index.item_names = data['item_names'].tolist()
+            index.item_codes = {name: code for code, name in enumerate(index.item_names)}
+            keys = data['pair_keys']
+            index.pair_keys = pd.Index(keys, dtype=np.int64)
+            index.pair_items = np.column_stack([keys >> 32, keys & 0xFFFFFFFF]).astype(np.int32).reshape(-1, 2)
+            first_day = int(data['first_day'])
+            index.first_day = None if first_day < 0 else first_day
+            index.counts = data['counts'].astype(np.int32)
+            offsets = data['order_offsets']
+            codes = data['order_codes']
+            for idx, (order_id, updated_at, day) in enumerate(zip(data['order_ids'].tolist(),
+                                                                  data['order_updated_at'].tolist(),
+                                                                  data['order_days'].tolist())):
+                index.orders[order_id] = (updated_at, day, codes[offsets[idx]:offsets[idx + 1]])
+        return index
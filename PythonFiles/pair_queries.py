@@ -0,0 +1,130 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+class PairQueries:
+    """Item-indexed pair counts answering top-k questions without scanning every pair.
+
+    Built once from analyze_pairs output (a 'pair' tuple and 'count' per row, highest count first). Pairs keep
+    their rank in that order; every item keeps the ranks of its pairs and every category the ranks of the pairs
+    inside it, both already in rank order. So each query reads a prefix of one list:
+
+        partners('Latte', k)              the first k of Latte's pairs
+        top_pairs(k, exclude={'Latte'})   the global order, skipping only pairs that touch an excluded item
+        top_pairs(k, category='Pastry')   the first k of the category's pairs
+
+    The cost is k plus the skipped pairs (at most the excluded items' partners), not the number of pairs.
+    categories maps item name to category name; items without one belong to no category.
+    """
+
+    def __init__(self, item_names, first, second, counts, categories=None):
+        self.item_names = list(item_names)
+        self.codes = {name: code for code, name in enumerate(self.item_names)}
+        self.first = np.asarray(first, dtype=np.int32)
+        self.second = np.asarray(second, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+        # Each pair listed under both of its items, sorted by item and then rank
+        items = np.concatenate([self.first, self.second])
+        ranks = np.concatenate([np.arange(len(self.counts))] * 2)
+        order = np.lexsort((ranks, items))
+        self.item_ranks = ranks[order]
+        self.item_offsets = np.searchsorted(items[order], np.arange(len(self.item_names) + 1))
+
+        # Category code of every item (-1 for none) and, per category, the ranks of the pairs inside it
+        self.categories = dict(categories or {})
+        category_names = sorted(set(self.categories.values()))
+        self.category_codes = {name: code for code, name in enumerate(category_names)}
+        self.item_category = np.array([self.category_codes.get(self.categories.get(name), -1)
+                                       for name in self.item_names], dtype=np.int32)
+        first_category = self.item_category[self.first]
+        inside = np.flatnonzero((first_category >= 0) & (first_category == self.item_category[self.second]))
+        grouped = inside[np.argsort(first_category[inside], kind='stable')]
+        bounds = np.searchsorted(first_category[grouped], np.arange(len(category_names) + 1))
+        self.category_ranks = {name: grouped[bounds[code]:bounds[code + 1]]
+                               for code, name in enumerate(category_names)}
+
+    @classmethod
+    def from_pairs(cls, pairs_df, categories=None):
+        """Index an analyze_pairs / count_pairs frame, keeping its row order as the rank order."""
+        # Both items of every pair in one flat array (first, second, first, ...), interned by one hash pass
+        items = np.fromiter(itertools.chain.from_iterable(pairs_df['pair'].to_numpy()), dtype=object,
+                            count=2 * len(pairs_df))
+        codes, item_names = pd.factorize(items, sort=True)
+        return cls(item_names, codes[0::2], codes[1::2], pairs_df['count'].to_numpy(), categories)
+
+    @classmethod
+    def from_orders(cls, df, categories=None):
+        """Count the pairs in an orders frame and index them."""
+        from pair_engine import count_pairs
+
+        return cls.from_pairs(count_pairs(df), categories)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _frame(self, ranks):
+        names = self.item_names
+        pairs = [(names[a], names[b]) for a, b in zip(self.first[ranks].tolist(), self.second[ranks].tolist())]
+        return pd.DataFrame({'pair': pd.Series(pairs, dtype=object), 'count': self.counts[ranks]})
+
+    def _select(self, ranks, k, exclude):
+        # ranks is already in count order, so the answer is its first k entries that avoid exclude
+        codes = [self.codes[item] for item in exclude if item in self.codes]
+        if not codes:
+            return ranks[:k] if k is not None else ranks
+        excluded = np.zeros(len(self.item_names), dtype=bool)
+        excluded[codes] = True
+        if k is None:
+            return ranks[~(excluded[self.first[ranks]] | excluded[self.second[ranks]])]
+
+        # Check doubling prefixes, so the work stays proportional to k plus the pairs skipped
+        selected = []
+        found = 0
+        start = 0
+        step = max(2 * k, 64)
+        while start < len(ranks) and found < k:
+            chunk = ranks[start:start + step]
+            kept = chunk[~(excluded[self.first[chunk]] | excluded[self.second[chunk]])]
+            selected.append(kept)
+            found += len(kept)
+            start += step
+            step *= 2
+        return np.concatenate(selected)[:k] if selected else ranks[:0]
+
+    def _item_ranks(self, item):
+        code = self.codes.get(item)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.item_ranks[self.item_offsets[code]:self.item_offsets[code + 1]]
+
+    def pairs_with(self, item, k=None, exclude=(), category=None):
+        """The k most frequent pairs containing item (all of them if k is None), as analyze_pairs rows.
+
+        exclude drops pairs whose other item is in it; category keeps only partners in that category.
+        """
+        ranks = self._item_ranks(item)
+        if category is not None and len(ranks):
+            code = self.codes[item]
+            partner = np.where(self.first[ranks] == code, self.second[ranks], self.first[ranks])
+            ranks = ranks[self.item_category[partner] == self.category_codes.get(category, -2)]
+        return self._frame(self._select(ranks, k, exclude))
+
+    def partners(self, item, k=10, exclude=(), category=None):
+        """Top k items bought with item, as 'partner' and 'count' columns."""
+        pairs_df = self.pairs_with(item, k, exclude, category)
+        partner = [b if a == item else a for a, b in pairs_df['pair']]
+        return pd.DataFrame({'partner': partner, 'count': pairs_df['count']}, columns=['partner', 'count'])
+
+    def top_pairs(self, k=10, exclude=(), category=None):
+        """Top k pairs overall (all if k is None), leaving out pairs that touch any item in exclude.
+
+        With category, only pairs whose two items are both in that category.
+        """
+        if category is not None:
+            ranks = self.category_ranks.get(category, np.zeros(0, dtype=np.int64))
+        else:
+            ranks = np.arange(len(self.counts))
+        return self._frame(self._select(ranks, k, exclude))
@@ -0,0 +1,91 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from instrumentation import traced
+from pair_engine import pairs_from_co_occurrence
+
+
+def shard_rows(df, order_codes, n_shards, by='order'):
+    """Shard number of every line item. Every line item of an order lands in the same shard.
+
+    by='order' hashes the factorized order id (a multiplicative hash, so shards do not follow arrival order);
+    by='month' uses the created_at month, round-robin over n_shards.
+    """
+    if by == 'order':
+        return (order_codes.astype(np.uint64) * np.uint64(2654435761) % np.uint64(2 ** 32)).astype(np.int64) % n_shards
+    if by == 'month':
+        created_at = pd.to_datetime(df['created_at'], format='ISO8601', utc=True, errors='coerce')
+        months = (created_at.dt.year * 12 + created_at.dt.month).fillna(0).to_numpy(dtype=np.int64)
+        return months % n_shards
+    raise ValueError(f"Unknown shard key {by!r}; use 'order' or 'month'")
+
+
+def _to_shared(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block
+
+
+def _count_shard(order_block, item_block, length, start, end, n_orders, n_items):
+    # Attach to the shared code arrays and read only this shard's contiguous slice; nothing large is pickled
+    orders_shm = shared_memory.SharedMemory(name=order_block)
+    items_shm = shared_memory.SharedMemory(name=item_block)
+    try:
+        order_codes = np.ndarray(length, dtype=np.int64, buffer=orders_shm.buf)[start:end]
+        item_codes = np.ndarray(length, dtype=np.int32, buffer=items_shm.buf)[start:end]
+        # Rows of orders outside this shard stay empty, which costs one indptr entry each and no sorting
+        X = sparse.csr_matrix((np.ones(end - start, dtype=np.int32), (order_codes, item_codes)),
+                              shape=(n_orders, n_items))
+        X.data[:] = 1
+        partial = sparse.triu(X.T @ X, k=1).tocoo()
+        del order_codes, item_codes
+        return partial.row, partial.col, partial.data.astype(np.int64)
+    finally:
+        orders_shm.close()
+        items_shm.close()
+
+
+@traced(rows='input')
+def count_pairs_sharded(df, n_shards=None, by='order', max_workers=None, order_column='order_id',
+                        item_column='item_name'):
+    """count_pairs split across worker processes; same result, for histories too large for one core.
+
+    Line items are encoded once to integer codes, grouped by shard and placed in shared memory. Each worker
+    counts pairs for its shard's orders and returns only the small item x item partial counts, which are summed.
+    """
+    n_shards = n_shards or max_workers or os.cpu_count()
+    order_codes, order_ids = pd.factorize(df[order_column])
+    item_codes, item_names = pd.factorize(np.asarray(df[item_column], dtype=object), sort=True)
+
+    # Sort by shard so each shard is one contiguous slice of the shared arrays; rows with a missing order or
+    # item (code -1) are left out here rather than by filtering the frame first
+    shards = shard_rows(df, order_codes, n_shards, by)
+    order = np.flatnonzero((order_codes >= 0) & (item_codes >= 0))
+    order = order[np.argsort(shards[order], kind='stable')]
+    bounds = np.searchsorted(shards[order], np.arange(n_shards + 1))
+    order_codes = order_codes[order].astype(np.int64)
+    item_codes = item_codes[order].astype(np.int32)
+
+    order_block = _to_shared(order_codes)
+    item_block = _to_shared(item_codes)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_count_shard, order_block.name, item_block.name, len(order_codes),
+                                       bounds[shard], bounds[shard + 1], len(order_ids), len(item_names))
+                       for shard in range(n_shards) if bounds[shard] < bounds[shard + 1]]
+            parts = [future.result() for future in futures]
+    finally:
+        for block in (order_block, item_block):
+            block.close()
+            block.unlink()
+
+    rows = np.concatenate([part[0] for part in parts]) if parts else np.zeros(0, dtype=np.int32)
+    cols = np.concatenate([part[1] for part in parts]) if parts else np.zeros(0, dtype=np.int32)
+    counts = np.concatenate([part[2] for part in parts]) if parts else np.zeros(0, dtype=np.int64)
+    co_occurrence = sparse.coo_matrix((counts, (rows, cols)), shape=(len(item_names), len(item_names)))
+    return pairs_from_co_occurrence(co_occurrence, item_names)
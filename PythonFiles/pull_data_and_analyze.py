@@ -1,14 +1,22 @@
 import os
-import requests
-import pandas as pd
-from dotenv import load_dotenv
-from itertools import combinations
-from collections import Counter
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from square_client import SquareClient, SquareAPIError
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from instrumentation import span, traced
 
+# pandas, pyarrow and scipy (order_store, order_columns, baskets) are imported inside the functions that use
+# them, so fetching and `--help` start without loading them
 
-def retrieve_customers():
+
+@traced()
+def retrieve_customers(client=None):
     """Function to retrieve and display the first 10 customers from the Square production environment."""
-    response = requests.get(url_customers, headers=headers)
+    client = client or default_client()
+    response = client.get(url_customers)
 
     if response.status_code == 200:
         result = response.json()
@@ -26,9 +34,11 @@ def retrieve_customers():
     return result
 
 
-def retrieve_payments():
+@traced()
+def retrieve_payments(client=None):
     """Function to retrieve and display the first 10 payments from the Square production environment."""
-    response = requests.get(url_payments, headers=headers)
+    client = client or default_client()
+    response = client.get(url_payments)
 
     if response.status_code == 200:
         result = response.json()
@@ -48,17 +58,48 @@ def retrieve_payments():
     return result
 
 
-def get_orders_from_payment(payment_id):
+def iter_list_pages(url, key, params=None, cursor=None, client=None):
+    """Walk a cursor-paginated list endpoint (customers, payments), yielding (records, next_cursor) per page.
+
+    Start from a saved cursor to resume an interrupted export.
+    """
+    client = client or default_client()
+
+    while True:
+        page_params = dict(params or {})
+        if cursor:
+            page_params['cursor'] = cursor
+
+        response = client.get(url, params=page_params)
+        if response.status_code != 200:
+            print(f"Error retrieving {key}: {response.status_code}")
+            print(response.text)
+            raise SquareAPIError(f"Retrieving {key} failed with {response.status_code}", response.status_code, cursor)
+
+        with span('decode') as decoded:
+            result = response.json()
+            records = result.get(key, [])
+            decoded.add(rows=len(records))
+        cursor = result.get('cursor')
+        yield records, cursor
+        if not cursor:
+            break
+
+
+@traced()
+def get_orders_from_payment(payment_id, client=None):
     """Retrieve the order associated with a given payment ID."""
+    client = client or default_client()
+
     # Make a GET request to retrieve the payment details, which includes the order_id
-    payment_response = requests.get(f'{url_payments}/{payment_id}', headers=headers)
+    payment_response = client.get(f'{url_payments}/{payment_id}')
 
     if payment_response.status_code == 200:
         payment_data = payment_response.json()
         order_id = payment_data['payment']['order_id']  # Get the associated order_id
 
         # Retrieve the actual order using the order_id
-        order_response = requests.get(f'{url_orders}/{order_id}', headers=headers)
+        order_response = client.get(f'{url_orders}/{order_id}')
 
         if order_response.status_code == 200:
             order_data = order_response.json()
@@ -77,15 +118,84 @@ def get_orders_from_payment(payment_id):
     return order_data
 
 
-def retrieve_all_orders(location_id, begin_time=None, end_time=None):
-    """Function to retrieve all orders for a specific location."""
+@traced(rows='input')
+def get_orders_from_payments(payment_ids, max_workers=8, chunk_size=100, client=None):
+    """Retrieve the orders for many payment IDs at once, returned as a dict keyed by payment ID.
+
+    Payments are looked up concurrently, then their orders are fetched through the batch-retrieve
+    endpoint in chunks of up to 100 ids, so N payments cost N + N/100 round trips instead of 2N.
+    Payments that could not be resolved map to None.
+    """
+    client = client or default_client()
+
+    def fetch_order_id(payment_id):
+        response = client.get(f'{url_payments}/{payment_id}')
+        if response.status_code != 200:
+            print(f"Error retrieving payment {payment_id}: {response.status_code}")
+            return payment_id, None
+        return payment_id, response.json()['payment'].get('order_id')
+
+    def fetch_orders(order_ids):
+        response = client.post(url_orders_batch_retrieve, json={'order_ids': order_ids})
+        if response.status_code != 200:
+            print(f"Error batch retrieving orders: {response.status_code}")
+            print(response.text)
+            return []
+        return response.json().get('orders', [])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        order_ids = dict(executor.map(fetch_order_id, payment_ids))
+
+        # Several payments (e.g. split tenders) can share one order, so request each order once
+        unique_ids = list(dict.fromkeys(order_id for order_id in order_ids.values() if order_id))
+        chunks = [unique_ids[i:i + chunk_size] for i in range(0, len(unique_ids), chunk_size)]
+        orders_by_id = {order['id']: order for orders in executor.map(fetch_orders, chunks) for order in orders}
+
+    return {payment_id: orders_by_id.get(order_id) for payment_id, order_id in order_ids.items()}
+
+
+@traced()
+def retrieve_all_orders(location_id, begin_time=None, end_time=None, windows=1, max_workers=None, client=None,
+                        cursor=None):
+    """Function to retrieve all orders for a specific location.
+
+    With windows > 1 the date range is split into that many sub-windows which are paged in parallel.
+    If a page still fails, the SquareAPIError carries the orders fetched so far and the cursor of the failed
+    page; calling again with the same range and cursor=error.cursor fetches the rest.
+    """
+    client = client or default_client()
+    # A cursor belongs to one query, so resuming always pages the range it came from in one go
+    if windows > 1 and begin_time and end_time and not cursor:
+        return retrieve_all_orders_concurrent(location_id, begin_time, end_time, windows, max_workers, client)
+
     orders = []
-    cursor = None
+    try:
+        for page in iter_order_pages(location_id, begin_time, end_time, client, cursor=cursor):
+            orders.extend(page)
+            if orders:
+                print(orders[-1])
+    except SquareAPIError as error:
+        error.orders = orders
+        raise
+
+    return orders
+
+
+def iter_order_pages(location_id, begin_time=None, end_time=None, client=None, cursor=None, decoder=None):
+    """Yield each page of orders for a location as soon as it arrives, without keeping earlier pages.
+
+    location_id may also be a list of up to 10 location ids, searched together in one query.
+
+    The client already retries throttling and server errors; if a page still fails, SquareAPIError carries
+    its cursor so the caller can resume from that page instead of silently ending early.
+    decoder, if given, turns the raw response body into (orders, cursor) in place of response.json().
+    """
+    client = client or default_client()
 
     while True:
         # Define the request body inside the loop
         body = {
-            "location_ids": [location_id],
+            "location_ids": location_ids(location_id),
             "limit": 500  # Maximum allowed by the API per request
         }
 
@@ -107,27 +217,125 @@ def retrieve_all_orders(location_id, begin_time=None, end_time=None):
             body['cursor'] = cursor
 
         # Send the POST request to retrieve orders
-        response = requests.post(url_orders_search, headers=headers, json=body)
+        response = client.post(url_orders_search, json=body)
 
         if response.status_code == 200:
-            result = response.json()
-            orders.extend(result.get('orders', []))
-            print(orders[-1])
-
-            # Update the cursor
-            cursor = result.get('cursor')
+            with span('decode') as decoded:
+                if decoder is not None:
+                    orders, cursor = decoder(response.content)
+                else:
+                    result = response.json()
+                    orders, cursor = result.get('orders', []), result.get('cursor')
+                decoded.add(rows=len(orders))
+            yield orders
+
+            # Stop once there is no next cursor
             if not cursor:
                 break  # No more pages
         else:
             print(f"Error retrieving orders: {response.status_code}")
             print(response.text)
-            break  # Exit the loop on error
+            raise SquareAPIError(f"Retrieving orders failed with {response.status_code}", response.status_code, cursor)
+
 
+def location_ids(location_id):
+    """The search body's location_ids for one location id or a list of them."""
+    return [location_id] if isinstance(location_id, str) else list(location_id)
+
+
+@traced(rows='result')
+def retrieve_locations(client=None):
+    """Return the ids of every active location on the account."""
+    client = client or default_client()
+    response = client.get(url_locations)
+    if response.status_code != 200:
+        print(f"Error retrieving locations: {response.status_code}")
+        print(response.text)
+        raise SquareAPIError(f"Retrieving locations failed with {response.status_code}", response.status_code)
+    return [location['id'] for location in response.json().get('locations', []) if location.get('status') == 'ACTIVE']
+
+
+@traced()
+def retrieve_orders_by_location(location_id_list, begin_time=None, end_time=None, windows=1, batched=False,
+                                max_workers=None, client=None):
+    """Fetch orders for several locations at once, returned as {location_id: orders}.
+
+    By default every location is paged on its own thread (each split into windows sub-windows).
+    batched=True instead puts up to 10 locations in each search's location_ids, which saves requests when
+    locations are small, and splits the results by the order's location_id.
+    """
+    client = client or default_client()
+    location_id_list = list(location_id_list)
+    if batched:
+        groups = [location_id_list[i:i + 10] for i in range(0, len(location_id_list), 10)]
+    else:
+        groups = [[location_id] for location_id in location_id_list]
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(groups) or 1) as executor:
+        results = executor.map(lambda group: retrieve_all_orders(group, begin_time, end_time, windows, client=client),
+                               groups)
+        orders_by_location = {location_id: [] for location_id in location_id_list}
+        for orders in results:
+            for order in orders:
+                orders_by_location[order['location_id']].append(order)
+
+    return orders_by_location
+
+
+def split_time_window(begin_time, end_time, windows):
+    """Split an RFC 3339 time range into a list of (start_at, end_at) sub-windows of equal length."""
+    start = datetime.fromisoformat(begin_time).astimezone(timezone.utc)
+    end = datetime.fromisoformat(end_time).astimezone(timezone.utc)
+    span = (end - start).total_seconds()
+
+    # Whole-second edges so every boundary formats cleanly; neighbouring windows share an edge
+    edges = [start + timedelta(seconds=int(span * i // windows)) for i in range(windows)] + [end]
+    return [(a.strftime('%Y-%m-%dT%H:%M:%SZ'), b.strftime('%Y-%m-%dT%H:%M:%SZ'))
+            for a, b in zip(edges, edges[1:]) if a < b]
+
+
+@traced(rows='result')
+def retrieve_all_orders_concurrent(location_id, begin_time, end_time, windows=8, max_workers=None, client=None):
+    """Retrieve orders by paging time-sliced sub-windows in parallel, merged in created_at order.
+
+    A failing window does not stop the others; the SquareAPIError raised at the end carries every order that
+    did arrive and the windows left to resume.
+    """
+    client = client or default_client()
+    sub_windows = split_time_window(begin_time, end_time, windows)
+
+    def fetch_window(window):
+        try:
+            return retrieve_all_orders(location_id, *window, client=client), None
+        except SquareAPIError as error:
+            return error.orders or [], error
+
+    # Each sub-window walks its own cursor; the pages themselves are still fetched in order
+    with ThreadPoolExecutor(max_workers=max_workers or len(sub_windows)) as executor:
+        results = list(executor.map(fetch_window, sub_windows))
+
+    # Orders created exactly on a shared edge can come back from both windows
+    orders_by_id = {}
+    for window_orders, _ in results:
+        for order in window_orders:
+            orders_by_id[order['id']] = order
+    orders = sorted(orders_by_id.values(), key=lambda order: datetime.fromisoformat(order['created_at']))
+
+    # Each failed window resumes on its own: retrieve_all_orders(location_id, start_at, end_at, cursor=cursor)
+    failed = [(window, error) for window, (_, error) in zip(sub_windows, results) if error is not None]
+    if failed:
+        error = failed[0][1]
+        error.orders = orders
+        error.pending_windows = [(*window, window_error.cursor) for window, window_error in failed]
+        raise error
     return orders
 
 
-def retrieve_all_orders_original(location_id, begin_time=None, end_time=None):
+@traced(rows='result')
+def retrieve_all_orders_original(location_id, begin_time=None, end_time=None, client=None):
     """Function to retrieve all orders for a specific location."""
+    client = client or default_client()
+
     # Define the request body with optional date filtering
     body = {
         "location_ids": [location_id],  # Specify the location ID to search orders for
@@ -146,7 +354,7 @@ def retrieve_all_orders_original(location_id, begin_time=None, end_time=None):
         }
 
     # Send the POST request to retrieve orders
-    response = requests.post(url_orders_search, headers=headers, json=body)
+    response = client.post(url_orders_search, json=body)
 
     if response.status_code == 200:
         result = response.json()
@@ -178,143 +386,244 @@ def extract_order_items(orders):
     return transactions
 
 
+@traced(rows='result')
 def orders_to_dataframe(orders):
-    """Convert a list of orders to a pandas DataFrame."""
-    records = []
+    """Convert a list of orders to a pandas DataFrame with one row per line item.
+
+    Orders without line items keep a single row with their order-level total. The columns are built in one
+    pass by OrderColumnBuilder, without an intermediate dict per row.
+    """
+    from order_columns import OrderColumnBuilder
+
+    return OrderColumnBuilder().extend(orders).to_dataframe()
+
+
+def load_sync_state(state_path):
+    """Load the incremental sync checkpoint, or an empty state if no sync has run yet."""
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def save_sync_state(state_path, state):
+    """Write the checkpoint atomically so a crash never leaves a half-written state file."""
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+@traced(rows='input')
+def upsert_orders_csv(df_new, store_path):
+    """Replace every order in df_new inside the CSV store, appending orders it has not seen before."""
+    import pandas as pd
+
+    if os.path.exists(store_path):
+        df_store = pd.read_csv(store_path, dtype={'order_id': str}, encoding='utf-8-sig')
+        df_store = df_store[~df_store['order_id'].isin(df_new['order_id'])]
+        df_new = pd.concat([df_store, df_new], ignore_index=True)
+    df_new.to_csv(store_path, index=False, mode='w', encoding='utf-8-sig')
+
+
+def latest_versions(orders):
+    """orders with only the newest version (latest updated_at, then highest version) of each order id.
+
+    An order updated while a sync pages through the results is returned again on a later page.
+    """
+    latest = {}
     for order in orders:
-        order_id = order.get('id')
-        location_id = order.get('location_id')
-        created_at = order.get('created_at')
-        updated_at = order.get('updated_at')
-        state = order.get('state')
+        kept = latest.get(order['id'])
+        if kept is None or (order.get('updated_at', ''), order.get('version', 0)) >= \
+                (kept.get('updated_at', ''), kept.get('version', 0)):
+            latest[order['id']] = order
+    return list(latest.values())
 
-        # Check if 'line_items' exists and is not empty
-        line_items = order.get('line_items', [])
-        if line_items:
-            for item in line_items:
-                record = {
-                    'order_id': order_id,
-                    'location_id': location_id,
-                    'created_at': created_at,
-                    'updated_at': updated_at,
-                    'state': state,
-                    'item_id': item.get('catalog_object_id'),
-                    'item_name': item.get('name'),
-                    'variation_name': item.get('variation_name'),
-                    'quantity': item.get('quantity'),
-                    'base_price': item.get('base_price_money', {}).get('amount', 0) / 100,
-                    'total_money': item.get('total_money', {}).get('amount', 0) / 100,
-                }
-                records.append(record)
-        else:
-            # Handle orders without line items if needed
-            # For example, log them or store basic info
-            record = {
-                'order_id': order_id,
-                'location_id': location_id,
-                'created_at': created_at,
-                'updated_at': updated_at,
-                'state': state,
-                'item_id': None,
-                'item_name': None,
-                'variation_name': None,
-                'quantity': None,
-                'base_price': None,
-                'total_money': order.get('total_money', {}).get('amount', 0) / 100,
+
+@traced()
+def sync_orders(location_id, store_path, state_path, begin_time=None, checkpoint_every=20, client=None,
+                pair_index=None):
+    """Fetch only orders created or updated since the last sync and upsert them into the local store.
+
+    store_path is either a .csv file or the root of the Parquet order store. If a pair_index.PairIndex is given,
+    every upserted batch is folded into it too (updated orders replace their pairs, cancelled ones retract).
+
+    The first run starts at begin_time. Every checkpoint_every pages the fetched orders are upserted and the
+    high-water mark (latest updated_at) plus the live cursor are saved, so an interrupted run resumes mid-query.
+    """
+    import order_store
+
+    client = client or default_client()
+    state = load_sync_state(state_path)
+
+    # A saved cursor is only valid for the query that produced it, so resume with that query's start
+    start_at = state.get('query_start_at') if state.get('cursor') else state.get('updated_at', begin_time)
+    cursor = state.get('cursor')
+    high_water_mark = state.get('updated_at', begin_time)
+
+    pending = []
+    pages = 0
+    synced = 0
+    while True:
+        body = {
+            "location_ids": location_ids(location_id),
+            "limit": 500,
+            "query": {
+                # Sorting must use the same field as the date filter
+                "sort": {"sort_field": "UPDATED_AT", "sort_order": "ASC"}
             }
-            records.append(record)
-    df = pd.DataFrame(records)
-    return df
+        }
+        if start_at:
+            body["query"]["filter"] = {"date_time_filter": {"updated_at": {"start_at": start_at}}}
+        if cursor:
+            body['cursor'] = cursor
+
+        response = client.post(url_orders_search, json=body)
+        if response.status_code != 200:
+            print(f"Error syncing orders: {response.status_code}")
+            print(response.text)
+            # The last checkpoint stays as saved, so the next run resumes from it
+            raise SquareAPIError(f"Syncing orders failed with {response.status_code}", response.status_code, cursor)
+
+        result = response.json()
+        pending.extend(result.get('orders', []))
+        cursor = result.get('cursor')
+        pages += 1
+
+        if not cursor or pages % checkpoint_every == 0:
+            if pending:
+                pending = latest_versions(pending)
+                batch = orders_to_dataframe(pending)
+                if store_path.endswith('.csv'):
+                    upsert_orders_csv(batch, store_path)
+                else:
+                    order_store.upsert_orders(batch, store_path)
+                if pair_index is not None:
+                    pair_index.add(batch)
+                high_water_mark = max([high_water_mark or ''] + [order['updated_at'] for order in pending])
+                synced += len(pending)
+                pending = []
+            save_sync_state(state_path, {'updated_at': high_water_mark, 'cursor': cursor, 'query_start_at': start_at})
+
+        if not cursor:
+            break
+
+    print(f"Synced {synced} orders, high-water mark {high_water_mark}")
+    return synced
+
+
+def default_client():
+    """The shared pooled client used when no client is passed, created on first use.
+
+    Loads the project's .env for PRODUCTION_ACCESS_TOKEN and enables the on-disk response cache when
+    SQUARE_CACHE_DIR is set (SQUARE_OFFLINE=1 replays it without the network). SQUARE_RATE_LIMIT, when set,
+    is the request rate to pace at. Importing this module does none of this.
+    """
+    global square_client
+    with _client_lock:
+        if square_client is None:
+            from dotenv import load_dotenv
+
+            # Load the .env file from the root directory
+            load_dotenv(os.path.join(project_root, '.env'))
+            production_access_token = os.getenv('PRODUCTION_ACCESS_TOKEN')
+
+            # Optional on-disk response cache for development reruns
+            cache_dir = os.getenv('SQUARE_CACHE_DIR')
+            response_cache = ResponseCache(cache_dir, offline=os.getenv('SQUARE_OFFLINE') == '1') if cache_dir else None
+
+            # Pooled client carrying the Bearer token for authentication. With a known request rate
+            # (SQUARE_RATE_LIMIT requests/second) every request is paced just under it; without one, 429s are
+            # handled by the client's Retry-After retries alone
+            rate_limit = os.getenv('SQUARE_RATE_LIMIT')
+            rate_limiter = RateLimiter(rate=float(rate_limit)) if rate_limit else None
+            square_client = SquareClient(production_access_token, cache=response_cache, rate_limiter=rate_limiter)
+    return square_client
 
 
 # Get the root project directory
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
-# Load the .env file from the root directory
-load_dotenv(os.path.join(project_root, '.env'))
-
-# sandbox_access_token = os.getenv('SANDBOX_ACCESS_TOKEN')
-production_access_token = os.getenv('PRODUCTION_ACCESS_TOKEN')
-
-# URLs for the production environment
-url_customers = 'https://connect.squareup.com/v2/customers'
-url_payments = 'https://connect.squareup.com/v2/payments'
-url_orders = 'https://connect.squareup.com/v2/orders'
-url_orders_search = 'https://connect.squareup.com/v2/orders/search'
-
-# Define the headers with the Bearer token for authentication
-headers = {
-    'Authorization': f'Bearer {production_access_token}',
-    'Content-Type': 'application/json'
-}
-
-# Retrieve all orders
-location_id = 'ZE934VV8RCWGF'
-begin_time = '2024-09-01T00:00:00Z'
-end_time = '2024-09-30T23:59:59Z'
-orders = retrieve_all_orders(location_id, begin_time, end_time)
-
-# Extract items from orders
-transactions = extract_order_items(orders)
-
-# Create a DataFrame of transactions
-df_transactions = pd.DataFrame({'items': transactions})
-
-# Display the first few transactions
-print(df_transactions.head())
-
-##### Pairs #####
-# Count item pairs
-item_pairs = Counter()
-for items in transactions:
-    # Get all unique combinations of items in a transaction
-    for pair in combinations(set(items), 2):
-        item_pairs[pair] += 1
-
-# Convert to DataFrame
-df_item_pairs = pd.DataFrame(item_pairs.items(), columns=['pair', 'count'])
-
-# Sort by count in descending order
-df_item_pairs = df_item_pairs.sort_values(by='count', ascending=False)
-
-# Display the top item pairs
-print(df_item_pairs.head(20))
-
-# Older
-result_customer = retrieve_customers()
-result_payment = retrieve_payments()
-payment_id = '9cz2SGyoUPxNucaG0pwmWeLavaB'
-result_order = get_orders_from_payment(payment_id)
-
-pass
-
-# TODO
-# Get all orders > 0 USD
-
-# Write
-# Convert orders to DataFrame
-
-# Write to CSV
-df_orders = orders_to_dataframe(orders)
-output_path = r'C:\Users\samea\PycharmProjects\WaypointCoffeeSquare\orders_90k_2024.csv'
-df_orders.to_csv(output_path, index=False, mode='w', encoding='utf-8-sig')
-
-## Put in pandas dataframe with these tables:
-# Transaction table:
-# order_id | location_id | customer_id | created at | dollars | item_id | quantity_purchased
-# Item table:
-# item_id | item_name | item_category
-
-for idx, order in enumerate(result_order['order']['line_items']):
-    if idx == 2:  # Stop after 10 payments
-        break
-    print(order)
-
-for idx, payment in enumerate(result_payment['payments']):
-    if idx == 2:  # Stop after 10 payments
-        break
-    amount = payment['amount_money']['amount'] / 100  # Convert to dollars if needed
-    currency = payment['amount_money']['currency']
-    print(payment)
-
-a = 1
+# Square production; SQUARE_BASE_URL or set_base_url() points every endpoint elsewhere (sandbox, local mock)
+DEFAULT_BASE_URL = 'https://connect.squareup.com'
+
+
+def set_base_url(base_url=None):
+    """Rebuild every endpoint URL on base_url, e.g. 'http://127.0.0.1:8080' for the local mock server.
+
+    With no argument the URLs go back to SQUARE_BASE_URL, or Square production if that is not set.
+    """
+    global url_customers, url_payments, url_orders, url_orders_search, url_orders_batch_retrieve, url_locations
+    base_url = (base_url or os.getenv('SQUARE_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+    url_customers = f'{base_url}/v2/customers'
+    url_payments = f'{base_url}/v2/payments'
+    url_orders = f'{base_url}/v2/orders'
+    url_orders_search = f'{base_url}/v2/orders/search'
+    url_orders_batch_retrieve = f'{base_url}/v2/orders/batch-retrieve'
+    url_locations = f'{base_url}/v2/locations'
+
+
+set_base_url()
+
+# Shared client, created by default_client() on first use
+square_client = None
+_client_lock = threading.Lock()
+
+if __name__ == '__main__':
+    import order_store
+    from baskets import Baskets
+
+    # Retrieve all orders
+    location_id = 'ZE934VV8RCWGF'
+    begin_time = '2024-09-01T00:00:00Z'
+    end_time = '2024-09-30T23:59:59Z'
+    orders = retrieve_all_orders(location_id, begin_time, end_time, windows=8)
+
+    # Compact baskets: interned item codes with per-basket quantities, no per-unit string lists
+    baskets = Baskets.from_orders(orders)
+    print(baskets.basket_size_stats())
+
+    ##### Pairs #####
+    df_item_pairs = baskets.pair_counts()
+
+    # Display the top item pairs
+    print(df_item_pairs.head(20))
+
+    # Older
+    result_customer = retrieve_customers()
+    result_payment = retrieve_payments()
+    payment_id = '9cz2SGyoUPxNucaG0pwmWeLavaB'
+    result_order = get_orders_from_payment(payment_id)
+
+    pass
+
+    # TODO
+    # Get all orders > 0 USD
+
+    # Write
+    # Convert orders to DataFrame
+
+    # Write to the Parquet order store (partitioned by year/month)
+    df_orders = orders_to_dataframe(orders)
+    store_path = r'C:\Users\samea\PycharmProjects\WaypointCoffeeSquare\orders_store'
+    order_store.write_orders(df_orders, store_path)
+
+    ## Put in pandas dataframe with these tables:
+    # Transaction table:
+    # order_id | location_id | customer_id | created at | dollars | item_id | quantity_purchased
+    # Item table:
+    # item_id | item_name | item_category
+
+    for idx, order in enumerate(result_order['order']['line_items']):
+        if idx == 2:  # Stop after 10 payments
+            break
+        print(order)
+
+    for idx, payment in enumerate(result_payment['payments']):
+        if idx == 2:  # Stop after 10 payments
+            break
+        amount = payment['amount_money']['amount'] / 100  # Convert to dollars if needed
+        currency = payment['amount_money']['currency']
+        print(payment)
+
+    a = 1
@@ -0,0 +1,80 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every fetcher, with additive-increase/multiplicative-decrease.
+
+    rate is the API's documented request rate and pacing starts there from the first request, so there is no
+    burst of 429s while it ramps up. burst caps how many requests may go out back to back. Each request takes
+    one token; successes raise the pace by `increase` requests/second up to max_rate (defaults to rate), and a
+    429 halves it (down to min_rate) and pauses every caller until the server's Retry-After has passed, for when
+    the real limit is lower than documented or is shared with other clients.
+    """
+
+    def __init__(self, rate=10.0, burst=1, min_rate=1.0, max_rate=None, increase=0.5):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.increase = increase
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until this caller may send a request."""
+        with self.lock:
+            now = time.monotonic()
+            # During a pause the bucket is frozen at the pause end (updated is in the future) and does not refill
+            if now > self.updated:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+            # Tokens may go negative: each caller reserves its slot, 1/rate after the one before it, counted
+            # from updated (now, or the end of a pause)
+            self.tokens -= 1
+            wait = self.updated - now + (-self.tokens / self.rate if self.tokens < 0 else 0.0)
+        if wait > 0:
+            time.sleep(wait)
+
+    def succeeded(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def throttled(self, delay):
+        """Back off after a 429: halve the rate and hold everyone for delay seconds."""
+        with self.lock:
+            now = time.monotonic()
+            # Concurrent callers throttled in the same episode only count once
+            if now >= self.paused_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self.paused_until = max(self.paused_until, now + delay)
+            # Restart the bucket at the pause end with one token, so the slots callers reserve during the pause
+            # are spaced out after it instead of all falling due the moment it ends
+            self.updated = self.paused_until
+            self.tokens = 1
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Exponential backoff with full jitter for the given 0-based retry attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(response):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date), or None if absent."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Seconds a cached page stays fresh, matched on the longest endpoint path prefix
+DEFAULT_TTLS = {
+    '/v2/orders/search': 60 * 60,
+    '/v2/orders': 24 * 60 * 60,
+    '/v2/payments': 24 * 60 * 60,
+    '/v2/customers': 60 * 60,
+}
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a request has no cached response."""
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of successful Square API responses.
+
+    Entries are keyed by method, URL and request body. Each endpoint has its own TTL, and order searches
+    whose created_at window closed more than closed_after ago never expire. Order searches without a created_at
+    end in the past, and updated_at searches, are never cached. Once the cache grows past
+    max_bytes the least recently used entries are evicted. With offline=True nothing goes to the network:
+    cached entries are replayed regardless of age and anything else raises CacheMiss.
+    """
+
+    def __init__(self, directory, ttls=None, max_bytes=512 * 1024 * 1024, offline=False,
+                 closed_after=timedelta(days=7)):
+        self.directory = directory
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.closed_after = closed_after
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # key -> [size, last used]; rebuilt from the files so the cache survives restarts
+        self.entries = {}
+        for name in os.listdir(directory):
+            if name.endswith('.entry'):
+                stat = os.stat(os.path.join(directory, name))
+                self.entries[name[:-len('.entry')]] = [stat.st_size, stat.st_mtime]
+        self.total_bytes = sum(size for size, _ in self.entries.values())
+
+    @staticmethod
+    def key(method, url, body=None, params=None):
+        """Hash of everything that determines the response."""
+        request = json.dumps([method.upper(), url, body, params], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    def ttl(self, url, body=None):
+        """Seconds to keep a response for url, or None to keep it until evicted."""
+        path = urlsplit(url).path
+        if path == '/v2/orders/search':
+            date_filter = (body or {}).get('query', {}).get('filter', {}).get('date_time_filter', {})
+            end_at = date_filter.get('created_at', {}).get('end_at')
+            # Searches that can still gain orders (no end, or one not yet reached) and updated_at syncs, which
+            # exist to see changes, always go to the network
+            if 'updated_at' in date_filter or not end_at:
+                return 0
+            end_at = datetime.fromisoformat(end_at)
+            if end_at > datetime.now(timezone.utc):
+                return 0
+            if end_at < datetime.now(timezone.utc) - self.closed_after:
+                return None
+
+        matches = [prefix for prefix in self.ttls if path == prefix or path.startswith(prefix + '/')]
+        return self.ttls[max(matches, key=len)] if matches else 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.entry')
+
+    def get(self, key):
+        """Return the cached requests.Response for key, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                content = f.read()
+        except FileNotFoundError:
+            return None
+
+        if not self.offline and meta['expires_at'] is not None and meta['expires_at'] < time.time():
+            return None
+
+        # Touch the entry so LRU eviction sees it as recently used
+        now = time.time()
+        os.utime(path, (now, now))
+        with self.lock:
+            if key in self.entries:
+                self.entries[key][1] = now
+
+        response = requests.Response()
+        response.status_code = meta['status_code']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.url = meta['url']
+        response.encoding = 'utf-8'
+        response._content = content
+        return response
+
+    def put(self, key, response, body=None):
+        """Store a successful response, then evict least recently used entries beyond max_bytes."""
+        ttl = self.ttl(response.url, body)
+        if ttl == 0:
+            return
+        meta = {
+            'url': response.url,
+            'status_code': response.status_code,
+            'headers': {'Content-Type': response.headers.get('Content-Type', 'application/json')},
+            'expires_at': None if ttl is None else time.time() + ttl,
+        }
+        data = json.dumps(meta).encode() + b'\n' + response.content
+
+        # Write to a temporary name first so concurrent readers never see a partial entry
+        path = self._path(key)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            previous = self.entries.get(key)
+            self.total_bytes += len(data) - (previous[0] if previous else 0)
+            self.entries[key] = [len(data), time.time()]
+            self._evict()
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self.entries.items(), key=lambda item: item[1][1]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            del self.entries[key]
+            self.total_bytes -= size
@@ -0,0 +1,126 @@
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from instrumentation import add, traced
+from response_cache import CacheMiss
+from rate_limiter import backoff_delay, retry_after_seconds
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SquareAPIError(Exception):
+    """A page request that still failed after all retries. cursor is the page to resume from.
+
+    orders holds whatever was fetched before the failure, when the caller collected any. A fetch split into
+    time windows also lists the (start_at, end_at, cursor) of every window still to finish in pending_windows.
+    """
+
+    def __init__(self, message, status_code=None, cursor=None, orders=None, pending_windows=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.cursor = cursor
+        self.orders = orders
+        self.pending_windows = pending_windows
+
+
+class SquareClient:
+    """Shared HTTP client for the Square API.
+
+    Owns one keep-alive requests.Session, so every page after the first reuses an open TLS connection
+    instead of doing a fresh handshake. pool_size should be at least the number of threads fetching at once.
+    An optional ResponseCache answers repeated requests from disk, and an optional shared RateLimiter paces
+    every request. 429s, 5xx and dropped connections are retried with jittered exponential backoff,
+    honouring Retry-After, up to max_retries times.
+    """
+
+    def __init__(self, access_token, pool_size=16, timeout=30, verify=True, cache=None, rate_limiter=None,
+                 max_retries=6):
+        self.timeout = timeout
+        self.verify = verify
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.session = requests.Session()
+
+        # One adapter serves both schemes so local stand-ins over plain HTTP get pooled too
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Replaces the old module-level headers dict
+        self.session.headers.update({
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+    def get(self, url, **kwargs):
+        """Send a GET request through the pooled session."""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Send a POST request through the pooled session."""
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """Send a request, answering it from the response cache when one is attached."""
+        # Requests the cache would not keep (open-ended and updated_at searches) always go to the network
+        if self.cache is None or (not self.cache.offline and self.cache.ttl(url, kwargs.get('json')) == 0):
+            return self._send(method, url, kwargs)
+
+        key = self.cache.key(method, url, kwargs.get('json'), kwargs.get('params'))
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+        if self.cache.offline:
+            raise CacheMiss(f'{method} {url} is not cached and the cache is offline')
+
+        response = self._send(method, url, kwargs)
+        if response.status_code == 200:
+            self.cache.put(key, response, kwargs.get('json'))
+        return response
+
+    @traced('http')
+    def _send(self, method, url, kwargs):
+        # Retrying resends the same body, so a failed page is retried from its own cursor
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.request(method, url, **self._request_options(kwargs))
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                if self.rate_limiter is not None and response.status_code < 400:
+                    self.rate_limiter.succeeded()
+                # Bytes on the wire: the compressed size when the server sent one
+                add(bytes=int(response.headers.get('Content-Length') or len(response.content)))
+                return response
+
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            if response.status_code == 429 and self.rate_limiter is not None:
+                self.rate_limiter.throttled(delay)
+            else:
+                time.sleep(delay)
+        return response
+
+    def _request_options(self, kwargs):
+        # verify is passed per request because REQUESTS_CA_BUNDLE would otherwise override session.verify
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.setdefault('verify', self.verify)
+        return kwargs
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
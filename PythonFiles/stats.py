@@ -1,37 +1,21 @@
 import pandas as pd
-import pytz
-from itertools import combinations
-from mlxtend.preprocessing import TransactionEncoder
-from mlxtend.frequent_patterns import apriori, association_rules
-import plotly.express as px
-import plotly.io as pio
-import plotly.graph_objects as go
-from collections import Counter
-
-
-def analyze_pairs(df):
-    # Initialize the counter for item pairs
-    item_pairs = Counter()
-
-    # Group the DataFrame by 'order_id' to get all items in each order
-    grouped_orders = df.groupby('order_id')
-
-    # Loop through each order and get the item names
-    for order_id, group in grouped_orders:
-        # Get the list of items in this order
-        items_in_order = group['item_name'].dropna().tolist()  # Drop NaN values (if any)
-
-        # Ensure there are at least two items to form a pair
-        if len(items_in_order) >= 2:
-            # Get all unique combinations of two items in the order
-            for pair in combinations(set(items_in_order), 2):
-                item_pairs[pair] += 1
-
-    # Convert item pairs counter to a DataFrame for easier manipulation
-    pairs_df = pd.DataFrame(item_pairs.items(), columns=['pair', 'count'])
-
-    # Sort pairs by count in descending order
-    pairs_df = pairs_df.sort_values(by='count', ascending=False)
+from instrumentation import traced
+from order_store import read_orders
+from pair_engine import count_pairs
+from pair_queries import PairQueries
+from pair_shards import count_pairs_sharded
+from itemsets import mine_rules
+from time_cube import TimeOfDayCube, build_store_cube, load_store_cube
+
+
+@traced(rows='input')
+def analyze_pairs(df, workers=None):
+    # Count every pair of distinct items bought together, once per order (sparse order x item product);
+    # with workers > 1 the orders are sharded across that many processes and the partial counts merged
+    if workers and workers > 1:
+        pairs_df = count_pairs_sharded(df, max_workers=workers, order_column='order_id', item_column='item_name')
+    else:
+        pairs_df = count_pairs(df, 'order_id', 'item_name')
 
     return pairs_df
 
@@ -50,43 +34,31 @@ def contains_latte(pair):
     return 'Latte' in (item1, item2)
 
 
-def split_latte_pairs(df):
-    # Filter to get pairs that contain 'Latte'
-    latte_df = df[df['pair'].apply(contains_latte)]
-
-    # Filter to get pairs that do not contain 'Latte'
-    non_latte_df = df[~df['pair'].apply(contains_latte)]
-
-    # Return both DataFrames
-    return latte_df, non_latte_df
-
+def split_item_pairs(df, item_name):
+    # Pairs that contain item_name, and pairs that do not, both still highest count first; read from the
+    # item-indexed PairQueries instead of testing every row. Pass a PairQueries built once to avoid re-indexing
+    queries = df if isinstance(df, PairQueries) else PairQueries.from_pairs(df)
+    return queries.pairs_with(item_name), queries.top_pairs(None, exclude=[item_name])
 
-def analyze_time_of_day(df):
-    # Convert 'created_at' to Eastern Time (handles daylight savings time automatically)
-    df['created_at_et'] = df['created_at'].dt.tz_convert('US/Eastern')
 
-    # Extract the hour and minute, and combine them into a new 'time_et' column
-    df['time_et'] = df['created_at_et'].dt.strftime('%H:%M')  # Combines hour and minute into 'HH:MM'
-
-    # Extract the day of the week for analysis
-    df['day_of_week'] = df['created_at_et'].dt.day_name()  # Gets day names like 'Monday', 'Tuesday', etc.
-
-    # Extract the year for filtering and comparison
-    df['year_et'] = df['created_at_et'].dt.year
-
-    # Group by time only
-    purchases_by_time = df.groupby('time_et').size()
-
-    # Group by day of week and time (hour + minute)
-    purchases_td = df.groupby(['day_of_week', 'time_et']).size().reset_index(name='count')
+def split_latte_pairs(df):
+    return split_item_pairs(df, 'Latte')
 
-    # Group by day of week and time (hour + minute)
-    purchases_tdy = df.groupby(['year_et', 'day_of_week', 'time_et']).size().reset_index(name='count')
 
-    return purchases_by_time, purchases_td, purchases_tdy
+@traced(rows='input')
+def analyze_time_of_day(df=None, store=None):
+    # Count purchases per (ISO year, week, weekday, minute) in Eastern Time with integer codes, then roll the cube up
+    # to by time, by day and time, and by calendar year, day and time. With store (covering the same orders as df),
+    # the cube kept next to it is read instead; df is only counted when that store has no cube yet, and may be
+    # left out to count the store itself. df is left untouched.
+    cube = load_store_cube(store) if store else None
+    if cube is None:
+        cube = TimeOfDayCube.from_orders(df, 'US/Eastern') if df is not None else build_store_cube(store)
+    return cube.rollup()
 
 
 def plot_pairs_table(df):
+    import plotly.graph_objects as go
 
     df = df.nlargest(15, 'count')
 
@@ -104,16 +76,12 @@ def plot_pairs_table(df):
 
 
 def plot_pairs_single_bar(df, item_name):
-    def remove_item_name(pair):
-        item1, item2 = pair
-        if item1 == item_name:
-            return item2
-        else:
-            return item1
+    import plotly.express as px
 
-    df['paired_item'] = df['pair'].apply(remove_item_name)
-
-    df_top_ten = df.nlargest(10, 'count')
+    # Top 10 partners straight from item_name's pair list; df may be a pairs frame or, to reuse an index that is
+    # already built, a PairQueries
+    queries = df if isinstance(df, PairQueries) else PairQueries.from_pairs(df)
+    df_top_ten = queries.partners(item_name, 10).rename(columns={'partner': 'paired_item'})
 
     # Simple
     fig = px.bar(df_top_ten,
@@ -130,7 +98,7 @@ def plot_pairs_single_bar(df, item_name):
     fig = px.bar(df_top_ten,
                  x='paired_item',
                  y='count',
-                 title='Top 10 Items Paired with Latte',
+                 title=f'Top 10 Items Paired with {item_name}',
                  labels={'paired_item': 'Paired Item', 'count': 'Frequency'},
                  text='count',
                  color='count',  # Use 'count' for color intensity
@@ -157,6 +125,8 @@ def plot_pairs_single_bar(df, item_name):
     fig.show()
 
 def plot_pairs_heatmap(df):
+    import plotly.express as px
+
     # Split the 'pair' column into 'item1' and 'item2'
     df = df.head(50)
     df[['item1', 'item2']] = pd.DataFrame(df['pair'].tolist(), index=df.index)
@@ -202,6 +172,8 @@ def plot_pairs_heatmap(df):
 
 
 def plot_daily_time(df):
+    import plotly.express as px
+
     # Day and time
     fig = px.violin(df,
                     x='time_et',
@@ -215,7 +187,9 @@ def plot_daily_time(df):
     fig.show()
 
 def plot_yearly_time(df):
-    df = df[time_day_year_df['year_et'].isin([2023, 2024])]
+    import plotly.graph_objects as go
+
+    df = df[df['year_et'].isin([2023, 2024])]
 
     # Create the figure object
     fig = go.Figure()
@@ -254,28 +228,37 @@ def plot_yearly_time(df):
     # Show the plot
     fig.show()
 
-orders_df = pd.read_csv(r'C:\Users\samea\PycharmProjects\WaypointCoffeeSquare\orders_90k_2024.csv')
 
-orders_df['created_at'] = pd.to_datetime(orders_df['created_at'], format='ISO8601', utc=True, errors='coerce')
+if __name__ == '__main__':
+    # Typed Parquet store: created_at is already a UTC timestamp, no parsing needed
+    store_root = r'C:\Users\samea\PycharmProjects\WaypointCoffeeSquare\orders_store'
+    orders_df = read_orders(store_root)
 
-##### Pairs #####
-pairs_df = analyze_pairs(orders_df)
-pairs_df['pair'] = pairs_df['pair'].apply(ensure_latte_first)
-print(pairs_df.head(10))
-pairs_df_latte, pairs_df_non_latte = split_latte_pairs(pairs_df)
-print(pairs_df_latte.head(10))
-print(pairs_df_non_latte.head(10))
+    ##### Pairs #####
+    pairs_df = analyze_pairs(orders_df)
+    pairs_df['pair'] = pairs_df['pair'].apply(ensure_latte_first)
+    print(pairs_df.head(10))
+    # Index the pairs once; the split and the Latte bar chart both read from it
+    queries = PairQueries.from_pairs(pairs_df)
+    pairs_df_latte, pairs_df_non_latte = split_latte_pairs(queries)
+    print(pairs_df_latte.head(10))
+    print(pairs_df_non_latte.head(10))
 
-##### Time of Day #####
-(_, time_day_df, time_day_year_df) = analyze_time_of_day(orders_df)
+    ##### Itemsets #####
+    # Sparse Eclat: itemsets of any size and the rules between them, without a dense one-hot frame
+    itemsets_df, rules_df = mine_rules(orders_df, min_support=0.005, min_confidence=0.2, min_lift=1.0)
+    print(itemsets_df[itemsets_df['itemsets'].map(len) >= 3].head(10))
+    print(rules_df.head(10))
 
-pass
+    ##### Time of Day #####
+    (_, time_day_df, time_day_year_df) = analyze_time_of_day(orders_df, store=store_root)
 
-##### Plotting #####
-plot_pairs_single_bar(pairs_df_latte, 'Latte')
-plot_pairs_heatmap(pairs_df_non_latte)
-plot_daily_time(time_day_df)
-plot_yearly_time(time_day_year_df)
+    pass
 
-## New ##
+    ##### Plotting #####
+    plot_pairs_single_bar(queries, 'Latte')
+    plot_pairs_heatmap(pairs_df_non_latte)
+    plot_daily_time(time_day_df)
+    plot_yearly_time(time_day_year_df)
 
+    ## New ##
@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Make the PythonFiles modules importable when run from anywhere
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from baskets import Baskets
+from pull_data_and_analyze import orders_to_dataframe
+
+ORDERS = [
+    {'id': 'ORDER_A', 'line_items': [{'name': 'Coffee Beans', 'quantity': '0.5'}, {'name': 'Latte', 'quantity': '2'},
+                                     {'name': 'Coffee Beans', 'quantity': '0.25'}]},
+    {'id': 'ORDER_B', 'line_items': [{'name': 'Scone'}, {'name': 'Latte', 'quantity': '1'}]},
+]
+
+
+class BasketsQuantityTest(unittest.TestCase):
+
+    def test_fractional_quantities_match_in_both_constructors(self):
+        from_orders = Baskets.from_orders(ORDERS)
+        from_dataframe = Baskets.from_dataframe(orders_to_dataframe(ORDERS))
+
+        for baskets in (from_orders, from_dataframe):
+            self.assertEqual(dict(baskets.basket(0)), {'Coffee Beans': 0.75, 'Latte': 2.0})
+            # A line item without a quantity counts as one unit
+            self.assertEqual(dict(baskets.basket(1)), {'Scone': 1.0, 'Latte': 1.0})
+            np.testing.assert_allclose(baskets.total_quantities(), [2.75, 2.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
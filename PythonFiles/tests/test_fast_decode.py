@@ -0,0 +1,36 @@
+import json
+import os
+import sys
+import unittest
+
+# Make the PythonFiles modules importable when run from anywhere
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fast_decode
+from pull_data_and_analyze import orders_to_dataframe
+
+PAGE = {'orders': [
+    {'id': 'A', 'location_id': 'LOC', 'state': 'COMPLETED', 'created_at': '2024-05-10T12:00:00Z',
+     'updated_at': '2024-05-10T12:01:00Z', 'total_money': {'amount': 900}, 'tenders': [{'type': 'CARD'}],
+     'line_items': [
+         {'catalog_object_id': 'ITEM_LATTE', 'name': 'Latte', 'variation_name': 'Large', 'quantity': '2',
+          'base_price_money': {'amount': 450}, 'total_money': {'amount': 900}},
+         # Custom amounts have no catalog id, variation or base price
+         {'name': 'Tip', 'quantity': '0.5', 'total_money': {'amount': 0}}]},
+    {'id': 'B', 'location_id': 'LOC', 'state': 'OPEN', 'created_at': '2024-05-11T08:00:00Z',
+     'updated_at': '2024-05-11T08:00:00Z', 'total_money': {'amount': 300}},
+], 'cursor': 'NEXT'}
+
+
+@unittest.skipIf(fast_decode.msgspec is None, 'msgspec is not installed')
+class FlattenStructsTest(unittest.TestCase):
+
+    def test_structs_flatten_like_dicts(self):
+        orders, cursor = fast_decode.decode_orders_page(json.dumps(PAGE).encode())
+
+        self.assertEqual(cursor, 'NEXT')
+        self.assertTrue(fast_decode.flatten_orders(orders).equals(orders_to_dataframe(PAGE['orders'])))
+
+
+if __name__ == '__main__':
+    unittest.main()
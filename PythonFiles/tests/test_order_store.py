@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+# Make the PythonFiles modules importable when run from anywhere
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import order_store
+from pull_data_and_analyze import orders_to_dataframe
+from stats import analyze_time_of_day
+from time_cube import TimeOfDayCube, load_store_cube, store_cube_path
+
+
+def order(order_id, created_at, line_items=None):
+    order = {'id': order_id, 'location_id': 'LOC', 'state': 'COMPLETED', 'created_at': created_at,
+             'updated_at': created_at, 'total_money': {'amount': 450}}
+    if line_items:
+        order['line_items'] = line_items
+    return order
+
+
+def line_item(name, quantity='1'):
+    return {'catalog_object_id': f'ITEM_{name}', 'name': name, 'variation_name': 'Regular', 'quantity': quantity,
+            'base_price_money': {'amount': 450}, 'total_money': {'amount': 450}}
+
+
+class OrderStoreSchemaTest(unittest.TestCase):
+
+    def test_month_without_line_items_keeps_other_months_item_names(self):
+        # May holds only bare orders, so none of its item columns has a single value
+        with tempfile.TemporaryDirectory() as root:
+            order_store.upsert_orders(orders_to_dataframe([order('BARE', '2024-05-10T12:00:00Z')]), root)
+            order_store.upsert_orders(orders_to_dataframe([
+                order('FULL', '2024-06-10T12:00:00Z', [line_item('Latte'), line_item('Scone')])]), root)
+            df = order_store.read_orders(root)
+
+        self.assertEqual(df.loc[df['order_id'] == 'FULL', 'item_name'].tolist(), ['Latte', 'Scone'])
+        self.assertTrue(df.loc[df['order_id'] == 'BARE', 'item_name'].isna().all())
+
+    def test_whole_and_fractional_quantity_months(self):
+        with tempfile.TemporaryDirectory() as root:
+            order_store.write_orders(orders_to_dataframe([
+                order('WHOLE', '2024-05-10T12:00:00Z', [line_item('Latte', '2')])]), root)
+            order_store.write_orders(orders_to_dataframe([
+                order('BEANS', '2024-06-10T12:00:00Z', [line_item('Coffee Beans', '0.5')])]), root)
+            df = order_store.read_orders(root).set_index('order_id')
+
+        self.assertEqual(df.loc['WHOLE', 'quantity'], 2.0)
+        self.assertEqual(df.loc['BEANS', 'quantity'], 0.5)
+
+    def test_unparseable_created_at_is_stored_and_upserted(self):
+        with tempfile.TemporaryDirectory() as root:
+            order_store.write_orders(orders_to_dataframe([
+                order('GOOD', '2024-05-10T12:00:00Z', [line_item('Latte')]),
+                order('BAD', 'not a time', [line_item('Scone')])]), root)
+            order_store.upsert_orders(orders_to_dataframe([order('BAD', 'still not a time', [line_item('Mocha')])]),
+                                      root)
+            df = order_store.read_orders(root).set_index('order_id')
+
+        self.assertEqual(sorted(df.index), ['BAD', 'GOOD'])
+        self.assertTrue(pd.isna(df.loc['BAD', 'created_at']))
+        self.assertEqual(df.loc['BAD', 'item_name'], 'Mocha')
+
+    def test_no_orders_keep_every_column(self):
+        df = orders_to_dataframe([])
+
+        self.assertEqual(len(df), 0)
+        self.assertIn('created_at', df.columns)
+        self.assertEqual(list(order_store.to_store_frame(df).columns), order_store.STORE_SCHEMA.names)
+
+
+class StoreCubeTest(unittest.TestCase):
+
+    def assertCubeMatchesStore(self, root):
+        expected = TimeOfDayCube.from_orders(order_store.read_orders(root, columns=['created_at'])).rollup()
+        for want, got in zip(expected, load_store_cube(root).rollup()):
+            self.assertTrue(want.equals(got))
+
+    def test_cube_follows_writes_appends_and_upserts(self):
+        with tempfile.TemporaryDirectory() as root:
+            order_store.write_orders(orders_to_dataframe([
+                order('A', '2024-05-10T12:00:00Z', [line_item('Latte'), line_item('Scone')]),
+                order('B', '2024-06-10T08:30:00Z', [line_item('Latte')])]), root)
+            self.assertCubeMatchesStore(root)
+
+            order_store.append_orders(orders_to_dataframe([
+                order('C', '2024-06-11T08:30:00Z', [line_item('Mocha')])]), root, 'extra')
+            self.assertCubeMatchesStore(root)
+
+            # A moves to another minute and B leaves June's rewrite untouched
+            order_store.upsert_orders(orders_to_dataframe([
+                order('A', '2024-05-10T15:45:00Z', [line_item('Latte')])]), root)
+            self.assertCubeMatchesStore(root)
+
+            # Rewriting June with one order drops B's and C's counts
+            order_store.write_orders(orders_to_dataframe([
+                order('D', '2024-06-12T09:00:00Z', [line_item('Latte')])]), root)
+            self.assertCubeMatchesStore(root)
+
+    def test_analysis_reads_the_cube_and_rebuilds_a_missing_one(self):
+        with tempfile.TemporaryDirectory() as root:
+            order_store.write_orders(orders_to_dataframe([
+                order('A', '2024-05-10T12:00:00Z', [line_item('Latte'), line_item('Scone')])]), root)
+            df = order_store.read_orders(root)
+            expected = analyze_time_of_day(df)
+
+            # The cube answers even when handed no orders at all
+            for want, got in zip(expected, analyze_time_of_day(store=root)):
+                self.assertTrue(want.equals(got))
+
+            os.remove(store_cube_path(root))
+            for want, got in zip(expected, analyze_time_of_day(store=root)):
+                self.assertTrue(want.equals(got))
+            self.assertTrue(os.path.exists(store_cube_path(root)))
+
+
+if __name__ == '__main__':
+    unittest.main()
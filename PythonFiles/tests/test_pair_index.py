@@ -0,0 +1,35 @@
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+# Make the PythonFiles modules importable when run from anywhere
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pair_index import PairIndex
+
+
+def batch(order_id, created_at, items):
+    return pd.DataFrame({'order_id': order_id, 'created_at': created_at, 'updated_at': created_at,
+                         'state': 'COMPLETED', 'item_name': items})
+
+
+class DayAxisTest(unittest.TestCase):
+
+    def test_growing_backwards_adds_only_the_earlier_days(self):
+        index = PairIndex()
+        index.add(batch('LATE', '2024-05-20T16:00:00Z', ['Latte', 'Scone']))
+        # Each batch reaches back further while also touching days already indexed
+        index.add(pd.concat([batch('MID', '2024-05-15T16:00:00Z', ['Latte', 'Mocha']),
+                             batch('LATER', '2024-05-20T17:00:00Z', ['Latte', 'Mocha'])]))
+        index.add(pd.concat([batch('EARLY', '2024-05-10T16:00:00Z', ['Latte', 'Scone']),
+                             batch('LATEST', '2024-05-20T18:00:00Z', ['Latte', 'Scone'])]))
+
+        # One row per day from May 10 to May 20
+        self.assertEqual(len(index.counts), 11)
+        self.assertEqual(index.top_pairs(k=None)['count'].sum(), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
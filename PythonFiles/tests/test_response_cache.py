@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Make the PythonFiles modules importable when run from anywhere
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from response_cache import ResponseCache
+
+SEARCH_URL = 'https://connect.squareup.com/v2/orders/search'
+
+
+def search(field, start_at='2024-01-01T00:00:00Z', end_at=None):
+    time_range = {'start_at': start_at}
+    if end_at:
+        time_range['end_at'] = end_at
+    return {'location_ids': ['LOC'], 'query': {'filter': {'date_time_filter': {field: time_range}}}}
+
+
+class SearchTtlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_searches_that_can_still_change_are_never_cached(self):
+        self.assertEqual(self.cache.ttl(SEARCH_URL, {'location_ids': ['LOC']}), 0)
+        self.assertEqual(self.cache.ttl(SEARCH_URL, search('created_at')), 0)
+        self.assertEqual(self.cache.ttl(SEARCH_URL, search('created_at', end_at='2999-01-01T00:00:00Z')), 0)
+        self.assertEqual(self.cache.ttl(SEARCH_URL, search('updated_at')), 0)
+        self.assertEqual(self.cache.ttl(SEARCH_URL, search('updated_at', end_at='2024-02-01T00:00:00Z')), 0)
+
+    def test_closed_created_at_window_is_kept(self):
+        self.assertIsNone(self.cache.ttl(SEARCH_URL, search('created_at', end_at='2024-02-01T00:00:00Z')))
+
+
+if __name__ == '__main__':
+    unittest.main()
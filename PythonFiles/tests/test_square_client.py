@@ -0,0 +1,127 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+# Make the PythonFiles modules and the mock server importable when run from anywhere
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import pull_data_and_analyze as pda
+from mock_square import MockSquareServer
+from order_generator import OrderGenerator
+from rate_limiter import RateLimiter
+from square_client import SquareAPIError, SquareClient
+
+BEGIN_TIME = '2024-01-01T00:00:00Z'
+END_TIME = '2024-12-31T23:59:59Z'
+
+# Retry-After is sent rounded to hundredths of a second
+TOLERANCE = 0.01
+
+
+class SquareClientMockServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.orders = OrderGenerator().orders(5_000, BEGIN_TIME, END_TIME)
+
+    def tearDown(self):
+        pda.set_base_url()
+
+    def fetch(self, server, client, windows):
+        pda.set_base_url(server.base_url)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return pda.retrieve_all_orders('MOCKLOCATION', BEGIN_TIME, END_TIME, windows=windows, client=client)
+
+    def assertNoOrdersLost(self, fetched):
+        ids = [order['id'] for order in fetched]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), {order['id'] for order in self.orders})
+
+    def test_retries_honour_retry_after_and_lose_no_orders(self):
+        server = MockSquareServer(self.orders, latency=0, rate_limit=3, error_rate=0.15,
+                                  error_statuses=(500, 503), seed=1)
+        with server, SquareClient('mock') as client:
+            fetched = self.fetch(server, client, windows=1)
+
+        self.assertNoOrdersLost(fetched)
+        self.assertGreater(server.throttled, 0)
+        self.assertGreater(server.errors, 0)
+
+        # One window pages sequentially, so the request after a 429 is that page's retry
+        log = server.request_log
+        for (sent, status, retry_after), (next_sent, _, _) in zip(log, log[1:]):
+            if status == 429:
+                self.assertGreaterEqual(next_sent - sent, retry_after - TOLERANCE)
+
+    def test_rate_limiter_stays_under_the_server_limit(self):
+        server = MockSquareServer(self.orders, latency=0, rate_limit=10, error_rate=0.1,
+                                  error_statuses=(500, 503), seed=2)
+        with server, SquareClient('mock', rate_limiter=RateLimiter(rate=8)) as client:
+            fetched = self.fetch(server, client, windows=4)
+
+        self.assertNoOrdersLost(fetched)
+        self.assertGreater(server.errors, 0)
+        self.assertEqual(server.throttled, 0)
+
+        # No one-second span, aligned to the server's windows or not, holds more than the limit
+        sent = [entry[0] for entry in server.request_log]
+        for start in sent:
+            self.assertLessEqual(sum(start <= other < start + 1.0 for other in sent), server.rate_limit)
+
+    def test_failed_fetch_resumes_from_its_cursor(self):
+        server = MockSquareServer(self.orders, latency=0, error_rate=0.3, seed=3)
+        with server, SquareClient('mock', max_retries=0) as client:
+            pda.set_base_url(server.base_url)
+            fetched, cursor, failures = [], None, 0
+            while True:
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        fetched += pda.retrieve_all_orders('MOCKLOCATION', BEGIN_TIME, END_TIME, client=client,
+                                                           cursor=cursor)
+                    break
+                except SquareAPIError as error:
+                    fetched += error.orders
+                    cursor, failures = error.cursor, failures + 1
+
+        self.assertGreater(failures, 0)
+        self.assertNoOrdersLost(fetched)
+
+    def test_failed_windows_resume_from_their_cursors(self):
+        server = MockSquareServer(self.orders, latency=0, error_rate=0.3, seed=4)
+        with server, SquareClient('mock', max_retries=0) as client:
+            try:
+                fetched = self.fetch(server, client, windows=4)
+                pending = []
+            except SquareAPIError as error:
+                fetched, pending = error.orders, error.pending_windows
+            self.assertTrue(pending)
+
+            while pending:
+                start_at, end_at, cursor = pending.pop()
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        fetched += pda.retrieve_all_orders('MOCKLOCATION', start_at, end_at, client=client,
+                                                           cursor=cursor)
+                except SquareAPIError as error:
+                    fetched += error.orders
+                    pending.append((start_at, end_at, error.cursor))
+
+        # Windows share their edges, so an order on one can arrive twice
+        self.assertNoOrdersLost(list({order['id']: order for order in fetched}.values()))
+
+    def test_time_filters_compare_times_not_strings(self):
+        # Half a second into the window sorts before its start as a string
+        edge = '2024-05-01T00:00:00.500Z'
+        orders = [dict(self.orders[0], id='EDGE', created_at=edge, updated_at=edge)]
+        server = MockSquareServer(orders, latency=0)
+        body = {'location_ids': ['MOCKLOCATION'], 'query': {'filter': {'date_time_filter': {'created_at': {
+            'start_at': '2024-05-01T00:00:00Z', 'end_at': '2024-05-01T00:00:01Z'}}}}}
+
+        self.assertEqual([order['id'] for order in server.search_orders(body)['orders']], ['EDGE'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+# Make the PythonFiles modules importable when run from anywhere
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pull_data_and_analyze import sync_orders
+
+
+def order(order_id, updated_at, version, item_name):
+    return {'id': order_id, 'location_id': 'LOC', 'state': 'COMPLETED', 'version': version,
+            'created_at': '2024-05-01T09:00:00Z', 'updated_at': updated_at,
+            'line_items': [{'name': item_name, 'quantity': '1', 'base_price_money': {'amount': 450},
+                            'total_money': {'amount': 450}}]}
+
+
+class FakeResponse:
+    status_code = 200
+    text = ''
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+class FakeClient:
+    """Serves the given pages of orders in turn, one per search call."""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+
+    def post(self, url, json=None):
+        orders = self.pages.pop(0)
+        return FakeResponse({'orders': orders, 'cursor': 'next' if self.pages else None})
+
+
+class SyncOrdersTest(unittest.TestCase):
+
+    def test_order_returned_twice_keeps_newest_version(self):
+        # ORDER_A is updated between the two pages, so the second page returns it again
+        pages = [
+            [order('ORDER_A', '2024-05-01T09:00:00Z', 1, 'Latte'),
+             order('ORDER_B', '2024-05-01T09:05:00Z', 1, 'Mocha')],
+            [order('ORDER_A', '2024-05-01T09:10:00Z', 2, 'Cappuccino')],
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            store_path = os.path.join(tmp, 'orders.csv')
+            synced = sync_orders('LOC', store_path, os.path.join(tmp, 'state.json'), client=FakeClient(pages))
+            df = pd.read_csv(store_path, encoding='utf-8-sig')
+
+        self.assertEqual(synced, 2)
+        self.assertEqual(sorted(df['order_id']), ['ORDER_A', 'ORDER_B'])
+        self.assertEqual(df.loc[df['order_id'] == 'ORDER_A', 'item_name'].tolist(), ['Cappuccino'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from calendar_features import iso_calendar_years, local_time_codes
+from order_store import read_orders
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+CUBE_COLUMNS = ['iso_year', 'week', 'weekday', 'minute', 'count']
+CUBE_DTYPES = {'iso_year': np.int16, 'week': np.int8, 'weekday': np.int8, 'minute': np.int16, 'count': np.int64}
+# The cube kept next to an order store also carries the store's year/month partition of every cell
+STORE_CUBE_DTYPES = {**CUBE_DTYPES, 'year': np.int16, 'month': np.int8}
+STORE_TIMEZONE = 'US/Eastern'
+
+
+class TimeOfDayCube:
+    """Line-item counts per (local ISO year, ISO week, weekday, minute of day), stored sparsely.
+
+    Built once from created_at or incrementally, one batch at a time; save() and load() round-trip the cells
+    through a small Parquet file. rollup() reproduces the three analyze_time_of_day outputs from the cube alone.
+    Keying on the ISO year keeps the week of 2024-12-30 (ISO week 1 of 2025) apart from 2024's first week.
+    """
+
+    def __init__(self, cells=None, timezone='US/Eastern'):
+        self.timezone = timezone
+        self.cells = cells if cells is not None else pd.DataFrame(
+            {name: np.zeros(0, dtype=dtype) for name, dtype in CUBE_DTYPES.items()})
+
+    @classmethod
+    def from_orders(cls, df, timezone='US/Eastern'):
+        cube = cls(timezone=timezone)
+        cube.add(df)
+        return cube
+
+    def add(self, batch):
+        """Count one line-item batch (anything with created_at) into the cube."""
+        iso_year, week, weekday, minute = local_time_codes(batch['created_at'], self.timezone)
+        if not len(iso_year):
+            return
+
+        # One dense bincount over the batch's years, then keep only the non-empty cells
+        first_year = iso_year.min()
+        flat = (((iso_year - first_year) * 54 + week) * 7 + weekday) * 1440 + minute
+        counts = np.bincount(flat)
+        cells = np.flatnonzero(counts)
+        minute_part = cells % 1440
+        weekday_part = cells // 1440 % 7
+        week_part = cells // (1440 * 7) % 54
+        year_part = cells // (1440 * 7 * 54) + first_year
+        new = pd.DataFrame({'iso_year': year_part, 'week': week_part, 'weekday': weekday_part, 'minute': minute_part,
+                            'count': counts[cells]}).astype(CUBE_DTYPES)
+
+        if len(self.cells):
+            new = pd.concat([self.cells, new], ignore_index=True)
+            new = new.groupby(CUBE_COLUMNS[:-1], as_index=False, sort=True)['count'].sum().astype(CUBE_DTYPES)
+        self.cells = new
+
+    def rollup(self, years=None):
+        """Same three outputs as stats.analyze_time_of_day: by time, by day and time, by year, day and time.
+
+        years optionally restricts the rollup to those calendar years.
+        """
+        cells = self.cells
+        year = iso_calendar_years(cells['iso_year'], cells['week'], cells['weekday'])
+        if years is not None:
+            keep = np.isin(year, list(years))
+            cells, year = cells[keep], year[keep]
+        minute = cells['minute'].to_numpy(dtype=np.int64)
+        weekday = cells['weekday'].to_numpy(dtype=np.int64)
+        counts = cells['count'].to_numpy(dtype=np.int64)
+
+        # Integer rollups first; only the at most 7 x 1440 result rows are ever turned into strings
+        by_minute = np.bincount(minute, weights=counts, minlength=1440).astype(np.int64)
+        minutes = np.flatnonzero(by_minute)
+        purchases_by_time = pd.Series(by_minute[minutes], index=pd.Index(time_labels(minutes), name='time_et'))
+
+        by_day_minute = np.bincount(weekday * 1440 + minute, weights=counts, minlength=7 * 1440).astype(np.int64)
+        purchases_td = self._day_time_frame(by_day_minute)
+
+        frames = [self._day_time_frame(np.zeros(7 * 1440, dtype=np.int64)).assign(year_et=np.int32(0))]
+        for cube_year in np.unique(year):
+            mask = year == cube_year
+            histogram = np.bincount(weekday[mask] * 1440 + minute[mask], weights=counts[mask],
+                                    minlength=7 * 1440).astype(np.int64)
+            frames.append(self._day_time_frame(histogram).assign(year_et=np.int32(cube_year)))
+        purchases_tdy = pd.concat(frames, ignore_index=True)[['year_et', 'day_of_week', 'time_et', 'count']]
+        return purchases_by_time, purchases_td, purchases_tdy
+
+    @staticmethod
+    def _day_time_frame(histogram):
+        # groupby on the old string keys sorted days alphabetically and times lexically (= chronologically)
+        cells = np.flatnonzero(histogram)
+        day_names = np.array(DAY_NAMES, dtype=object)[cells // 1440]
+        order = np.lexsort((cells % 1440, day_names.astype(str)))
+        cells = cells[order]
+        return pd.DataFrame({'day_of_week': day_names[order], 'time_et': time_labels(cells % 1440),
+                             'count': histogram[cells]})
+
+    def result(self):
+        """Stream consumer hook: the rolled-up outputs."""
+        return self.rollup()
+
+    def save(self, path):
+        self.cells.to_parquet(path, index=False)
+
+    @classmethod
+    def load(cls, path, timezone='US/Eastern'):
+        return cls(pd.read_parquet(path).astype(CUBE_DTYPES), timezone)
+
+
+def store_cube_path(root):
+    # A leading underscore keeps the cube out of the store's Parquet dataset
+    return os.path.join(root, '_time_cube.parquet')
+
+
+def _month_cells(df):
+    # Cells per store month, so a write that replaces a month can replace exactly that month's counts
+    frames = [TimeOfDayCube.from_orders(part, STORE_TIMEZONE).cells.assign(year=year, month=month)
+              for (year, month), part in df.groupby(['year', 'month'], sort=False)]
+    if not frames:
+        return pd.DataFrame({name: np.zeros(0, dtype=dtype) for name, dtype in STORE_CUBE_DTYPES.items()})
+    return pd.concat(frames, ignore_index=True).astype(STORE_CUBE_DTYPES)
+
+
+def build_store_cube(root):
+    """Count every order in the store at root into its cube, save it next to the store and return it."""
+    cells = _month_cells(read_orders(root, columns=['created_at', 'year', 'month']))
+    cells.to_parquet(store_cube_path(root), index=False)
+    return _store_cube(cells)
+
+
+def update_store_cube(root, df, replace=True):
+    """Bring the cube next to the store at root up to date after df (a store frame) was written there.
+
+    replace drops the stored counts of df's months first, for writes that replace whole months; otherwise df's
+    counts are added to them. A store without a cube yet is counted in full.
+    """
+    path = store_cube_path(root)
+    if not os.path.exists(path):
+        # Writing no rows creates no store to count
+        if os.path.exists(root):
+            build_store_cube(root)
+        return
+    cells = pd.read_parquet(path)
+    if replace:
+        # Orders whose created_at did not parse have no month, and no cells either
+        months = df[['year', 'month']].dropna().drop_duplicates()
+        written = cells.set_index(['year', 'month']).index.isin(pd.MultiIndex.from_frame(months.astype(
+            {'year': np.int16, 'month': np.int8})))
+        cells = cells[~written]
+    cells = pd.concat([cells, _month_cells(df)], ignore_index=True)
+    cells = cells.groupby(CUBE_COLUMNS[:-1] + ['year', 'month'], as_index=False, sort=True)['count'].sum()
+    cells.astype(STORE_CUBE_DTYPES).to_parquet(path, index=False)
+
+
+def load_store_cube(root):
+    """The cube saved next to the store at root, or None if the store has none yet."""
+    path = store_cube_path(root)
+    return _store_cube(pd.read_parquet(path)) if os.path.exists(path) else None
+
+
+def _store_cube(cells):
+    # Months only matter for keeping the cube current; analysis sums them away
+    cells = cells.groupby(CUBE_COLUMNS[:-1], as_index=False, sort=True)['count'].sum()
+    return TimeOfDayCube(cells.astype(CUBE_DTYPES), STORE_TIMEZONE)
+
+
+def time_labels(minutes):
+    """'HH:MM' labels for minute-of-day codes."""
+    labels = np.array([f'{minute // 60:02d}:{minute % 60:02d}' for minute in range(1440)], dtype=object)
+    return labels[np.asarray(minutes, dtype=np.int64)]